@@ -0,0 +1,14 @@
+import sys
+import warnings
+
+from modules.batch_job import main
+
+warnings.filterwarnings(
+    action="ignore",
+    category=UserWarning, 
+    module="openpyxl"
+)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
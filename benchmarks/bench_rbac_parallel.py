@@ -0,0 +1,84 @@
+"""
+Eager conversion of a synthetic 12 sheets RBAC workbook with `Analyze_RBAC.convert_sheets_to_json`,
+serially and in a process pool. The records of every sheet must be identical in both modes.
+
+Usage, from the root of the repository:
+
+    python -m benchmarks.bench_rbac_parallel --rows 20000 --workers 1 2 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from modules.analyzer_rbac import Analyze_RBAC
+from .bench_rbac_records import same_records, synthetic_profiles_users
+
+
+SHEETS = 12
+
+
+def write_synthetic_workbook(path: str, rows: int) -> None:
+    """
+    The function `write_synthetic_workbook` writes a workbook with `SHEETS` sheets shaped like
+    "Perfil-Usuario", the first ones with `rows` rows and the rest smaller, as in the real workbook.
+    """
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for number in range(SHEETS):
+            sheet_rows = rows if number < SHEETS // 3 else rows // 10
+            synthetic_profiles_users(sheet_rows, seed=number).to_excel(
+                writer, sheet_name=f"Hoja Número {number}", index=False
+            )
+
+
+def run_benchmark(workbook_path: str, workers: int) -> tuple[float, dict[str, list[dict]]]:
+    """
+    The function `run_benchmark` converts every sheet of the workbook with the given number of workers.
+    :return: The elapsed seconds and the records by normalized sheet name.
+    """
+    rbac = Analyze_RBAC(use_cache=False, workers=workers)
+    rbac.rbac_path = workbook_path
+
+    start = time.perf_counter()
+
+    with rbac.workbook_session():
+        rbac.convert_sheets_to_json(rbac.get_workbook())
+
+    elapsed = time.perf_counter() - start
+
+    return elapsed, {key: rbac.rbac_data[key] for key in rbac.rbac_data.keys()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        workbook_path = os.path.join(folder, "rbac.xlsx")
+        write_synthetic_workbook(workbook_path, args.rows)
+
+        print(f"Libro sintético: {SHEETS} hojas, {os.path.getsize(workbook_path) / (1024 * 1024):.1f} MB")
+        print(f"{'workers':>8} {'segundos':>10} {'speedup':>8}")
+
+        baseline = None
+        expected = None
+
+        for workers in sorted(set([1, *args.workers])):
+            elapsed, records = run_benchmark(workbook_path, workers)
+
+            if expected is None:
+                baseline, expected = elapsed, records
+            elif records.keys() != expected.keys() or not all(
+                same_records(expected[key], records[key]) for key in expected
+            ):
+                raise SystemExit(f"La conversión con {workers} workers no coincide con la conversión serial")
+
+            print(f"{workers:>8} {elapsed:>10.3f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
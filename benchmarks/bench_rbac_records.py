@@ -0,0 +1,92 @@
+"""
+Conversion of a 100k rows "perfil-usuario" sheet with `Analyze_RBAC.dataframe_to_json_compatible`,
+compared with the row by row conversion it replaced. Both outputs must be identical.
+
+Usage, from the root of the repository:
+
+    python -m benchmarks.bench_rbac_records --rows 100000
+"""
+import argparse
+import math
+import random
+import time
+
+import pandas as pd
+from unidecode import unidecode
+
+from modules.analyzer_rbac import Analyze_RBAC
+from utils import normalize_str
+
+
+def row_by_row_conversion(dataframe: pd.DataFrame) -> list[dict]:
+    """
+    The function `row_by_row_conversion` is the previous implementation, kept as reference.
+    """
+    dataframe = dataframe.where(pd.notnull(dataframe), None)
+
+    return [
+        {
+            normalize_str(key): (unidecode(value.replace('\n', ' ')) if isinstance(value, str) else value)
+            for key, value in row.items()
+        }
+        for row in dataframe.to_dict(orient="records")
+    ]
+
+
+def synthetic_profiles_users(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    The function `synthetic_profiles_users` builds a DataFrame shaped like the "Perfil-Usuario" sheet.
+    """
+    randomizer = random.Random(seed)
+    profiles = [f"Perfil Operación {number}" for number in range(60)]
+    positions = ["Profesional", "Analista\nSenior", "Dirección", "Técnico", None]
+
+    return pd.DataFrame({
+        "Usuario OPICS": [f"U{number:05d}" for number in range(rows)],
+        "Usuario Windows": [f"usuario.{number}" for number in range(rows)],
+        "Nombre del Usuario": [f"Nombre Núñez {randomizer.randint(0, rows // 4)}" for _ in range(rows)],
+        "Perfil": [randomizer.choice(profiles) for _ in range(rows)],
+        "Cargo": [randomizer.choice(positions) for _ in range(rows)],
+        "Extensión": [randomizer.choice([float(number) for number in range(100)] + [math.nan]) for _ in range(rows)],
+    })
+
+
+def same_records(a: list[dict], b: list[dict]) -> bool:
+    """
+    The function `same_records` compares two lists of records, considering NaN equal to NaN.
+    """
+    def normalize(value):
+        return "NaN" if isinstance(value, float) and math.isnan(value) else (type(value), value)
+
+    return len(a) == len(b) and all(
+        list(x.keys()) == list(y.keys()) and [normalize(v) for v in x.values()] == [normalize(v) for v in y.values()]
+        for x, y in zip(a, b)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    dataframe = synthetic_profiles_users(args.rows)
+    rbac = Analyze_RBAC(use_cache=False)
+
+    start = time.perf_counter()
+    expected = row_by_row_conversion(dataframe)
+    row_by_row = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = rbac.dataframe_to_json_compatible(dataframe)
+    columnar = time.perf_counter() - start
+
+    if not same_records(expected, records):
+        raise SystemExit("La conversión por columnas no coincide con la conversión fila a fila")
+
+    print(f"Filas: {args.rows}")
+    print(f"Fila a fila:  {row_by_row:.3f} s")
+    print(f"Por columnas: {columnar:.3f} s ({row_by_row / columnar:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
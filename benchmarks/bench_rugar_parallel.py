@@ -0,0 +1,53 @@
+"""
+Throughput of `Analyze_RUGAR` on a big synthetic RUGAR report with a growing number of workers.
+
+Usage, from the root of the repository:
+
+    python -m benchmarks.bench_rugar_parallel --users 100000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from modules.analyzer_rugar import Analyze_RUGAR
+from .synthetic_data import build_dataset, write_rugar_report, REPORT_DATE, SCALES
+
+
+def run_benchmark(report_path: str, workers: int) -> float:
+    """
+    The function `run_benchmark` parses the report once with the given number of workers and returns
+    the elapsed seconds.
+    """
+    rugar = Analyze_RUGAR(use_cache=False, workers=workers)
+    rugar.report_path = report_path
+
+    start = time.perf_counter()
+    rugar.analyze_rugar_report()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=SCALES["100k"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        report_path = os.path.join(folder, f"R01RUGAR_{REPORT_DATE}.rpt")
+        write_rugar_report(report_path, build_dataset(args.users).operators, REPORT_DATE)
+        size_mb = os.path.getsize(report_path) / (1024 * 1024)
+
+        print(f"Reporte sintético: {size_mb:.1f} MB")
+        print(f"{'workers':>8} {'segundos':>10} {'MB/s':>10} {'speedup':>8}")
+
+        baseline = None
+
+        for workers in sorted(set(args.workers)):
+            elapsed = run_benchmark(report_path, workers)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>10.2f} {size_mb / elapsed:>10.1f} {baseline / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Cold start of the package, measured with `python -X importtime` in a fresh interpreter.
+
+Each entry point is imported several times in a new process and the best cumulative import time is
+compared with its budget. The heavy dependencies that an entry point must not import (tkinter for the
+batch command, pandas and numpy before the workbook is parsed) are checked too. The exit code is 1
+when a budget is exceeded or a forbidden module was imported, so it can run as a check.
+
+Usage, from the root of the repository:
+
+    python -m benchmarks.bench_startup --repeat 5 --budget-scale 1.0
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+# Statement imported, budget in milliseconds and modules that must not be imported.
+ENTRY_POINTS = {
+    "modules": ("import modules", 250, ("tkinter", "pandas", "numpy")),
+    "batch": ("import modules.batch_job", 250, ("tkinter", "pandas", "numpy")),
+    "gui": ("from modules import App_GUI", 400, ("pandas", "numpy")),
+}
+
+
+def measure_import(statement: str) -> tuple[float, list[tuple[str, float]], set[str]]:
+    """
+    The function `measure_import` runs a statement in a new interpreter with `-X importtime`.
+    :return: The total import time in milliseconds, the slowest top level imports and the names of the
+    imported modules.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True, cwd=os.getcwd()
+    )
+
+    total = 0.0
+    top_level = []
+    imported = set()
+
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+
+        if not match:
+            continue
+
+        cumulative = int(match.group(2)) / 1000
+        module = match.group(4)
+        imported.add(module.split(".")[0])
+
+        # Top level imports have a single space of indentation, their times add up to the total.
+        if len(match.group(3)) == 1:
+            total += cumulative
+            top_level.append((module, cumulative))
+
+    return total, sorted(top_level, key=lambda item: item[1], reverse=True), imported
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiplica los presupuestos")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+
+    for name, (statement, budget, forbidden) in ENTRY_POINTS.items():
+        runs = [measure_import(statement) for _ in range(args.repeat)]
+        total, top_level, imported = min(runs, key=lambda run: run[0])
+        budget *= args.budget_scale
+
+        forbidden_imported = sorted(module for module in forbidden if module in imported)
+        status = "OK" if total <= budget and not forbidden_imported else "FALLA"
+        failed = failed or status != "OK"
+
+        print(f"{name:<8} {total:>8.1f} ms (presupuesto {budget:.0f} ms) {status}")
+
+        for module, cumulative in top_level[:args.top]:
+            print(f"    {module:<40} {cumulative:>8.1f} ms")
+
+        if forbidden_imported:
+            print(f"    importa módulos no permitidos: {', '.join(forbidden_imported)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
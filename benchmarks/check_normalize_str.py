@@ -0,0 +1,87 @@
+"""
+Randomized property check of `utils.normalize_str`: for any input its result must be identical to the
+original implementation, which compiled its patterns on every call and always ran `unidecode`. It also
+times both implementations on repeated workbook headers and prints the counters of the memo.
+
+Usage, from the root of the repository:
+
+    python -m benchmarks.check_normalize_str --cases 200000
+"""
+import argparse
+import random
+import re
+import time
+
+from unidecode import unidecode
+
+from utils import normalize_str, normalize_str_cache_info, normalize_str_cache_clear
+
+
+ALPHABET = (
+    list("abcXYZ019 _-.,()/:") + [" - ", ", ", "\n", "\t", "\r", "\ufeff", "\u00a0", "\u2028", "\u3000"]
+    + list("áéíóúñÑÜçß") + ["İ", "ǅ", "Ω", "ﬁ", "東京", "🙂", "\x0c", "\x85"]
+)
+
+HEADERS = [
+    "Usuario OPICS", "Usuario Windows", "Nombre del Usuario", "Perfil", "Cargo", "Descripción del Perfil",
+    "TIPO ROLE \nAdmin/Operativo", "Tipo de Usuario\nInterno/Externo", "Criticidad del privilegio",
+    "En USO", "Fecha \n Retiro", "Excluyente de otro perfil", "Grupos", "Perfil-Usuario", "Grupo-Transaccion",
+]
+
+
+def reference_normalize_str(original_str: str) -> str:
+    """
+    The function `reference_normalize_str` is the original implementation, kept as reference.
+    """
+    pattern_1 = re.compile(r' - |, |\s|\.')
+    pattern_2 = re.compile(r'\n|\ufeff|\(|\)')
+
+    return unidecode(
+        pattern_1.sub(
+            '_', pattern_2.sub(
+                '', original_str.strip().lower()
+            )
+        )
+    )
+
+
+def random_string(randomizer: random.Random) -> str:
+    return "".join(randomizer.choice(ALPHABET) for _ in range(randomizer.randint(0, 24)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    randomizer = random.Random(args.seed)
+
+    for case in range(args.cases):
+        value = random_string(randomizer)
+
+        if normalize_str(value) != reference_normalize_str(value):
+            raise SystemExit(f"Resultado distinto para {value!r}: {normalize_str(value)!r} != {reference_normalize_str(value)!r}")
+
+    print(f"{args.cases} casos aleatorios idénticos a la implementación original")
+
+    normalize_str_cache_clear()
+    keys = [randomizer.choice(HEADERS) for _ in range(500_000)]
+
+    start = time.perf_counter()
+    for key in keys:
+        reference_normalize_str(key)
+    reference = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        normalize_str(key)
+    memoized = time.perf_counter() - start
+
+    print(f"Original:   {reference:.3f} s")
+    print(f"Memoizada:  {memoized:.3f} s ({reference / memoized:.1f}x)")
+    print(f"Memo:       {normalize_str_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
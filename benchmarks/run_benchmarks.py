@@ -0,0 +1,233 @@
+"""
+Benchmark suite of the analyzers and the comparisons on synthetic data, see `benchmarks.synthetic_data`.
+
+For each scale it times these calls, each on a fresh instance without the cache:
+- `Analyze_RUGAR.analyze_rugar_report`.
+- `Analyze_RBAC.analyze_rbac_report`.
+- Building the snapshot of `Compare_Data`.
+- Each comparison of `Compare_Data`, with the snapshot already built.
+Each call runs several times. The results are written as JSON and the best time of each call is
+compared with a stored baseline. The exit code is 1 when a call is slower than its baseline by more
+than the tolerance, so the suite can run as a check.
+
+Usage, from the root of the repository:
+
+    python -m benchmarks.run_benchmarks --scales 1k 10k --save-baseline
+    python -m benchmarks.run_benchmarks --scales 1k 10k --tolerance 0.2
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+
+from modules.analyzer_rbac import Analyze_RBAC
+from modules.analyzer_rugar import Analyze_RUGAR
+from modules.compare_data import Compare_Data
+from .synthetic_data import (
+    write_dataset, Synthetic_Files, GENERATOR_VERSION, SCALES, REPORT_DATE, PREVIOUS_REPORT_DATE
+)
+
+
+BENCHMARKS_PATH = "./files/benchmarks"
+
+# Differences below this number of seconds are noise, they are never reported as regressions.
+MIN_DELTA = 0.005
+
+
+def make_compare_data(files: Synthetic_Files, report_date: str = REPORT_DATE) -> Compare_Data:
+    """
+    The function `make_compare_data` builds the analyzers of a synthetic dataset, without cache.
+    """
+    rugar = Analyze_RUGAR(use_cache=False, report_date=report_date)
+    rugar.reports_folder = files.reports_folder
+    rugar.set_report_path()
+
+    rbac = Analyze_RBAC(use_cache=False)
+    rbac.rbac_path = files.workbook_path
+
+    return Compare_Data(rugar, rbac)
+
+
+def warm_compare_data(files: Synthetic_Files) -> Compare_Data:
+    """
+    The function `warm_compare_data` builds the analyzers of a dataset with their snapshot ready.
+    """
+    compare_data = make_compare_data(files)
+    compare_data.get_snapshot()
+
+    return compare_data
+
+
+def warm_incremental(files: Synthetic_Files) -> Compare_Data:
+    """
+    The function `warm_incremental` stores the result of the previous report, so the incremental
+    comparison of the current one only compares the operators that changed.
+    """
+    previous = make_compare_data(files, PREVIOUS_REPORT_DATE)
+    previous.compare_users_groups_incremental("00000000")
+
+    return warm_compare_data(files)
+
+
+# Name of each benchmark, the function that prepares it (not timed) and the call that is timed.
+CASES: dict[str, tuple[Callable[[Synthetic_Files], object], Callable[[object], object]]] = {
+    "Analyze_RUGAR.analyze_rugar_report": (
+        lambda files: make_compare_data(files).rugar, lambda rugar: rugar.analyze_rugar_report()
+    ),
+    "Analyze_RBAC.analyze_rbac_report": (
+        lambda files: make_compare_data(files).rbac, lambda rbac: rbac.analyze_rbac_report()
+    ),
+    "Compare_Data.get_snapshot": (
+        make_compare_data, lambda compare_data: compare_data.get_snapshot()
+    ),
+    "Compare_Data.compare_users_in_reports": (
+        warm_compare_data, lambda compare_data: compare_data.compare_users_in_reports()
+    ),
+    "Compare_Data.compare_users_groups": (
+        warm_compare_data, lambda compare_data: compare_data.compare_users_groups()
+    ),
+    "Compare_Data.compare_users_groups_incremental": (
+        warm_incremental, lambda compare_data: compare_data.compare_users_groups_incremental(PREVIOUS_REPORT_DATE)
+    ),
+}
+
+
+def run_case(files: Synthetic_Files, prepare: Callable, call: Callable, repeat: int) -> dict:
+    """
+    The function `run_case` times a call `repeat` times, each one on a newly prepared instance.
+    :return: The best and median seconds and the seconds of every run.
+    """
+    runs = []
+
+    for _ in range(repeat):
+        # Some comparisons print their progress, it is not part of the measure.
+        with open(os.devnull, mode="w") as devnull, contextlib.redirect_stdout(devnull):
+            target = prepare(files)
+            gc.collect()
+
+            start = time.perf_counter()
+            call(target)
+            runs.append(time.perf_counter() - start)
+
+    return {"best": min(runs), "median": statistics.median(runs), "runs": runs}
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list[tuple[str, str, float, float, str]]:
+    """
+    The function `compare_with_baseline` compares the best time of each benchmark with the baseline.
+    :return: A list of (scale, benchmark, seconds, baseline seconds, status), where the status is
+    "REGRESIÓN", "mejora" or "igual".
+    """
+    comparison = []
+
+    for scale, cases in results["results"].items():
+        for name, result in cases.items():
+            reference = baseline.get("results", {}).get(scale, {}).get(name)
+
+            if reference is None:
+                continue
+
+            seconds, reference_seconds = result["best"], reference["best"]
+            status = "igual"
+
+            if abs(seconds - reference_seconds) >= MIN_DELTA:
+                if seconds > reference_seconds * (1 + tolerance):
+                    status = "REGRESIÓN"
+                elif seconds < reference_seconds * (1 - tolerance):
+                    status = "mejora"
+
+            comparison.append((scale, name, seconds, reference_seconds, status))
+
+    return comparison
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=["1k", "10k"], help=f"Escalas: {', '.join(SCALES)} o un número de usuarios")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", default=os.path.join(BENCHMARKS_PATH, "data"), help="Carpeta de los datos sintéticos")
+    parser.add_argument("--output", help="Archivo de resultados, por defecto uno nuevo en ./files/benchmarks/results")
+    parser.add_argument("--baseline", default=os.path.join(BENCHMARKS_PATH, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="Guarda los resultados como línea base")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Diferencia relativa permitida frente a la línea base")
+    args = parser.parse_args()
+
+    results = {
+        "generator_version": GENERATOR_VERSION,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": {},
+    }
+
+    for scale in args.scales:
+        users = SCALES[scale] if scale in SCALES else int(scale)
+
+        start = time.perf_counter()
+        files = write_dataset(args.data, users, args.seed)
+        print(f"Escala {scale}: {users} usuarios, datos listos en {time.perf_counter() - start:.1f} s")
+
+        scale_results = results["results"][scale] = {}
+
+        for name in args.cases:
+            prepare, call = CASES[name]
+            scale_results[name] = result = run_case(files, prepare, call, args.repeat)
+
+            print(f"    {name:<48} {result['best']:>9.3f} s (mediana {result['median']:.3f} s)")
+
+    output = args.output or os.path.join(
+        BENCHMARKS_PATH, "results", f"{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    with open(output, mode="w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, ensure_ascii=False)
+
+    print(f"Resultados guardados en {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, mode="w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No hay línea base en {args.baseline}, use --save-baseline para crearla")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+
+    if baseline.get("generator_version") != GENERATOR_VERSION or baseline.get("seed") != args.seed:
+        print("La línea base se generó con otros datos sintéticos, no se compara")
+        return 0
+
+    comparison = compare_with_baseline(results, baseline, args.tolerance)
+
+    if not comparison:
+        print("La línea base no tiene resultados de estas escalas")
+        return 0
+
+    print(f"Comparación con la línea base (tolerancia {args.tolerance:.0%}):")
+
+    for scale, name, seconds, reference_seconds, status in comparison:
+        print(f"    {scale:<5} {name:<48} {seconds:>9.3f} s vs {reference_seconds:>9.3f} s {status}")
+
+    return 1 if any(status == "REGRESIÓN" for *_, status in comparison) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+Deterministic synthetic RUGAR reports and RBAC workbooks, at a configurable number of users.
+
+The same users and seed always produce the same files. The RBAC workbook has every sheet of
+"RBAC example.xlsx" with the same headers. Most OPICS operators have exactly the groups of their RBAC
+profile. A few have groups added or removed, and a few users exist in only one of the sources. The
+report follows the layout of the RUGAR report:
+- Page breaks ("\\x0c") with their headers.
+- The "Phone #:" line before the groups.
+- Operators whose groups continue on the next page, with their OperatorID block repeated.
+- Some "Transaction Authority" sections with "(IAUD)" lines.
+
+A second report, of the previous day, differs from the first in a few operators.
+
+Usage, from the root of the repository:
+
+    python -m benchmarks.synthetic_data --users 10000 --output ./files/benchmarks/data
+"""
+import argparse
+import os
+import random
+from typing import NamedTuple
+
+
+# Changing the generated files requires a new version, it is part of their names.
+GENERATOR_VERSION = 1
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+REPORT_DATE = "20241030"
+PREVIOUS_REPORT_DATE = "20241029"
+
+ID_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+GROUP_WORDS = [
+    "CONSULTA", "REPORTES", "SIGNON", "TRACE", "SWAPS", "FOREX", "MMKT", "BONOS", "LIQUIDA", "TESORERIA",
+    "RIESGO", "CONTAB", "PAGOS", "LIMITES", "CUSTODIA", "AUDITA",
+]
+FIRST_NAMES = ["Carlos", "María", "José", "Lucía", "Andrés", "Ángela", "Sebastián", "Mónica", "Iván", "Sofía"]
+LAST_NAMES = ["Páez", "Núñez", "Ferreira", "Gómez", "Muñoz", "Rodríguez", "Peña", "Castaño", "López", "Díaz"]
+POSITIONS = ["Profesional", "Analista\nSenior", "Dirección", "Técnico", "Auxiliar"]
+TRANSACTIONS = ["ACCT", "TRCVIEW", "AUTHORITY_UPDATES", "GET_AVAILABLE_REPORTS", "DEAL_ENTRY", "SETTLE"]
+
+# Lines per page of the report, including its header.
+PAGE_LINES = 60
+REPORT_WIDTH = 200
+
+
+# The class `Synthetic_Dataset` is the content of the generated files: the groups of each profile,
+# the rows of the "Perfil-Usuario" sheet as (user, windows user, name, profile, position) and the
+# operators of each report as (user, name, groups).
+class Synthetic_Dataset(NamedTuple):
+    users: int
+    seed: int
+    groups: list[str]
+    profiles: dict[str, list[str]]
+    rbac_users: list[tuple[str, str, str, str, str]]
+    operators: list[tuple[str, str, list[str]]]
+    previous_operators: list[tuple[str, str, list[str]]]
+
+
+# The class `Synthetic_Files` holds the paths of the files written by `write_dataset`.
+class Synthetic_Files(NamedTuple):
+    reports_folder: str
+    report_path: str
+    previous_report_path: str
+    workbook_path: str
+
+
+def operator_id(number: int) -> str:
+    """
+    The function `operator_id` encodes a number as a four characters operator id, as in OPICS.
+    """
+    characters = []
+
+    for _ in range(4):
+        number, remainder = divmod(number, len(ID_ALPHABET))
+        characters.append(ID_ALPHABET[remainder])
+
+    return "".join(reversed(characters))
+
+
+def build_dataset(users: int, seed: int = 0) -> Synthetic_Dataset:
+    """
+    The function `build_dataset` builds the users, profiles and groups of a dataset.
+
+    :param users: The `users` parameter is the number of RBAC users
+    :type users: int
+    :param seed: The `seed` parameter makes the dataset reproducible, defaults to 0 (optional)
+    :type seed: int
+    :return: A `Synthetic_Dataset`.
+    """
+    randomizer = random.Random(f"{seed}-{users}")
+
+    n_groups = min(max(60, users // 50), 2000)
+    n_profiles = min(max(20, users // 250), 400)
+
+    groups = ["SIGNON"] + [f"{GROUP_WORDS[number % len(GROUP_WORDS)]}_{number}" for number in range(1, n_groups)]
+
+    profiles = {
+        f"Perfil {GROUP_WORDS[number % len(GROUP_WORDS)].title()} {number}":
+            ["SIGNON"] + randomizer.sample(groups[1:], randomizer.randint(3, 15))
+        for number in range(n_profiles)
+    }
+    profile_names = list(profiles)
+
+    # A few profiles are assigned to most of the users.
+    profile_weights = [1 / (rank + 1) for rank in range(n_profiles)]
+
+    rbac_users = []
+    operators = []
+
+    # 2% of the RBAC users are not in OPICS and as many OPICS operators are not in RBAC.
+    for number in range(users + users // 50):
+        user = operator_id(number)
+        first_name, last_name = randomizer.choice(FIRST_NAMES), randomizer.choice(LAST_NAMES)
+        profile = randomizer.choices(profile_names, profile_weights)[0]
+
+        in_rbac = number < users
+        in_opics = number >= users // 50
+
+        if in_rbac:
+            rbac_users.append((
+                user, f"{first_name}.{last_name}{number}".lower(), f"{first_name} {last_name} {number}",
+                profile, randomizer.choice(POSITIONS)
+            ))
+
+        if in_opics:
+            operator_groups = list(profiles[profile])
+
+            # 5% of the operators have a group more or a group less than their profile.
+            if randomizer.random() < 0.05:
+                if randomizer.random() < 0.5 and len(operator_groups) > 1:
+                    operator_groups.remove(randomizer.choice(operator_groups[1:]))
+                else:
+                    operator_groups.append(randomizer.choice(groups))
+
+            operators.append((user, f"{first_name} {last_name} {number}".upper(), operator_groups))
+
+    # The previous report differs in 1% of the operators.
+    previous_operators = []
+
+    for user, name, operator_groups in operators:
+        draw = randomizer.random()
+
+        if draw < 0.003:
+            continue
+        if draw < 0.01:
+            operator_groups = operator_groups[:-1] or operator_groups
+
+        previous_operators.append((user, name, operator_groups))
+
+    return Synthetic_Dataset(users, seed, groups, profiles, rbac_users, operators, previous_operators)
+
+
+def write_rugar_report(path: str, operators: list[tuple[str, str, list[str]]], report_date: str, seed: int = 0) -> None:
+    """
+    The function `write_rugar_report` writes the operators in the layout of the RUGAR report.
+
+    :param path: The `path` parameter is the file to write
+    :type path: str
+    :param operators: The `operators` parameter is the list of (user, name, groups) to write
+    :type operators: list[tuple[str, str, list[str]]]
+    :param report_date: The `report_date` parameter is the date of the report as YYYYMMDD
+    :type report_date: str
+    :param seed: The `seed` parameter decides which operators have Transaction Authority sections,
+    defaults to 0 (optional)
+    :type seed: int
+    """
+    randomizer = random.Random(f"{seed}-{report_date}")
+    date = f"{report_date[:4]}/{report_date[4:6]}/{report_date[6:]}"
+
+    page_header = [
+        "\x0c" + " " * 60 + "Users Group Access Report",
+        f"System date: {date}",
+        f"Branch processing date: {date}",
+    ]
+
+    with open(path, mode="w", encoding="utf-8", newline="\n") as file:
+        page_used = PAGE_LINES
+
+        def write_line(line: str, operator_header: list[str] | None = None) -> None:
+            nonlocal page_used
+
+            # A full page starts a new one, repeating the block of the operator being written.
+            if page_used >= PAGE_LINES:
+                file.write("\n".join(page_header) + "\n")
+                page_used = len(page_header)
+
+                if operator_header is not None:
+                    file.write("\n".join(operator_header) + "\n")
+                    page_used += len(operator_header)
+
+            file.write(line + "\n")
+            page_used += 1
+
+        file.write("﻿" + "*" * REPORT_WIDTH + "\n\n")
+
+        for user, name, groups in operators:
+            operator_header = [
+                f"OperatorID: {user}", "Alternate Oper ID: ", f"Operator Name: {name}", "Department: DRCPI", "Phone #: ",
+            ]
+
+            # The block of an operator never starts at the bottom of a page.
+            if page_used + len(operator_header) >= PAGE_LINES:
+                page_used = PAGE_LINES
+
+            for line in operator_header:
+                write_line(line)
+
+            for group in groups:
+                write_line(group.ljust(REPORT_WIDTH), operator_header)
+
+            if randomizer.random() < 0.05:
+                write_line("Transaction Authority", operator_header)
+
+                for transaction in randomizer.sample(TRANSACTIONS, 2):
+                    write_line(f"{transaction}".ljust(30) + "(IAUD)", operator_header)
+
+            write_line("")
+
+        file.write("\n" + " " * 72 + "*    *    *    E n d  o f  R e p o r t    *    *    *" + "\n")
+
+
+def write_rbac_workbook(path: str, dataset: Synthetic_Dataset) -> None:
+    """
+    The function `write_rbac_workbook` writes the RBAC workbook of a dataset, with every sheet of the
+    example workbook. The workbook is written in write only mode, row by row.
+
+    :param path: The `path` parameter is the file to write
+    :type path: str
+    :param dataset: The `dataset` parameter is the dataset to write
+    :type dataset: Synthetic_Dataset
+    """
+    from openpyxl import Workbook
+
+    randomizer = random.Random(f"{dataset.seed}-{dataset.users}-rbac")
+    workbook = Workbook(write_only=True)
+
+    sheet = workbook.create_sheet("Perfil-Usuario")
+    sheet.append(["Usuario OPICS", "Usuario Windows", "Nombre del Usuario", "Perfil", "Cargo"])
+    for row in dataset.rbac_users:
+        sheet.append(list(row))
+
+    sheet = workbook.create_sheet("Perfiles")
+    sheet.append([
+        "Perfil", "Descripción del Perfil", "TIPO ROLE \nAdmin/Operativo", "Tipo de Usuario\nInterno/Externo",
+        "Criticidad del privilegio", "En USO", "Fecha \n Retiro", "Excluyente de otro perfil",
+    ])
+    for profile in dataset.profiles:
+        sheet.append([
+            profile, f"Operaciones de {profile.lower()}", randomizer.choice(["Operativo", "Admin"]), "Interno",
+            randomizer.choice(["Alto", "Medio", "Bajo"]), "SI", None, None,
+        ])
+    sheet.append(["Nota: los perfiles retirados no se asignan", None, None, None, None, None, None, None])
+
+    sheet = workbook.create_sheet("Perfil-Grupo")
+    sheet.append(["Perfil", "Grupos"])
+    for profile, groups in dataset.profiles.items():
+        for group in groups:
+            sheet.append([profile, group])
+
+    sheet = workbook.create_sheet("Grupos")
+    sheet.append(["Grupos", "Descripción del Grupo", "EN USO", "Por Retirar", "Caducidad"])
+    for group in dataset.groups:
+        sheet.append([group, f"Grupo de {group.split('_')[0].lower()}", "Si", None, None])
+
+    sheet = workbook.create_sheet("Grupo-Transaccion")
+    for group in dataset.groups:
+        for transaction in randomizer.sample(TRANSACTIONS, 3):
+            sheet.append([group, transaction, "(IAUD)"])
+
+    sheet = workbook.create_sheet("Gobierno")
+    sheet.append(["Perfil", "EN USO (S/N)", "Área", "Responsable", "Activación /Aprobación", None, "Quien \nAprueba"])
+    for profile in dataset.profiles:
+        sheet.append([profile, "Si", "DRCPI", "Director DRCPI", "Si", "Correo", "Jefe"])
+
+    workbook.save(path)
+
+
+def write_dataset(folder: str, users: int, seed: int = 0) -> Synthetic_Files:
+    """
+    The function `write_dataset` writes the RUGAR reports and the RBAC workbook of a dataset in a
+    folder, unless they were already written with the same users, seed and generator version.
+
+    :param folder: The `folder` parameter is the folder where the files are written
+    :type folder: str
+    :param users: The `users` parameter is the number of RBAC users
+    :type users: int
+    :param seed: The `seed` parameter makes the dataset reproducible, defaults to 0 (optional)
+    :type seed: int
+    :return: The paths of the files, as a `Synthetic_Files`.
+    """
+    reports_folder = os.path.join(folder, f"v{GENERATOR_VERSION}_{users}_{seed}") + os.sep
+    files = Synthetic_Files(
+        reports_folder=reports_folder,
+        report_path=f"{reports_folder}R01RUGAR_{REPORT_DATE}.rpt",
+        previous_report_path=f"{reports_folder}R01RUGAR_{PREVIOUS_REPORT_DATE}.rpt",
+        workbook_path=f"{reports_folder}RBAC.xlsx",
+    )
+
+    if all(os.path.exists(path) for path in files[1:]):
+        return files
+
+    os.makedirs(reports_folder, exist_ok=True)
+    dataset = build_dataset(users, seed)
+
+    write_rugar_report(files.report_path, dataset.operators, REPORT_DATE, seed)
+    write_rugar_report(files.previous_report_path, dataset.previous_operators, PREVIOUS_REPORT_DATE, seed)
+
+    # The workbook is written last, its presence marks the dataset as complete.
+    write_rbac_workbook(files.workbook_path, dataset)
+
+    return files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=SCALES["10k"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="./files/benchmarks/data")
+    args = parser.parse_args()
+
+    files = write_dataset(args.output, args.users, args.seed)
+
+    for path in files[1:]:
+        print(f"{path} ({os.path.getsize(path) / (1024 * 1024):.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
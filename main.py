@@ -1,6 +1,7 @@
 import warnings
 
 from modules import Analyze_RBAC, Analyze_RUGAR, App_GUI, Compare_Data
+from utils import tracer
 
 warnings.filterwarnings(
     action="ignore",
@@ -10,8 +11,14 @@ warnings.filterwarnings(
 
 
 if __name__ == '__main__':
+    # The times of each stage are shown in the "Tiempos de ejecución" panel.
+    tracer.enable()
+
     rugar = Analyze_RUGAR()
     rbac = Analyze_RBAC()
     compare_data = Compare_Data(rugar, rbac)
 
+    # Both reports are analyzed in the background while the window is built.
+    compare_data.preload()
+
     App_GUI(compare_data).mainloop()
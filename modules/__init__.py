@@ -1,12 +1,35 @@
+from importlib import import_module
+
 from .analyzer_rbac import Analyze_RBAC
 from .analyzer_rugar import Analyze_RUGAR
-from .app_gui import App_GUI
 from .compare_data import Compare_Data
+from .export_data import Export_Data
+
+
+# Exports loaded on first access, since they import heavy dependencies: tkinter (`App_GUI`), numpy
+# (`Role_Mining`) and sqlite3 (`History_Store`). The batch runs never import the GUI this way.
+LAZY_EXPORTS = {
+    "App_GUI": ".app_gui",
+    "History_Store": ".history_store",
+    "Role_Mining": ".role_mining",
+}
+
+
+def __getattr__(name: str):
+    if name in LAZY_EXPORTS:
+        value = getattr(import_module(LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = [
-    Analyze_RBAC, 
-    Analyze_RUGAR, 
-    App_GUI,
-    Compare_Data
-]
\ No newline at end of file
+    "Analyze_RBAC", 
+    "Analyze_RUGAR", 
+    "App_GUI",
+    "Compare_Data",
+    "Export_Data",
+    "History_Store",
+    "Role_Mining"
+]
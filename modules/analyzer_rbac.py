@@ -1,61 +1,593 @@
-import pandas as pd
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from unidecode import unidecode
 
-from utils import RBAC_Keys, RBAC_Profile_Keys, RBAC_Profile_Group_Keys, normalize_str
+from utils import (
+    RBAC_Keys, RBAC_Profile_Keys, RBAC_Profile_Group_Keys, OPICS_Keys, Fingerprint_Cache, file_fingerprint,
+    normalize_str, Progress_Callback, Progress_Reporter, span
+)
+
+# pandas (and numpy with it) is imported the first time the workbook is opened, so starting the
+# application, or reading the sheets from the cache, does not pay for it.
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def clean_cell_value(value: str) -> str:
+    """
+    The function `clean_cell_value` replaces the newlines of a text cell with spaces and transliterates
+    it to ASCII.
+
+    :param value: The `value` parameter is the text of a cell
+    :type value: str
+    :return: The cleaned text.
+    """
+    return unidecode_value(value.replace('\n', ' '))
+
+
+@lru_cache(maxsize=65536)
+def unidecode_value(value: str) -> str:
+    """
+    The function `unidecode_value` is a memoized `unidecode`, since the same values (profiles, groups,
+    positions) repeat across rows and sheets.
+
+    :param value: The `value` parameter is the text to transliterate
+    :type value: str
+    :return: The ASCII transliteration of `value`.
+    """
+    return unidecode(value)
+
+
+# The class `Lazy_Sheets` is the dictionary of normalized sheets of the workbook. A sheet that is not
+# loaded yet is parsed by `loader` the first time its key is accessed.
+class Lazy_Sheets(dict):
+    def __init__(self, loader: Callable[[str], list[dict]]):
+        super().__init__()
+        self.loader = loader
+        self.lock = threading.RLock()
+
+
+    def __missing__(self, key: str) -> list[dict]:
+        with self.lock:
+            if not dict.__contains__(self, key):
+                dict.__setitem__(self, key, self.loader(key))
+
+            return dict.__getitem__(self, key)
+
+
+def load_workbook_sheets(
+        rbac_path: str, keys: tuple[str, ...], use_cache: bool = True, workers: int = 1
+    ) -> tuple[dict, tuple[int, int]]:
+    """
+    The function `load_workbook_sheets` loads some sheets of a workbook with a new `Analyze_RBAC`. It is
+    defined at module level so it can run in a child process, see `Compare_Data.preload`.
+
+    :param rbac_path: The `rbac_path` parameter is the location of the workbook
+    :type rbac_path: str
+    :param keys: The `keys` parameter is the normalized names of the sheets to load
+    :type keys: tuple[str, ...]
+    :param use_cache: The `use_cache` parameter enables the cache of the analyzer, defaults to `True`
+    (optional)
+    :type use_cache: bool
+    :param workers: The `workers` parameter is the number of processes that parse the sheets, see
+    `Analyze_RBAC.load_sheets_in_parallel`, defaults to 1 (optional)
+    :type workers: int
+    :return: The loaded sheets, in the format of `Analyze_RBAC.cached_workbook`, and the size and
+    modification time of the workbook that was read.
+    """
+    stat = os.stat(rbac_path)
+
+    rbac = Analyze_RBAC(use_cache=use_cache, workers=workers)
+    rbac.rbac_path = rbac_path
+    rbac.load_cached_data()
+
+    with rbac.workbook_session():
+        rbac.load_sheets_in_parallel(keys)
+
+        for key in keys:
+            rbac.rbac_data[key]
+
+    return rbac.cached_workbook, (stat.st_size, stat.st_mtime_ns)
+
+
+def convert_sheet_columns(
+        rbac_path: str, sheet: str, columns: tuple[str, ...] | None = None
+    ) -> tuple[list[str], list[list], int]:
+    """
+    The function `convert_sheet_columns` opens a workbook by path and converts one of its sheets. It is
+    defined at module level so it can run in the process pools of `convert_sheets_to_json` and
+    `load_sheets_in_parallel`.
+
+    :param rbac_path: The `rbac_path` parameter is the location of the workbook
+    :type rbac_path: str
+    :param sheet: The `sheet` parameter is the name of the sheet in the workbook
+    :type sheet: str
+    :param columns: The `columns` parameter is the normalized headers to read, or `None` to read
+    every column, defaults to `None` (optional)
+    :type columns: tuple[str, ...] | None
+    :return: The normalized sheet in columns, as returned by `Analyze_RBAC.dataframe_to_columns`.
+    """
+    rbac = Analyze_RBAC(use_cache=False)
+    rbac.rbac_path = rbac_path
+
+    return rbac.dataframe_to_columns(rbac.read_sheet(sheet, columns))
 
 
 class Analyze_RBAC():
-    def __init__(self):
+    def __init__(self, use_cache: bool = True, workers: int = 1):
         self.rbac_path = "./RBAC Plantilla Aplicaciones OPICS.xlsx"
 
+        self.use_cache = use_cache
+        self.cache = Fingerprint_Cache(namespace="rbac")
+        self.cached_workbook = {"sheet_names": None, "sheets": {}}
+
+        # Fingerprint of the workbook taken when it was last opened, before reading it, and whether
+        # `cached_workbook` has sheets that are not stored yet. The cache is written once, when the
+        # outermost `workbook_session` ends, see `store_cached_data`.
+        self.workbook_fingerprint: dict | None = None
+        self.cached_workbook_changed = False
+
+        # Processes that parse the sheets in `analyze_rbac_report` and `convert_sheets_to_json`, one
+        # parses them serially.
+        self.workers = workers
+
+        self.raw_data: pd.ExcelFile | None = None
+        self.workbook_session_open = False
         self.sheet_names = []
 
-        self.rbac_data = {
-            RBAC_Keys.GOVERNMENT: [],
-            RBAC_Keys.GROUP_TRANSACTION: [],
-            RBAC_Keys.GROUPS: [],
-            RBAC_Keys.PROFILES_GROUPS: [],
-            RBAC_Keys.PROFILES_USERS: [],
-            RBAC_Keys.PROFILES: []
+        # Columns read from each sheet, by normalized header. Sheets not listed here are read whole.
+        self.sheet_columns = {
+            RBAC_Keys.PROFILES_USERS: (
+                RBAC_Keys.USER, RBAC_Keys.WINDOWS_USER, OPICS_Keys.USERNAME, RBAC_Profile_Keys.PROFILE,
+                RBAC_Keys.POSITION
+            ),
+            RBAC_Keys.PROFILES_GROUPS: (RBAC_Profile_Group_Keys.PROFILE, RBAC_Profile_Group_Keys.GROUPS),
+            RBAC_Keys.PROFILES: (RBAC_Profile_Keys.PROFILE, RBAC_Profile_Keys.DESCRIPTION),
         }
 
+        self.rbac_data = Lazy_Sheets(self.load_sheet)
+
+        self.profile_groups_index: dict[str, list[str]] | None = None
+
+        # Sheets loaded elsewhere, by `load_workbook_sheets`, and the version of the workbook they
+        # belong to. They are used by the next analysis instead of the cache.
+        self.preloaded_workbook: tuple[dict, tuple[int, int]] | None = None
+
+        # Receives the sheets and rows loaded by `analyze_rbac_report`, see `Progress_Reporter`.
+        self.progress_callback: Progress_Callback | None = None
+        self.progress: Progress_Reporter | None = None
+
        
     def analyze_rbac_report(self):
         """
-        The function `analyze_rbac_report` reads RBAC information, converts sheets to JSON format, and
-        likely performs further analysis.
+        The function `analyze_rbac_report` prepares a new analysis of the workbook and assigns the
+        groups of each user. Sheets are parsed lazily, the first time they are accessed in `rbac_data`,
+        and the ones already parsed for the current version of the workbook are taken from the cache.
         """
-        raw_data = self.read_rbac_info()
-        self.convert_sheets_to_json(raw_data)
-        self.depure_profiles_data()
-        self.define_profile_groups()
-        self.define_users_groups()
+        with span("Analizar libro RBAC"):
+            self.rbac_data = Lazy_Sheets(self.load_sheet)
+            self.profile_groups_index = None
+
+            self.load_cached_data()
+
+            # `define_users_groups` loads the "perfil-grupo" and "perfil-usuario" sheets.
+            self.progress = Progress_Reporter(self.progress_callback, "Leyendo libro RBAC", 2, "hojas")
+
+            try:
+                with self.workbook_session():
+                    self.load_sheets_in_parallel(tuple(self.sheet_columns))
+                    self.define_users_groups()
+
+                self.progress.finish()
+            finally:
+                self.progress = None
 
     
+    def load_cached_data(self) -> bool:
+        """
+        The function `load_cached_data` loads the cached sheet names and normalized sheets of the
+        workbook, if the cache is enabled and the workbook fingerprint still matches.
+        :return: `True` when a valid cache entry was found, `False` otherwise.
+        """
+        self.cached_workbook = {"sheet_names": None, "sheets": {}}
+
+        if self.load_preloaded_workbook():
+            return True
+
+        if not self.use_cache:
+            return False
+
+        cached_workbook = self.cache.load(self.rbac_path)
+
+        if cached_workbook is None:
+            return False
+
+        self.cached_workbook = cached_workbook
+        self.sheet_names = cached_workbook["sheet_names"] or []
+        return True
+
+
+    def preload_workbook(self, workbook: dict, version: tuple[int, int]) -> None:
+        """
+        The function `preload_workbook` hands over sheets loaded by `load_workbook_sheets`, usually in
+        another process, to be used by the next analysis.
+
+        :param workbook: The `workbook` parameter is the loaded sheets, in the format of
+        `cached_workbook`
+        :type workbook: dict
+        :param version: The `version` parameter is the size and modification time of the workbook
+        that was read
+        :type version: tuple[int, int]
+        """
+        self.preloaded_workbook = (workbook, version)
+
+
+    def load_preloaded_workbook(self) -> bool:
+        """
+        The function `load_preloaded_workbook` takes the preloaded sheets, if the workbook has not
+        changed since they were read.
+        :return: `True` when the preloaded sheets were taken, `False` otherwise.
+        """
+        if self.preloaded_workbook is None:
+            return False
+
+        workbook, version = self.preloaded_workbook
+        self.preloaded_workbook = None
+
+        try:
+            stat = os.stat(self.rbac_path)
+        except OSError:
+            return False
+
+        if version != (stat.st_size, stat.st_mtime_ns):
+            return False
+
+        self.cached_workbook = workbook
+        self.sheet_names = workbook["sheet_names"] or []
+        return True
+
+
+    def store_cached_data(self) -> None:
+        """
+        The function `store_cached_data` saves the sheet names and the normalized sheets parsed so far
+        in the cache, with the fingerprint taken when the workbook was opened.
+        """
+        self.cached_workbook_changed = False
+
+        if self.use_cache:
+            self.cache.store(self.rbac_path, self.cached_workbook, self.workbook_fingerprint)
+
+
+    def invalidate_cache(self) -> None:
+        """
+        The function `invalidate_cache` removes the cached sheets of the workbook, forcing the next
+        analysis to parse it again.
+        """
+        self.cache.invalidate(self.rbac_path)
+        self.cached_workbook = {"sheet_names": None, "sheets": {}}
+
+
     def read_rbac_info(self) -> pd.ExcelFile:
         """
         This function reads RBAC information from an Excel file specified by the `rbac_path` attribute.
+        The workbook is opened with openpyxl in read-only streaming mode.
         :return: An instance of `pd.ExcelFile` containing the RBAC information from the file located at
         `self.rbac_path`.
         """
-        return pd.ExcelFile(self.rbac_path)
+        import pandas as pd
+
+        with span("Abrir libro RBAC"):
+            return pd.ExcelFile(self.rbac_path, engine="openpyxl", engine_kwargs={"read_only": True})
+
+
+    @contextmanager
+    def workbook_session(self) -> Iterator[None]:
+        """
+        The function `workbook_session` groups the sheet loads made inside it, so the workbook is opened
+        at most once, only if a sheet is not cached, and closed when the outermost session ends. This
+        way the file is not kept locked between analyses. The sheets parsed in the session are stored
+        in the cache when it ends.
+        """
+        outermost = not self.workbook_session_open
+        self.workbook_session_open = True
+
+        try:
+            yield
+        finally:
+            if outermost:
+                self.workbook_session_open = False
+
+                if self.raw_data is not None:
+                    self.raw_data.close()
+                    self.raw_data = None
+
+                if self.cached_workbook_changed:
+                    self.store_cached_data()
+
+
+    def get_workbook(self) -> pd.ExcelFile:
+        """
+        The function `get_workbook` returns the workbook opened in the current session, opening it on
+        first use.
+        :return: An instance of `pd.ExcelFile`.
+        """
+        if self.raw_data is None:
+            # The fingerprint is taken before reading, so the cache never describes a newer file than
+            # the one parsed.
+            if self.use_cache:
+                self.workbook_fingerprint = file_fingerprint(self.rbac_path)
+
+            self.raw_data = self.read_rbac_info()
+
+        return self.raw_data
+
+
+    def get_sheet_names(self) -> dict[str, str]:
+        """
+        The function `get_sheet_names` returns the sheets of the workbook by normalized name, taking
+        the names from the cache when possible so the workbook is not opened.
+        :return: A dictionary that maps each normalized sheet name to the name in the workbook.
+        """
+        if self.cached_workbook["sheet_names"] is None:
+            with self.workbook_session():
+                self.cached_workbook["sheet_names"] = list(self.get_workbook().sheet_names)
+                self.cached_workbook_changed = True
+
+        self.sheet_names = self.cached_workbook["sheet_names"]
+
+        return {normalize_str(sheet): sheet for sheet in self.sheet_names}
+
+
+    def load_sheet(self, key: str) -> list[dict]:
+        """
+        The function `load_sheet` returns the normalized records of a sheet, parsing only the columns
+        listed in `sheet_columns`. It is called by `rbac_data` the first time a sheet is accessed.
+
+        :param key: The `key` parameter is the normalized name of the sheet
+        :type key: str
+        :return: The records of the sheet. Known sheets missing in the workbook are empty.
+        """
+        with span("Cargar hoja", sheet=getattr(key, "value", key)) as sheet_span:
+            columns = self.get_sheet_columns(key)
+            cached_sheet = self.get_cached_sheet(key, columns)
+
+            if cached_sheet is not None:
+                sheet_span.set(records=len(cached_sheet["records"]), cached=True)
+                self.report_sheet_loaded(cached_sheet["records"])
+                return cached_sheet["records"]
+
+            with self.workbook_session():
+                sheet = self.get_sheet_names().get(key)
+
+                if sheet is None:
+                    if key in tuple(RBAC_Keys):
+                        return []
+                    raise KeyError(key)
+
+                records = self.cache_sheet(key, columns, self.parse_sheet(sheet, columns))
+
+            sheet_span.set(records=len(records), cached=False)
+            self.report_sheet_loaded(records)
+
+            return records
+
+
+    def get_sheet_columns(self, key: str) -> tuple[str, ...] | None:
+        """
+        The function `get_sheet_columns` returns the normalized headers read from a sheet.
+
+        :param key: The `key` parameter is the normalized name of the sheet
+        :type key: str
+        :return: The headers listed in `sheet_columns`, or `None` when the whole sheet is read.
+        """
+        columns = self.sheet_columns.get(key)
+
+        return tuple(str(column.value) for column in columns) if columns else None
+
+
+    def get_cached_sheet(self, key: str, columns: tuple[str, ...] | None) -> dict | None:
+        """
+        The function `get_cached_sheet` returns a sheet of `cached_workbook`, if it was read with the
+        given columns.
+
+        :param key: The `key` parameter is the normalized name of the sheet
+        :type key: str
+        :param columns: The `columns` parameter is the normalized headers to read
+        :type columns: tuple[str, ...] | None
+        :return: The cached sheet, with its `columns` and `records`, or `None`.
+        """
+        cached_sheet = self.cached_workbook["sheets"].get(key)
+
+        if cached_sheet is None or cached_sheet["columns"] != columns:
+            return None
+
+        return cached_sheet
+
+
+    def cache_sheet(self, key: str, columns: tuple[str, ...] | None, records: list[dict]) -> list[dict]:
+        """
+        The function `cache_sheet` keeps the parsed records of a sheet in `cached_workbook`, to be stored
+        when the workbook session ends. Only the profiles in use are kept.
+
+        :param key: The `key` parameter is the normalized name of the sheet
+        :type key: str
+        :param columns: The `columns` parameter is the normalized headers that were read
+        :type columns: tuple[str, ...] | None
+        :param records: The `records` parameter is the parsed records of the sheet
+        :type records: list[dict]
+        :return: The records kept.
+        """
+        if key == RBAC_Keys.PROFILES:
+            records = self.filter_profiles(records)
+
+        self.cached_workbook["sheets"][key] = {"columns": columns, "records": records}
+        self.cached_workbook_changed = True
+
+        return records
+
+
+    def load_sheets_in_parallel(self, keys: tuple[str, ...]) -> None:
+        """
+        The function `load_sheets_in_parallel` parses the sheets that are not cached yet in a pool of
+        `workers` processes, each one opening the workbook by path, and keeps them in `cached_workbook`
+        so `rbac_data` finds them there. It does nothing with one worker or one sheet to parse, the
+        sheets are then parsed serially the first time they are accessed.
+
+        :param keys: The `keys` parameter is the normalized names of the sheets
+        :type keys: tuple[str, ...]
+        """
+        if self.workers <= 1:
+            return
+
+        with self.workbook_session():
+            sheet_names = self.get_sheet_names()
+
+            pending = []
+
+            for key in keys:
+                columns = self.get_sheet_columns(key)
+
+                if key in sheet_names and self.get_cached_sheet(key, columns) is None:
+                    pending.append((key, sheet_names[key], columns))
+
+            workers = min(self.workers, len(pending))
+
+            if workers <= 1:
+                return
+
+            # The fingerprint is taken before the processes read the workbook, as in `get_workbook`.
+            if self.use_cache and self.raw_data is None:
+                self.workbook_fingerprint = file_fingerprint(self.rbac_path)
+
+            # Imported here, the process pool is only needed with more than one worker.
+            from concurrent.futures import ProcessPoolExecutor
+
+            with span("Leer hojas en paralelo", sheets=len(pending), workers=workers):
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(convert_sheet_columns, self.rbac_path, sheet, columns)
+                        for _, sheet, columns in pending
+                    ]
+
+                    for (key, _, columns), future in zip(pending, futures):
+                        self.cache_sheet(key, columns, self.columns_to_records(*future.result()))
+
+
+    def report_sheet_loaded(self, records: list[dict]) -> None:
+        """
+        The function `report_sheet_loaded` adds a loaded sheet and its rows to the progress of the
+        current analysis, if any.
+
+        :param records: The `records` parameter is the list of records of the sheet
+        :type records: list[dict]
+        """
+        if self.progress is None:
+            return
+
+        self.progress.update(
+            self.progress.done + 1, force=True, rows=self.progress.counts.get("rows", 0) + len(records)
+        )
+
+
+    def parse_sheet(self, sheet: str, columns: tuple[str, ...] | None = None) -> list[dict]:
+        """
+        The function `parse_sheet` parses one sheet of the workbook into normalized records.
+
+        :param sheet: The `sheet` parameter is the name of the sheet in the workbook
+        :type sheet: str
+        :param columns: The `columns` parameter is the normalized headers to read, or `None` to read
+        every column, defaults to `None` (optional)
+        :type columns: tuple[str, ...] | None
+        :return: A list of dictionaries, one per row of the sheet.
+        """
+        return self.dataframe_to_json_compatible(self.read_sheet(sheet, columns))
+
+
+    def read_sheet(self, sheet: str, columns: tuple[str, ...] | None = None) -> pd.DataFrame:
+        """
+        The function `read_sheet` reads one sheet of the workbook into a DataFrame.
+
+        :param sheet: The `sheet` parameter is the name of the sheet in the workbook
+        :type sheet: str
+        :param columns: The `columns` parameter is the normalized headers to read, or `None` to read
+        every column, defaults to `None` (optional)
+        :type columns: tuple[str, ...] | None
+        :return: The sheet, with the headers of the workbook.
+        """
+        usecols = (lambda header: normalize_str(str(header)) in columns) if columns else None
+
+        with self.workbook_session():
+            workbook = self.get_workbook()
+
+            # pandas parses the whole sheet in one call, so the stage is reported without a total while
+            # it runs and with the rows read when it ends.
+            progress = Progress_Reporter(self.progress_callback, f"Leyendo hoja {sheet}", unit="filas")
+
+            with span("Leer hoja", sheet=sheet) as parse_span:
+                dataframe = workbook.parse(sheet, usecols=usecols)
+                parse_span.set(rows=len(dataframe), columns=len(dataframe.columns))
+
+            progress.update(len(dataframe), force=True)
+
+        return dataframe
     
     
-    def convert_sheets_to_json(self, raw_data: pd.ExcelFile) -> None:
+    def convert_sheets_to_json(self, raw_data: pd.ExcelFile, workers: int | None = None) -> None:
         """
-        The function `convert_sheets_to_json` reads data from an Excel file, converts it to JSON format,
-        and saves each sheet as a separate JSON file.
+        The function `convert_sheets_to_json` eagerly reads every sheet of the Excel file with all its
+        columns and stores it in `rbac_data`. With more than one worker the sheets are parsed and
+        normalized in a process pool by `convert_sheet_columns`, each process opening the workbook by
+        path, and only merged into records here.
         
         :param raw_data: The `raw_data` parameter in the `convert_sheets_to_json` function is expected
         to be an instance of `pd.ExcelFile`, which represents an Excel file. This parameter is used to
         read data from the Excel file and convert it into JSON format
         :type raw_data: pd.ExcelFile
+        :param workers: The `workers` parameter is the number of processes, defaults to `self.workers`
+        (optional)
+        :type workers: int | None
         """
+        workers = min(workers or self.workers, len(raw_data.sheet_names))
+        rbac_path = raw_data.io if isinstance(raw_data.io, (str, os.PathLike)) else None
+
+        if workers > 1 and rbac_path is not None:
+            self.convert_sheets_in_parallel(os.fspath(rbac_path), raw_data.sheet_names, workers)
+            return
+
         for sheet in raw_data.sheet_names:
             dataframe = raw_data.parse(sheet)
             json_data = self.dataframe_to_json_compatible(dataframe)
             
             self.rbac_data[normalize_str(sheet)] = json_data
+
+
+    def convert_sheets_in_parallel(self, rbac_path: str, sheets: list[str], workers: int) -> None:
+        """
+        The function `convert_sheets_in_parallel` converts the sheets of a workbook in a process pool
+        and stores them in `rbac_data`, in the order of the workbook.
+
+        :param rbac_path: The `rbac_path` parameter is the location of the workbook
+        :type rbac_path: str
+        :param sheets: The `sheets` parameter is the names of the sheets to convert
+        :type sheets: list[str]
+        :param workers: The `workers` parameter is the number of processes
+        :type workers: int
+        """
+        # Imported here, the process pool is only needed for the eager conversion.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(convert_sheet_columns, rbac_path, sheet) for sheet in sheets]
+
+            for sheet, future in zip(sheets, futures):
+                self.rbac_data[normalize_str(sheet)] = self.columns_to_records(*future.result())
             
     
     def dataframe_to_json_compatible(self, dataframe: pd.DataFrame) -> list[dict]:
@@ -65,8 +597,8 @@ class Analyze_RBAC():
         
         :param dataframe: The `dataframe_to_json_compatible` function takes a pandas DataFrame as input
         and converts it into a list of dictionaries that are compatible with JSON format. The function
-        first replaces any NaN values in the DataFrame with `None`. Then, it iterates over each row in
-        the DataFrame, converts the keys
+        first replaces any NaN values in the DataFrame with `None`. Then, it normalizes the headers once
+        and cleans the values column by column, building the rows only at the end
         :type dataframe: pd.DataFrame
         :return: The function `dataframe_to_json_compatible` returns a list of dictionaries where each
         dictionary represents a row in the input DataFrame `dataframe`. The keys in the dictionaries are
@@ -74,17 +606,117 @@ class Analyze_RBAC():
         processed to replace newline characters with spaces if the value is a string. The final output
         is a list of dictionaries that are compatible with JSON serialization.
         """
+        return self.columns_to_records(*self.dataframe_to_columns(dataframe))
+
+
+    def dataframe_to_columns(self, dataframe: pd.DataFrame) -> tuple[list[str], list[list], int]:
+        """
+        The function `dataframe_to_columns` normalizes the headers of a DataFrame and cleans its values
+        column by column. The result is compact to send between processes, the headers are not repeated
+        in every row.
+
+        :param dataframe: The `dataframe` parameter is the parsed sheet
+        :type dataframe: pd.DataFrame
+        :return: The normalized headers, the list of values of each column and the number of rows.
+        """
+        import pandas as pd
+
         dataframe = dataframe.where(pd.notnull(dataframe), None)
 
-        return [
-            {
-                normalize_str(key): (unidecode(value.replace('\n', ' ')) if isinstance(value, str) else value)
-                for key, value in row.items()
-            }
-            for row in dataframe.to_dict(orient="records")
-        ]
+        with span("Normalizar encabezados", columns=len(dataframe.columns)):
+            headers = [normalize_str(str(key)) for key in dataframe.columns]
+
+        with span("Limpiar columnas", rows=len(dataframe)):
+            columns = [self.clean_column(dataframe.iloc[:, position]) for position in range(len(headers))]
+
+        return headers, columns, len(dataframe)
+
+
+    @staticmethod
+    def columns_to_records(headers: list[str], columns: list[list], n_rows: int) -> list[dict]:
+        """
+        The function `columns_to_records` builds the records of a sheet converted by
+        `dataframe_to_columns`.
+
+        :param headers: The `headers` parameter is the normalized headers
+        :type headers: list[str]
+        :param columns: The `columns` parameter is the list of values of each column
+        :type columns: list[list]
+        :param n_rows: The `n_rows` parameter is the number of rows, needed when there are no columns
+        :type n_rows: int
+        :return: A list of dictionaries, one per row.
+        """
+        if not columns:
+            return [{} for _ in range(n_rows)]
+
+        return [dict(zip(headers, row)) for row in zip(*columns)]
+
+
+    def clean_column(self, column: pd.Series) -> list:
+        """
+        The function `clean_column` returns the values of a column as Python objects, cleaning the text
+        ones. Columns that only hold text are factorized, so each distinct value is cleaned once with
+        vectorized string operations and then spread back to the rows.
+
+        :param column: The `column` parameter is a column of the DataFrame, with nulls already replaced
+        by `None` in text columns
+        :type column: pd.Series
+        :return: A list with one value per row.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if column.dtype != object:
+            return column.tolist()
+
+        if pd.api.types.infer_dtype(column, skipna=True) != "string":
+            return [clean_cell_value(value) if isinstance(value, str) else value for value in column.tolist()]
+
+        codes, uniques = pd.factorize(column)
+        uniques = uniques.str.replace('\n', ' ', regex=False)
+
+        cleaned = np.array([unidecode_value(value) for value in uniques] + [None], dtype=object)
+
+        return cleaned[codes].tolist()
     
 
+    def get_profile_groups_index(self) -> dict[str, list[str]]:
+        """
+        The function `get_profile_groups_index` returns the index that maps each profile to its groups,
+        building it from the "perfil-grupo" sheet the first time it is requested in each analysis.
+        :return: A dictionary that maps each profile to the list of its groups, without duplicates and in
+        order of appearance.
+        """
+        if self.profile_groups_index is None:
+            self.profile_groups_index = self.build_profile_groups_index()
+
+        return self.profile_groups_index
+
+
+    def build_profile_groups_index(self) -> dict[str, list[str]]:
+        """
+        The function `build_profile_groups_index` walks the "perfil-grupo" sheet once, collecting the
+        groups of each profile in insertion ordered sets (dictionary keys).
+        :return: A dictionary that maps each profile to the list of its groups.
+        """
+        profiles_groups: dict[str, dict[str, None]] = {}
+        rows = self.rbac_data[RBAC_Keys.PROFILES_GROUPS]
+
+        with span("Resolver grupos de perfiles", rows=len(rows)) as resolve_span:
+            for i in rows:
+                group = i[RBAC_Profile_Group_Keys.GROUPS]
+
+                if group is None:
+                    continue
+
+                profile = i[RBAC_Profile_Group_Keys.PROFILE]
+                profiles_groups.setdefault(profile, {})[group.strip()] = None
+
+            resolve_span.set(profiles=len(profiles_groups))
+
+        return {profile: list(groups) for profile, groups in profiles_groups.items()}
+
+
     def define_profile_groups(self) -> list[dict]:
         """
         This Python function defines profile groups based on input data and returns a list of
@@ -92,47 +724,35 @@ class Analyze_RBAC():
         :return: The function `define_profile_groups` returns a list of dictionaries where each
         dictionary represents a profile and its associated groups.
         """
-        raw_profiles_groups = self.rbac_data[RBAC_Keys.PROFILES_GROUPS]
-
-        profiles_groups = []
-        
-        for i in raw_profiles_groups:
-            profile = i[RBAC_Profile_Group_Keys.PROFILE]
-            
-            profile_exists = next(
-                (
-                    profile_group 
-                    for profile_group in profiles_groups 
-                    if profile_group[RBAC_Profile_Group_Keys.PROFILE] == profile
-                ), 
-                None
-            )
-
-            group = i[RBAC_Profile_Group_Keys.GROUPS].strip()
-
-            if not profile_exists:
-                profiles_groups.append({RBAC_Profile_Group_Keys.PROFILE: profile, RBAC_Profile_Group_Keys.GROUPS: [group]})
-            else:
-                if group not in profile_exists[RBAC_Profile_Group_Keys.GROUPS]:
-                    profile_exists[RBAC_Profile_Group_Keys.GROUPS].append(group)
-
-        return profiles_groups
+        return [
+            {RBAC_Profile_Group_Keys.PROFILE: profile, RBAC_Profile_Group_Keys.GROUPS: groups}
+            for profile, groups in self.get_profile_groups_index().items()
+        ]
     
 
     def define_users_groups(self):
         """
         The function `define_users_groups` assigns groups to user profiles based on profile-group
-        mappings.
-        :return: The function `define_users_groups` is returning the updated
-        `self.rbac_data[RBACKeys.PROFILES_USERS]` after assigning the corresponding groups to each user
-        profile based on the matching profile in `profiles_groups`.
+        mappings. The users with groups are copied, the records of the sheet are shared with
+        `cached_workbook` and the groups are not part of the cache.
+        :return: The function `define_users_groups` replaces `self.rbac_data[RBACKeys.PROFILES_USERS]`
+        with the users of the sheet, each with the groups of its profile in `profiles_groups`.
         """
-        profiles_groups = self.define_profile_groups()
+        profiles_groups = self.get_profile_groups_index()
+        users = self.rbac_data[RBAC_Keys.PROFILES_USERS]
+
+        with span("Asignar grupos a usuarios", users=len(users)):
+            users_groups = []
+
+            for i in users:
+                groups = profiles_groups.get(i[RBAC_Profile_Keys.PROFILE])
+
+                if groups is not None:
+                    i = {**i, RBAC_Profile_Group_Keys.GROUPS: groups}
+
+                users_groups.append(i)
 
-        for i in self.rbac_data[RBAC_Keys.PROFILES_USERS]:    
-            for j in profiles_groups:
-                if j[RBAC_Profile_Keys.PROFILE] == i[RBAC_Profile_Keys.PROFILE]:
-                    i[RBAC_Profile_Group_Keys.GROUPS] = j[RBAC_Profile_Group_Keys.GROUPS]
+            self.rbac_data[RBAC_Keys.PROFILES_USERS] = users_groups
 
     
     def depure_profiles_data(self):
@@ -140,7 +760,19 @@ class Analyze_RBAC():
         This function filters out profiles with a non-None "perfil" attribute that does not contain the
         substring "Nota: ".
         """
-        self.rbac_data[RBAC_Keys.PROFILES] = [
-            profile for profile in self.rbac_data[RBAC_Keys.PROFILES]
+        self.rbac_data[RBAC_Keys.PROFILES] = self.filter_profiles(self.rbac_data[RBAC_Keys.PROFILES])
+
+
+    def filter_profiles(self, profiles: list[dict]) -> list[dict]:
+        """
+        The function `filter_profiles` keeps the profiles with a non-None "perfil" attribute that does
+        not contain the substring "Nota: ".
+
+        :param profiles: The `profiles` parameter is the records of the "perfiles" sheet
+        :type profiles: list[dict]
+        :return: The filtered list of profiles.
+        """
+        return [
+            profile for profile in profiles
             if profile[RBAC_Profile_Keys.PROFILE] is not None and "Nota: " not in profile[RBAC_Profile_Keys.PROFILE]
         ]
\ No newline at end of file
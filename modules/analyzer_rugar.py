@@ -1,11 +1,50 @@
+import io
+import mmap
+import os
 import re
+from collections.abc import Iterable, Iterator, Mapping
 from pathlib import Path
 
-from utils import OPICS_Keys, RUGAR_Keys
+from utils import OPICS_Keys, RUGAR_Keys, Fingerprint_Cache, Progress_Callback, Progress_Reporter, span
+
+
+# Name of the RUGAR reports in the reports folder, with their date as YYYYMMDD.
+REPORT_NAME_PATTERN = re.compile(r'^R01RUGAR_(\d{8})\.rpt$', re.IGNORECASE)
+
+# Reports smaller than this are always parsed in the current process, starting a pool costs more
+# than reading them.
+PARALLEL_MIN_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+
+def parse_report_chunk(report_path: str, start: int, end: int, phrases_to_discard: list[str]) -> list[dict]:
+    """
+    The function `parse_report_chunk` parses the operators found between two record aligned byte
+    offsets of a report. It is defined at module level so it can run in a process pool.
+
+    :param report_path: The `report_path` parameter is the location of the report
+    :type report_path: str
+    :param start: The `start` parameter is the byte offset where the chunk begins
+    :type start: int
+    :param end: The `end` parameter is the byte offset where the chunk ends
+    :type end: int
+    :param phrases_to_discard: The `phrases_to_discard` parameter is the list of phrases of the
+    analyzer that requested the chunk
+    :type phrases_to_discard: list[str]
+    :return: The operators of the chunk, with the duplicated blocks already merged.
+    """
+    rugar = Analyze_RUGAR(use_cache=False)
+    rugar.phrases_to_discard = phrases_to_discard
+
+    with open(report_path, mode="rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        lines = io.TextIOWrapper(io.BytesIO(mapped[start:end]), encoding="utf-8")
+        rugar.define_users_info(rugar.iter_clean_lines(lines))
+
+    return rugar.users_info
 
 
 class Analyze_RUGAR():
-    def __init__(self):
+    def __init__(self, use_cache: bool = True, workers: int = 1, report_date: str | None = None):
         self.phrases_to_discard = [
             '*', 'Users Group Access Report', 'System date', 
             'Branch processing date', 'Alternate Oper ID', 
@@ -13,64 +52,348 @@ class Analyze_RUGAR():
         ]
 
         self.report_date = ""
-        # self.report_path = f"R:\\SSETPI\\Proyectos_SSETPI\\Perfiles OPICS\\Reportes OPICS\\"
-        self.report_path = f".\\"
+        # self.reports_folder = f"R:\\SSETPI\\Proyectos_SSETPI\\Perfiles OPICS\\Reportes OPICS\\"
+        self.reports_folder = f".\\"
+        self.report_path = ""
         
-        self.users_info = []
+        self.operators: dict[str, dict] = {}
+        self.users_info_view: list[dict] | None = None
+
+        self.use_cache = use_cache
+        self.cache = Fingerprint_Cache(namespace="rugar")
 
-        self.set_report_date()
+        self.workers = workers
+
+        # Receives the progress of the parse, see `Progress_Reporter`.
+        self.progress_callback: Progress_Callback | None = None
+        self.report_file = None
+
+        self.set_report_date(report_date)
         self.set_report_path()
 
     
+    @property
+    def users_info(self) -> list[dict]:
+        """
+        The property `users_info` is the list of operators of the report, in order of appearance and
+        with their groups as lists. It is derived from the `operators` index and rebuilt only after the
+        index changes.
+        :return: A list of dictionaries with the operator id, name and groups.
+        """
+        if self.users_info_view is None:
+            self.users_info_view = [
+                {
+                    OPICS_Keys.USER: operator[OPICS_Keys.USER],
+                    OPICS_Keys.USERNAME: operator[OPICS_Keys.USERNAME],
+                    OPICS_Keys.GROUPS: list(operator[OPICS_Keys.GROUPS])
+                }
+                for operator in self.operators.values()
+            ]
+
+        return self.users_info_view
+
+
+    @users_info.setter
+    def users_info(self, users_info: list[dict]) -> None:
+        """
+        The setter of `users_info` replaces the operators of the object, rebuilding the index.
+
+        :param users_info: The `users_info` parameter is a list of operator records
+        :type users_info: list[dict]
+        """
+        self.operators = {}
+        self.users_info_view = None
+
+        for operator in users_info:
+            self.merge_operator(operator)
+
+
     def get_users_info(self) -> dict:
         """
         This function returns the users' information stored in the object.
-        :return: The method `get_users_info` is returning the `users_info` attribute of the object.
+        :return: The method `get_users_info` returns a dictionary that maps each operator id to its record
+        in `users_info`.
         """
-        return dict(self.users_info)
+        return {user[OPICS_Keys.USER]: user for user in self.users_info}
 
 
     def analyze_rugar_report(self) -> None:
         """
         The `analyze_report` function processes a report by setting the date and path, extracting and
-        cleaning lines, depuring data, and printing user information.
+        cleaning lines, depuring data, and printing user information. A report that was already parsed
+        and has not changed is taken from the cache. With more than one worker, big reports are parsed
+        in parallel by `analyze_rugar_report_parallel`.
         """
-        original_lines = self.extract_lines()
-        clean_lines = self.clean_unnecessary_lines(original_lines)
+        with span("Analizar reporte RUGAR") as analysis:
+            if self.load_cached_data():
+                analysis.set(operators=len(self.operators), cached=True)
+                return
+
+            self.users_info = []
+
+            progress = Progress_Reporter(
+                self.progress_callback, "Leyendo reporte RUGAR", os.path.getsize(self.report_path), "bytes"
+            )
+
+            if self.workers > 1 and progress.total >= PARALLEL_MIN_CHUNK_SIZE * 2:
+                self.analyze_rugar_report_parallel(self.workers, progress)
+            else:
+                # The stages of the pipeline run interleaved, line by line, so their time is accumulated.
+                lines = analysis.timed(self.iter_report_lines(), "Leer líneas")
+                clean_lines = analysis.timed(self.iter_clean_lines(lines), "Limpiar líneas")
+                merge = analysis.stage("Unir operadores")
+
+                for operator in analysis.timed(self.iter_operators(clean_lines), "Separar operadores"):
+                    with merge:
+                        self.merge_operator(operator)
+
+                    if progress.due():
+                        progress.update(self.report_position(), operators=len(self.operators))
+
+            progress.finish(operators=len(self.operators))
+            analysis.set(bytes=progress.total, operators=len(self.operators), cached=False)
 
-        self.define_users_info(clean_lines)
+            self.store_cached_data()
 
 
-    def set_report_date(self) -> None:
+    def analyze_rugar_report_parallel(self, workers: int | None = None, progress: Progress_Reporter | None = None) -> None:
+        """
+        The function `analyze_rugar_report_parallel` splits the memory mapped report in record aligned
+        chunks, parses them in a process pool and merges the operators in the order of the report, so
+        operators repeated across chunks get the union of their groups as in `merge_operator`.
+
+        :param workers: The `workers` parameter is the number of processes, defaults to the number of
+        CPUs (optional)
+        :type workers: int | None
+        :param progress: The `progress` parameter receives the bytes and operators merged after each
+        chunk, defaults to `None` (optional)
+        :type progress: Progress_Reporter | None
+        """
+        # Imported here, the process pool is only needed for big reports.
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = workers or os.cpu_count() or 1
+        chunks = self.split_report_chunks(workers * 4)
+
+        with (
+            span("Leer reporte en paralelo", workers=workers, chunks=len(chunks)) as parallel,
+            ProcessPoolExecutor(max_workers=workers) as executor
+        ):
+            futures = [
+                executor.submit(parse_report_chunk, self.report_path, start, end, self.phrases_to_discard)
+                for start, end in chunks
+            ]
+
+            wait, merge = parallel.stage("Esperar bloques"), parallel.stage("Unir operadores")
+
+            for (_, end), future in zip(chunks, futures):
+                with wait:
+                    operators = future.result()
+
+                with merge:
+                    for operator in operators:
+                        self.merge_operator(operator)
+
+                if progress is not None:
+                    progress.update(end, operators=len(self.operators))
+
+
+    def find_record_offsets(self, mapped: mmap.mmap, start: int = 0) -> Iterator[int]:
+        """
+        The function `find_record_offsets` finds the byte offsets of the lines where an operator record
+        begins, that is, the lines containing "OperatorID: ".
+
+        :param mapped: The `mapped` parameter is the memory mapped report
+        :type mapped: mmap.mmap
+        :param start: The `start` parameter is the offset where the search begins, defaults to 0
+        :type start: int
+        :return: An iterator over the offsets of the beginning of each record line.
+        """
+        marker = RUGAR_Keys.OPERATOR_ID.value.encode("utf-8")
+        position = mapped.find(marker, start)
+
+        while position != -1:
+            yield mapped.rfind(b"\n", 0, position) + 1
+            position = mapped.find(marker, position + len(marker))
+
+
+    def split_report_chunks(self, n_chunks: int) -> list[tuple[int, int]]:
+        """
+        The function `split_report_chunks` splits the report in up to `n_chunks` byte ranges of similar
+        size. Every range begins on a record boundary, so no operator is cut between two chunks.
+
+        :param n_chunks: The `n_chunks` parameter is the desired number of chunks
+        :type n_chunks: int
+        :return: A list of `(start, end)` byte offsets covering the whole report.
+        """
+        report = Path(self.report_path)
+
+        if not report.exists():
+            raise FileNotFoundError(f"Archivo no encontrado: {report}")
+
+        size = report.stat().st_size
+        chunk_size = max(size // max(n_chunks, 1), PARALLEL_MIN_CHUNK_SIZE)
+        boundaries = [0]
+
+        with report.open("rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in self.find_record_offsets(mapped):
+                if offset - boundaries[-1] >= chunk_size:
+                    boundaries.append(offset)
+
+        boundaries.append(size)
+
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+    def load_cached_data(self) -> bool:
+        """
+        The function `load_cached_data` replaces `users_info` with the cached operators of the report,
+        if the cache is enabled and the report fingerprint still matches.
+        :return: `True` when the operators were loaded from the cache, `False` otherwise.
+        """
+        if not self.use_cache or not Path(self.report_path).exists():
+            return False
+
+        cached_users_info = self.cache.load(self.report_path)
+
+        if cached_users_info is None:
+            return False
+
+        self.users_info = cached_users_info
+        return True
+
+
+    def store_cached_data(self) -> None:
+        """
+        The function `store_cached_data` saves the parsed operators of the report in the cache.
+        """
+        if self.use_cache:
+            self.cache.store(self.report_path, self.users_info)
+
+
+    def invalidate_cache(self) -> None:
+        """
+        The function `invalidate_cache` removes the cached operators of the report, forcing the next
+        analysis to parse it again.
+        """
+        self.cache.invalidate(self.report_path)
+
+
+    def set_report_date(self, report_date: str | None = None) -> None:
         """
         The function `set_report_date` sets the report date attribute to a specific value.
+
+        :param report_date: The `report_date` parameter is the date of the report as YYYYMMDD, defaults
+        to the last reviewed date (optional)
+        :type report_date: str | None
         """
         # self.report_date = input("Por favor, ingrese la fecha del reporte a validar: ").strip()
-        self.report_date = "20241030"
+        self.report_date = report_date or "20241030"
 
     
     def set_report_path(self) -> None:
         """
-        The function `set_report_path` appends a specific string and the report date to the existing
-        report path.
+        The function `set_report_path` builds the report path from the reports folder and the report
+        date.
+        """
+        self.report_path = self.report_path_for(self.report_date)
+
+
+    def report_path_for(self, report_date: str) -> str:
+        """
+        The function `report_path_for` returns the path of the RUGAR report of a given date.
+
+        :param report_date: The `report_date` parameter is the date of the report as YYYYMMDD
+        :type report_date: str
+        :return: The path of the report inside the reports folder.
+        """
+        return self.reports_folder + "R01RUGAR_" + report_date + ".rpt"
+
+
+    def previous_report_date(self) -> str | None:
+        """
+        The function `previous_report_date` finds the most recent report of the reports folder older
+        than the report being analyzed.
+        :return: The date of that report as YYYYMMDD, or `None` when there is none.
         """
-        self.report_path = self.report_path + "R01RUGAR_" + self.report_date + ".rpt"
+        if not os.path.isdir(self.reports_folder):
+            return None
+
+        dates = [
+            match.group(1) for match in map(REPORT_NAME_PATTERN.match, os.listdir(self.reports_folder)) if match
+        ]
+
+        return max((report_date for report_date in dates if report_date < self.report_date), default=None)
+
+
+    def operators_delta(self, previous_operators: Mapping[str, Iterable[str]]) -> dict[str, list[str]]:
+        """
+        The function `operators_delta` compares the operators of this report with the ones of a previous
+        report.
+
+        :param previous_operators: The `previous_operators` parameter maps each operator id of the
+        previous report to its groups
+        :type previous_operators: Mapping[str, Iterable[str]]
+        :return: A dictionary with the ids of the `added` and `removed` operators and of the operators
+        whose groups `changed`.
+        """
+        return {
+            "added": [
+                operator_id for operator_id in self.operators if operator_id not in previous_operators
+            ],
+            "removed": [
+                operator_id for operator_id in previous_operators if operator_id not in self.operators
+            ],
+            "changed": [
+                operator_id for operator_id, operator in self.operators.items()
+                if operator_id in previous_operators
+                and operator[OPICS_Keys.GROUPS].keys() != set(previous_operators[operator_id])
+            ],
+        }
 
     
-    def extract_lines(self) -> list[str]:
+    def iter_report_lines(self) -> Iterator[str]:
         """
-        This Python function extracts lines from a specified file and returns them as a list of strings.
-        :return: The `extract_lines` method returns a list of strings, which are the lines read from a
-        file specified by the `report_path` attribute of the object.
+        The function `iter_report_lines` opens the report specified by the `report_path` attribute and
+        returns an iterator that reads it one line at a time.
+        :return: An iterator over the lines of the report, the file is closed once it is exhausted.
         """
         report = Path(self.report_path)
 
         if not report.exists():
             raise FileNotFoundError(f"Archivo no encontrado: {report}") 
 
-        with report.open('r', encoding="utf-8") as file:
-            lines = file.readlines()
-        return lines
+        def read_lines():
+            with report.open('r', encoding="utf-8") as file:
+                self.report_file = file
+
+                try:
+                    yield from file
+                finally:
+                    self.report_file = None
+
+        return read_lines()
+
+
+    def report_position(self) -> int:
+        """
+        The function `report_position` returns how many bytes of the report were read by the iterator
+        of `iter_report_lines`, including the ones still buffered.
+        :return: The offset in bytes, or 0 when the report is not being read.
+        """
+        if self.report_file is None:
+            return 0
+
+        return self.report_file.buffer.raw.tell()
+
+
+    def extract_lines(self) -> list[str]:
+        """
+        This Python function extracts lines from a specified file and returns them as a list of strings.
+        :return: The `extract_lines` method returns a list of strings, which are the lines read from a
+        file specified by the `report_path` attribute of the object.
+        """
+        return list(self.iter_report_lines())
     
 
     def is_discardable(self, line) -> list[str]:
@@ -83,6 +406,47 @@ class Analyze_RUGAR():
         :return: A list of strings is being returned.
         """
         return any(phrase in line for phrase in self.phrases_to_discard)
+
+
+    def clean_line(self, line: str) -> str | None:
+        """
+        The function `clean_line` strips a line of the report and rewrites the phrases that the parser
+        needs to recognize. The "Phone" line marks the start of the groups of an operator and the
+        "(IAUD)" entries of the Transaction Authority section keep their columns joined by dashes.
+
+        :param line: The `line` parameter is a raw line of the report
+        :type line: str
+        :return: The cleaned line, or `None` when the line must be discarded.
+        """
+        line = line.strip()
+
+        if self.is_discardable(line):
+            return None
+
+        if "(IAUD)" in line:
+            return re.sub(r'\s+', '-', line)
+        
+        if "Phone" in line:
+            return RUGAR_Keys.GROUPS.value
+
+        return line
+
+
+    def iter_clean_lines(self, original_lines: Iterable[str]) -> Iterator[str]:
+        """
+        The function `iter_clean_lines` lazily cleans the lines of the report, skipping the discardable
+        ones.
+
+        :param original_lines: The `original_lines` parameter is any iterable of raw lines, usually the
+        open report
+        :type original_lines: Iterable[str]
+        :return: An iterator over the cleaned lines.
+        """
+        for line in original_lines:
+            clean_line = self.clean_line(line)
+
+            if clean_line is not None:
+                yield clean_line
         
 
     def clean_unnecessary_lines(self, original_lines: list[str]) -> list[str]:
@@ -98,20 +462,83 @@ class Analyze_RUGAR():
         :return: The function `clean_unnecessary_lines` returns a list of cleaned lines after processing
         the original lines based on certain conditions.
         """
-        clean_lines = []
+        return [f"{line} " for line in self.iter_clean_lines(original_lines)]
 
-        for line in original_lines:
-            line = line.strip()
 
-            if not self.is_discardable(line):
-                if "(IAUD)" in line:
-                    line = re.sub(r'\s+', '-', line)
-                elif "Phone" in line:
-                    line = RUGAR_Keys.GROUPS.value
-                
-                clean_lines.append(f"{line} ")
+    def iter_operators(self, clean_lines: Iterable[str]) -> Iterator[dict]:
+        """
+        The function `iter_operators` is a state machine that walks the cleaned lines of the report and
+        yields one operator record at a time, so only the lines of the current operator are kept in
+        memory. The text after "OperatorID: " holds the operator id, the text after "Operator Name: " the
+        name and the text after "Groups:" the groups, until the next "OperatorID: ". A repeated marker
+        inside the same record closes the section, as the split based parser did.
+
+        :param clean_lines: The `clean_lines` parameter is an iterable of cleaned lines
+        :type clean_lines: Iterable[str]
+        :return: An iterator of dictionaries with the operator id, name and groups. The same operator
+        may be yielded several times when the report splits its groups across pages.
+        """
+        markers = (RUGAR_Keys.OPERATOR_ID.value, RUGAR_Keys.OPERATOR_NAME.value, RUGAR_Keys.GROUPS.value)
+        sections: dict[str, list[str]] | None = None
+        section = None
+
+        for line in clean_lines:
+            text = line.strip().replace('\x0c', ' ') + " "
+
+            if ":" not in text:
+                if section is not None:
+                    sections[section].append(text)
+                continue
 
-        return clean_lines
+            while text:
+                position, marker = min(
+                    ((text.find(marker), marker) for marker in markers if marker in text),
+                    default=(-1, None)
+                )
+
+                if marker is None:
+                    if section is not None:
+                        sections[section].append(text)
+                    break
+
+                if section is not None and position:
+                    sections[section].append(text[:position])
+
+                text = text[position + len(marker):]
+
+                if marker == RUGAR_Keys.OPERATOR_ID:
+                    if sections is not None:
+                        yield self.build_operator(sections)
+
+                    sections = {marker: []}
+                    section = marker
+                elif sections is not None:
+                    section = None if marker in sections else marker
+                    sections.setdefault(marker, [])
+
+        if sections is not None:
+            yield self.build_operator(sections)
+
+
+    def build_operator(self, sections: dict[str, list[str]]) -> dict:
+        """
+        The function `build_operator` turns the text collected for each section of an operator into an
+        operator record.
+
+        :param sections: The `sections` parameter maps each marker of the report to the text found
+        after it
+        :type sections: dict[str, list[str]]
+        :return: A dictionary with the operator id, name and groups.
+        """
+        operator_id = ''.join(sections[RUGAR_Keys.OPERATOR_ID]) + RUGAR_Keys.OPERATOR_NAME
+        operator_name = ''.join(sections.get(RUGAR_Keys.OPERATOR_NAME, [])).strip()
+        groups = ''.join(sections.get(RUGAR_Keys.GROUPS, [])).strip()
+
+        return {
+            OPICS_Keys.USER: operator_id[:4],
+            OPICS_Keys.USERNAME: operator_name,
+            OPICS_Keys.GROUPS: groups.split(' ') if groups != "" else []
+        }
     
 
     def define_users_info(self, clean_lines: list[str]) -> None:
@@ -124,11 +551,8 @@ class Analyze_RUGAR():
         information
         :type clean_lines: list[str]
         """
-        data_string = re.sub(r'[\n\x0c]', ' ', ''.join(clean_lines))
-        users_data_raw = data_string.split(RUGAR_Keys.OPERATOR_ID)[1::]
-
-        for user in users_data_raw:
-            self.depure_data(user)
+        for operator in self.iter_operators(clean_lines):
+            self.merge_operator(operator)
     
 
     def depure_data(self, data: str) -> None:
@@ -140,24 +564,31 @@ class Analyze_RUGAR():
         belong to
         :type data: str
         """
-        operator_id = data[:4]
-        operator_name = data.split(RUGAR_Keys.OPERATOR_NAME)[1].strip().split(RUGAR_Keys.GROUPS)[0].strip()
-        groups = (
-            data.split(RUGAR_Keys.GROUPS)[1].strip().split(' ') 
-            if data.split(RUGAR_Keys.GROUPS)[1].strip() != "" 
-            else []
-        )
+        for operator in self.iter_operators([RUGAR_Keys.OPERATOR_ID + data]):
+            self.merge_operator(operator)
+
+
+    def merge_operator(self, operator: dict) -> None:
+        """
+        The function `merge_operator` stores an operator record, joining its groups with the ones of a
+        previous record of the same operator. The records are indexed by operator id and their groups
+        kept as insertion ordered sets (dictionary keys), so each merge takes constant time.
+
+        :param operator: The `operator` parameter is a record yielded by `iter_operators`
+        :type operator: dict
+        """
+        operator_id = operator[OPICS_Keys.USER]
+        groups = dict.fromkeys(operator[OPICS_Keys.GROUPS])
 
-        user_exists = next((user for user in self.users_info if user[OPICS_Keys.USER] == operator_id), None)
+        user_exists = self.operators.get(operator_id)
 
         if user_exists:
-            existing_groups = set(user_exists[OPICS_Keys.GROUPS])
-            new_groups = set(groups)
-            user_exists[OPICS_Keys.GROUPS] = list(existing_groups | new_groups)
+            user_exists[OPICS_Keys.GROUPS].update(groups)
         else:
-            self.users_info.append({
+            self.operators[operator_id] = {
                 OPICS_Keys.USER: operator_id,
-                OPICS_Keys.USERNAME: operator_name,
+                OPICS_Keys.USERNAME: operator[OPICS_Keys.USERNAME],
                 OPICS_Keys.GROUPS: groups
-            })
+            }
 
+        self.users_info_view = None
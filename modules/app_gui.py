@@ -1,9 +1,16 @@
 import tkinter as tk
-import threading
 
-from tkinter import ttk
-from utils import RBAC_Keys, OPICS_Keys
+from tkinter import filedialog, messagebox, ttk
+from utils import RBAC_Keys, OPICS_Keys, progress_scope, tracer
 from .compare_data import Compare_Data
+from .export_data import Export_Data
+from .task_runner import Task_Runner
+from .virtual_list import Virtual_List
+
+
+# Vertical space around the report items and their group labels, used to estimate their height.
+REPORT_ITEM_PAD_Y = 5
+GROUP_LABEL_PAD_Y = 5
 
 
 class App_GUI(tk.Tk):
@@ -11,6 +18,9 @@ class App_GUI(tk.Tk):
         super().__init__()
 
         self.compare_data = compare_data
+        self.export_data = Export_Data(compare_data)
+        self.role_mining = None
+        self.task_runner = Task_Runner(self)
 
         self.title("Nombre de la aplicación")
         self.geometry("1200x900")
@@ -84,41 +94,112 @@ class App_GUI(tk.Tk):
         self.show_content()
 
 
-    def show_loading_screen(self, task_function, *args):
+    def show_loading_screen(self, compute, render):
         """
-        The function `show_loading_screen` creates a loading window with a progress bar while executing
-        a given task function in a separate thread.
+        The function `show_loading_screen` creates a loading window with a progress bar while a task
+        runs in a worker thread through `task_runner`. The worker only computes; the result is rendered
+        in the main loop and the window is closed there too. The task is cancelled with the button of
+        the window or when another option of the side menu is selected.
         
-        :param task_function: The `task_function` parameter in the `show_loading_screen` method is a
-        function that you want to execute while showing a loading screen. This function will be called
-        with the arguments `*args` that are passed to the `show_loading_screen` method
+        :param compute: The `compute` parameter is the function run in the worker thread, it receives
+        the `Task` and returns the data to show. It must not create or modify widgets
+        :param render: The `render` parameter is the function that receives the result of `compute`
+        and builds the widgets, it runs in the main thread
         """
         loading_window = tk.Toplevel(self)
         loading_window.title("Cargando")
-        loading_window.geometry("300x200")
+        loading_window.geometry("360x220")
         loading_window.transient(self)
-        loading_window.grab_set()
 
         loading_window.resizable(False, False)
         
         label = tk.Label(loading_window, text="Cargando datos, por favor espera...")
         label.pack(pady=10)
 
-        progress_bar = ttk.Progressbar(loading_window, mode="indeterminate")
+        progress_bar = ttk.Progressbar(loading_window, mode="indeterminate", maximum=100)
         progress_bar.pack(pady=10, padx=20, fill="x")
 
+        detail_label = tk.Label(loading_window, text="", font=("Arial", 9), fg="#6c757d")
+        detail_label.pack(padx=20)
+
+        tk.Button(
+            loading_window,
+            text="Cancelar",
+            command=self.task_runner.cancel
+        ).pack(pady=10)
+
+        loading_window.protocol("WM_DELETE_WINDOW", self.task_runner.cancel)
+
         progress_bar.start()
-        
-        def task_wrapper():
-            try:
-                task_function(*args)
-            except Exception as e:
-                print(f"Error en la tarea: {e}")
-            finally:
-                progress_bar.stop()
-                loading_window.destroy()
 
-        threading.Thread(target=task_wrapper, daemon=True).start()
+        def show_progress(event):
+            label.config(text=event.stage)
+            detail_label.config(text=self.format_progress(event))
+
+            if event.fraction is None:
+                if str(progress_bar["mode"]) != "indeterminate":
+                    progress_bar.config(mode="indeterminate")
+                    progress_bar.start()
+            else:
+                if str(progress_bar["mode"]) != "determinate":
+                    progress_bar.stop()
+                    progress_bar.config(mode="determinate")
+                progress_bar["value"] = event.fraction * 100
+
+        def close_loading_screen():
+            progress_bar.stop()
+            loading_window.destroy()
+
+        def compute_with_progress(task):
+            # The reporters created in this worker thread send their events to this task only, through
+            # `report_progress`, which also stops the computation once the task is cancelled. A
+            # cancelled task that is still running never reports to the window of the next one.
+            with progress_scope(task.report_progress):
+                return compute(task)
+
+        self.task_runner.submit(
+            compute=compute_with_progress,
+            on_done=render,
+            on_error=self.show_task_error,
+            on_finished=close_loading_screen,
+            on_progress=show_progress
+        )
+
+
+    def format_progress(self, event) -> str:
+        """
+        The function `format_progress` describes a progress event: the work done, its counters and the
+        estimated time left.
+
+        :param event: The `event` parameter is a `Progress_Event`
+        :return: A text like "12.5 de 40.0 MB · operadores: 1200 · Tiempo restante: 8 s".
+        """
+        if event.unit == "bytes":
+            done = f"{event.done / 1048576:.1f}"
+            total = f"{event.total / 1048576:.1f}" if event.total else None
+            unit = "MB"
+        else:
+            done, total, unit = str(event.done), str(event.total) if event.total else None, event.unit
+
+        parts = [f"{done} de {total} {unit}" if total else f"{done} {unit}"]
+
+        counts_names = {"operators": "operadores", "rows": "filas", "differences": "diferencias"}
+        parts += [f"{counts_names.get(name, name)}: {count}" for name, count in event.counts.items()]
+
+        if event.eta is not None:
+            parts.append(f"Tiempo restante: {event.eta:.0f} s")
+
+        return " · ".join(parts)
+
+
+    def show_task_error(self, error: Exception) -> None:
+        """
+        The function `show_task_error` reports in a dialog an error raised by a task of `task_runner`.
+
+        :param error: The `error` parameter is the exception raised by the task
+        :type error: Exception
+        """
+        messagebox.showerror("Error", f"Error en la tarea: {error}", parent=self)
 
     
     def on_select(self, button, action) -> None:
@@ -139,6 +220,8 @@ class App_GUI(tk.Tk):
         button.config(bg="white", fg="black")
         self.last_selected = button
 
+        self.task_runner.cancel()
+
         for widget in self.content_frame.winfo_children():
             widget.destroy()
 
@@ -151,7 +234,9 @@ class App_GUI(tk.Tk):
         """
         options = [
             {"text": "Diferencia entre usuarios", "action": self.users_diff_frame_with_progress}, 
-            {"text": "Diferencia entre perfiles", "action": self.reports_diff_frame_with_progress}
+            {"text": "Diferencia entre perfiles", "action": self.reports_diff_frame_with_progress},
+            {"text": "Minería de roles", "action": self.role_mining_frame_with_progress},
+            {"text": "Tiempos de ejecución", "action": self.create_timings_frame}
         ]
 
         self.sidenav_buttons = []
@@ -224,11 +309,13 @@ class App_GUI(tk.Tk):
                 pady=10
             )
             message.pack()
-            return None
+            return None, {}
 
+        values = tk.Variable(frame, value=())
         scrollbar = tk.Scrollbar(frame, orient="vertical")
         listbox = tk.Listbox(
             frame,
+            listvariable=values,
             selectmode=tk.MULTIPLE,
             yscrollcommand=scrollbar.set,
             bg="#F8F9Fa",
@@ -248,9 +335,19 @@ class App_GUI(tk.Tk):
 
         index_to_object = {}
 
-        for index, item in enumerate(items):
-            listbox.insert(tk.END, item[item_key])
-            index_to_object[index] = item
+        # The listbox shows the items at `visible_positions`, see `show_list_positions`. Selections are
+        # kept by position in `items`, so they survive the filters of the search box.
+        listbox.values = values
+        listbox.items = items
+        listbox.item_key = item_key
+        listbox.index_to_object = index_to_object
+        listbox.visible_positions = []
+        listbox.selected_positions = set()
+        listbox.removed_positions = set()
+
+        listbox.bind("<<ListboxSelect>>", lambda e: self.update_list_selection(listbox))
+
+        self.show_list_positions(listbox, range(len(items)))
 
         def toggle_select_all():
             """
@@ -261,6 +358,8 @@ class App_GUI(tk.Tk):
             else:
                 listbox.selection_set(0, tk.END)
 
+            self.update_list_selection(listbox)
+
         select_all_button = tk.Button(
             parent_frame,
             text="Seleccionar/Deseleccionar todo",
@@ -282,9 +381,108 @@ class App_GUI(tk.Tk):
         ).pack(pady=20)
         
         return listbox, index_to_object
+
+
+    def show_list_positions(self, listbox: tk.Listbox, positions) -> int:
+        """
+        The function `show_list_positions` shows in a list built by `create_multiselect_list` only the
+        items at some positions, without the removed ones, and selects again the selected ones. The
+        content is replaced at once through the list variable of the listbox.
+
+        :param listbox: The `listbox` parameter is the list to update
+        :type listbox: tk.Listbox
+        :param positions: The `positions` parameter is the positions in the items of the list to show,
+        in order
+        :return: The number of items shown.
+        """
+        items = listbox.items
+        positions = [position for position in positions if position not in listbox.removed_positions]
+
+        listbox.visible_positions = positions
+        listbox.index_to_object.clear()
+        listbox.index_to_object.update((index, items[position]) for index, position in enumerate(positions))
+
+        listbox.values.set(tuple(items[position][listbox.item_key] for position in positions))
+        listbox.selection_clear(0, tk.END)
+
+        if listbox.selected_positions:
+            for index, position in enumerate(positions):
+                if position in listbox.selected_positions:
+                    listbox.selection_set(index)
+
+        return len(positions)
+
+
+    def update_list_selection(self, listbox: tk.Listbox) -> None:
+        """
+        The function `update_list_selection` records the selection of the items shown in a list built
+        by `create_multiselect_list`, keeping the selection of the hidden ones.
+
+        :param listbox: The `listbox` parameter is the list whose selection changed
+        :type listbox: tk.Listbox
+        """
+        visible_positions = listbox.visible_positions
+
+        listbox.selected_positions.difference_update(visible_positions)
+        listbox.selected_positions.update(visible_positions[index] for index in listbox.curselection())
+
+
+    def remove_selected_items(self, listbox: tk.Listbox | None) -> list:
+        """
+        The function `remove_selected_items` removes from a list built by `create_multiselect_list` the
+        selected items, including the ones hidden by the search box.
+
+        :param listbox: The `listbox` parameter is the list, `None` when it has no items
+        :type listbox: tk.Listbox | None
+        :return: The removed items.
+        """
+        if listbox is None:
+            return []
+
+        self.update_list_selection(listbox)
+
+        positions = sorted(listbox.selected_positions)
+        listbox.removed_positions.update(positions)
+        listbox.selected_positions.clear()
+
+        self.show_list_positions(listbox, listbox.visible_positions)
+
+        return [listbox.items[position] for position in positions]
+
+
+    def create_search_box(self, parent, on_search, total: int) -> tk.Entry:
+        """
+        The function `create_search_box` creates a search box that filters a list while the user types,
+        with the number of items shown next to it.
+
+        :param parent: The `parent` parameter is the frame where the box is placed, in its third row
+        :param on_search: The `on_search` parameter is called with the text of the box after each
+        change, it filters the list and returns the number of items shown
+        :param total: The `total` parameter is the number of items of the list
+        :type total: int
+        :return: The entry of the box.
+        """
+        search_frame = tk.Frame(parent)
+        search_frame.grid(row=2, column=0, pady=(10, 0))
+
+        tk.Label(search_frame, text="Buscar:", font=("Arial", 11)).grid(row=0, column=0, padx=5)
+
+        query = tk.StringVar(search_frame)
+        entry = tk.Entry(search_frame, textvariable=query, font=("Arial", 11), width=40)
+        entry.grid(row=0, column=1)
+
+        count_label = tk.Label(search_frame, text=f"{total} de {total}", font=("Arial", 10), fg="#6c757d")
+        count_label.grid(row=0, column=2, padx=5)
+
+        def search(*args):
+            count_label.config(text=f"{on_search(query.get())} de {total}")
+
+        query.trace_add("write", search)
+
+        return entry
     
 
-    def create_description_frame(self, title, description) -> None:
+    def create_description_frame(self, title, description) -> tk.Frame:
         """
         The function `create_description_frame` creates a frame with a title and description labels in a
         tkinter GUI.
@@ -295,6 +493,7 @@ class App_GUI(tk.Tk):
         description labels using the provided `title` and `description` parameters. The `title`
         parameter is used to set the text of the title label with a bold font style, while the
         `description` parameter is used to set the
+        :return: The frame, with room for more widgets in its third row.
         """
         description_frame = self.create_frame_with_grid(
             parent=self.content_frame, pad_y=20, rows=1
@@ -316,8 +515,10 @@ class App_GUI(tk.Tk):
         )
         description.grid(row=1, column=0)
 
+        return description_frame
+
 
-    def create_actions_frame(self, conditional, action) -> None:
+    def create_actions_frame(self, conditional, action, export=None) -> None:
         """
         The function `create_actions_frame` creates a frame with a label or button based on a
         conditional statement.
@@ -329,6 +530,8 @@ class App_GUI(tk.Tk):
         :param action: The `action` parameter in the `create_actions_frame` method is a function that
         will be executed when the "Aprobar todos los cambios" button is clicked. This function should be
         defined elsewhere in your code and should contain the logic for approving the changes
+        :param export: The `export` parameter adds an "Exportar" button, see `export_differences`
+        (optional)
         """
         actions_frame = self.create_frame_with_grid(
             parent=self.content_frame, bg="#F0F0F0", row_position=2, columnspan=2
@@ -352,8 +555,46 @@ class App_GUI(tk.Tk):
                 fg="white"
             ).grid(row=0, column=0)
 
+            if export is not None:
+                tk.Button(
+                    actions_frame,
+                    text="Exportar",
+                    command=export,
+                    font=("Arial", 12)
+                ).grid(row=0, column=1, padx=10)
+
+
+    def export_differences(self, export, initial_file: str) -> None:
+        """
+        The function `export_differences` asks for a file and exports a list of differences to it in a
+        worker thread, with the loading screen. The format is the one of the extension of the file.
+
+        :param export: The `export` parameter is the method of `Export_Data` that writes the list, it
+        receives the path and a function that tells if the export was cancelled
+        :param initial_file: The `initial_file` parameter is the file name proposed to the user
+        :type initial_file: str
+        """
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            initialfile=initial_file,
+            defaultextension=".xlsx",
+            filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv"), ("JSON lines", "*.jsonl")]
+        )
+
+        if not path:
+            return
+
+        def compute(task):
+            return export(path, lambda: task.cancelled)
+
+        def render(rows):
+            if rows is not None:
+                messagebox.showinfo("Exportar", f"Se exportaron {rows} filas a {path}", parent=self)
+
+        self.show_loading_screen(compute, render)
+
     
-    def create_users_diff_frame(self, rbac_header, opics_header, rbac_data, opics_data) -> None:
+    def create_users_diff_frame(self, rbac_header, opics_header, rbac_data, opics_data, rbac_search=None, opics_search=None) -> None:
         """
         The function `create_users_diff_frame` generates a user interface to display and manage the
         differences between user data from RBAC and OPICS systems.
@@ -371,8 +612,11 @@ class App_GUI(tk.Tk):
         :param opics_data: The `opics_data` parameter in the `create_users_diff_frame` function likely
         contains data related to users from the OPICS system. This data is used to populate a listbox in
         the user interface where users can be selected for further processing
+        :param rbac_search: The `rbac_search` parameter is the `Search_Index` of `rbac_data`, both lists
+        are filtered by a search box when the indexes are given (optional)
+        :param opics_search: The `opics_search` parameter is the `Search_Index` of `opics_data` (optional)
         """
-        self.create_description_frame(
+        description_frame = self.create_description_frame(
             title="Diferencias de usuarios reportados entre RBAC y OPICS",
             description="A continuación se listan las diferencias encontradas entre los usuarios que se encuentran en la versión actual del Excel RBAC vs los usuarios que se encuentran en el último reporte RUGAR de OPICS"
         )
@@ -405,9 +649,23 @@ class App_GUI(tk.Tk):
             button_action=self.process_opics_users_diff
         )
 
+        if rbac_search is not None and opics_search is not None:
+            def search(query):
+                return sum(
+                    self.show_list_positions(listbox, search_index.search(query))
+                    for listbox, search_index in ((rbac_listbox, rbac_search), (opics_listbox, opics_search))
+                    if listbox is not None
+                )
+
+            self.create_search_box(description_frame, search, len(rbac_data) + len(opics_data))
+
         self.create_actions_frame(
             conditional= len(rbac_data) or len(opics_data),
-            action=lambda: self.process_user_diff_selection(rbac_listbox, index_to_object_rbac, opics_listbox, index_to_object_opics)
+            action=lambda: self.process_user_diff_selection(rbac_listbox, index_to_object_rbac, opics_listbox, index_to_object_opics),
+            export=lambda: self.export_differences(
+                lambda path, should_stop: self.export_data.export_users_diff(path, (opics_data, rbac_data), should_stop),
+                "diferencias_usuarios.xlsx"
+            )
         )
 
 
@@ -416,60 +674,63 @@ class App_GUI(tk.Tk):
         The function `users_diff_frame_with_progress` compares user data between two sources and
         displays the differences with a loading screen.
         """
-        def user_diff_frame():
-            [opics_not_in_rbac, rbac_not_in_opics] = self.compare_data.compare_users_in_reports()
+        def compute(task):
+            opics_not_in_rbac, rbac_not_in_opics = self.compare_data.compare_users_in_reports()
+
+            # The search indexes are built here, in the worker thread.
+            return (
+                self.compare_data.get_search_index("opics_not_in_rbac", opics_not_in_rbac),
+                self.compare_data.get_search_index("rbac_not_in_opics", rbac_not_in_opics),
+            )
+
+        def render(users_diff):
+            [opics_search, rbac_search] = users_diff
 
             self.create_users_diff_frame(
                 rbac_header = "Usuarios que están en RBAC pero no en OPICS",
                 opics_header = "Usuarios que están en OPICS pero no en RBAC",
-                rbac_data = rbac_not_in_opics,
-                opics_data = opics_not_in_rbac
+                rbac_data = rbac_search.records,
+                opics_data = opics_search.records,
+                rbac_search = rbac_search,
+                opics_search = opics_search
             )
 
-        self.show_loading_screen(user_diff_frame)
+        self.show_loading_screen(compute, render)
 
 
     def process_user_diff_selection(self, rbac_listbox, index_to_object_rbac, opics_listbox, index_to_object_opics):
-            rbac_selected = [index_to_object_rbac.get(i) for i in rbac_listbox.curselection()]
-            opics_selected = [index_to_object_opics.get(i) for i in opics_listbox.curselection()]
+            rbac_selected = self.remove_selected_items(rbac_listbox)
+            opics_selected = self.remove_selected_items(opics_listbox)
 
             print("Seleccionados de RBAC", rbac_selected)
             print("Seleccionados de OPICS", opics_selected)
-
-            for i in reversed(rbac_listbox.curselection()):
-                rbac_listbox.delete(i)
-
-            for i in reversed(opics_listbox.curselection()):
-                opics_listbox.delete(i)
     
 
     def process_opics_users_diff(self, listbox, index_to_object):
-        selected = [index_to_object.get(i) for i in listbox.curselection()]
-        
-        for i in reversed(listbox.curselection()):
-            listbox.delete(i)
+        selected = self.remove_selected_items(listbox)
 
 
     def process_rbac_users_diff(self, listbox, index_to_object):
-        selected = [index_to_object.get(i) for i in listbox.curselection()]
+        selected = self.remove_selected_items(listbox)
         print("Seleccionados de RBAC", selected)
 
-        for i in reversed(listbox.curselection()):
-            listbox.delete(i)
-
     
-    def create_reports_diff_frame(self, reports_diff):
+    def create_reports_diff_frame(self, reports_diff, search_index=None):
         """
         The function `create_reports_diff_frame` generates a frame displaying differences between
-        reported data in RBAC and OPICS.
+        reported data in RBAC and OPICS. The list is virtualized: only the items inside the viewport
+        have widgets, which are reused while scrolling, so it takes the same time to show for any
+        number of differences.
         
         :param reports_diff: The `reports_diff` parameter seems to be a list of objects representing
         differences in reported data between RBAC and OPICS. Each object in the list likely contains
         information about a specific difference found between the two systems
+        :param search_index: The `search_index` parameter is the `Search_Index` of `reports_diff`, the
+        list is filtered by a search box when it is given (optional)
         """
         selected_objects = []
 
-        self.create_description_frame(
+        description_frame = self.create_description_frame(
             title="Diferencias de datos reportados entre RBAC y OPICS",
             description="A continuación se listan las diferencias encontradas entre los usuarios que se encuentran en la versión actual del Excel RBAC pero presentan diferencias con respecto al último reporte RUGAR de OPICS"
         )
@@ -478,14 +739,35 @@ class App_GUI(tk.Tk):
 
         diff_frame = self.create_diff_frame()
 
-        canvas, scrollable_frame = self.create_scrollable_canvas(diff_frame)
+        estimate_height = self.report_item_height_estimator(diff_frame, selected_objects)
+        heights = [estimate_height(obj) for obj in reports_diff]
+
+        # The items of the list are positions in `reports_diff`, so filtering only replaces the
+        # positions and the selection is kept by position.
+        reports_list = Virtual_List(
+            diff_frame,
+            items=range(len(reports_diff)),
+            create_row=lambda parent: self.create_report_item(parent, selected_objects),
+            bind_row=lambda item_frame, position, i: self.bind_report_item(
+                item_frame, reports_diff[position], position, selected_objects
+            ),
+            estimate_height=lambda position: heights[position],
+            spacing=2 * REPORT_ITEM_PAD_Y
+        )
+        reports_list.grid(row=0, column=0, sticky="nsew")
 
-        self.configure_mouse_wheel_scroll(canvas)
+        if search_index is not None:
+            def search(query):
+                positions = search_index.search(query)
+                reports_list.set_items(positions)
+                return len(positions)
 
-        for i, obj in enumerate(reports_diff):
-            self.create_report_item(scrollable_frame, obj, i, selected_objects)
+            self.create_search_box(description_frame, search, len(reports_diff))
 
-        self.create_diff_profiles_actions(len(reports_diff))
+        self.create_diff_profiles_actions(len(reports_diff), export=lambda: self.export_differences(
+            lambda path, should_stop: self.export_data.export_users_groups_diff(path, reports_diff, should_stop),
+            "diferencias_grupos.xlsx"
+        ))
         
 
     def configure_content_frame_rows(self) -> None:
@@ -508,48 +790,34 @@ class App_GUI(tk.Tk):
         )
 
 
-    def create_scrollable_canvas(self, diff_frame) -> tuple[tk.Canvas, tk.Frame]:
-        """
-        This function creates a scrollable canvas with a vertical scrollbar inside a given frame.
-        
-        :param diff_frame: The `diff_frame` parameter in the `create_scrollable_canvas` method is a
-        tkinter Frame widget where the scrollable canvas will be placed. This frame will contain the
-        canvas and scrollbar for creating a scrollable area within the frame
-        :return: The function `create_scrollable_canvas` returns a tuple containing a `tk.Canvas` object
-        and a `tk.Frame` object.
+    def report_item_height_estimator(self, parent, selected_objects):
         """
-        canvas = tk.Canvas(diff_frame)
+        The function `report_item_height_estimator` measures a report item without groups and a group
+        label, and returns the function that estimates the height of the item of a difference from
+        them.
 
-        scrollbar = tk.Scrollbar(diff_frame, orient=tk.VERTICAL, command=canvas.yview)
-
-        scrollable_frame = self.create_frame_with_grid(parent=canvas)
-        scrollable_frame.update_idletasks()
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        :param parent: The `parent` parameter is the widget where the measured widgets are built
+        :param selected_objects: The `selected_objects` parameter is the list of selected indexes
+        :return: A function that receives a difference and returns the height of its item in pixels.
+        """
+        item_frame = self.create_report_item(parent, selected_objects)
+        self.bind_report_item(
+            item_frame, {"opics_user": "", "rbac_profile": "", "opics_groups": [], "rbac_groups": []}, -1, selected_objects
         )
+        group_label = self.create_group_label(item_frame.opics_label_frame, 0)
 
-        canvas.create_window((0,0), window=scrollable_frame, anchor="nw", width=diff_frame.winfo_width())
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.grid(row=0, column=0, sticky="nsew")
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        item_frame.update_idletasks()
+        group_height = group_label.winfo_reqheight() + 2 * GROUP_LABEL_PAD_Y
+        group_label.destroy()
 
-        return canvas, scrollable_frame
+        item_frame.update_idletasks()
+        base_height = item_frame.winfo_reqheight()
+        item_frame.destroy()
 
+        def estimate_height(obj):
+            return base_height + group_height * max(len(obj["opics_groups"]), len(obj["rbac_groups"]))
 
-    def configure_mouse_wheel_scroll(self, canvas) -> None:
-        """
-        The function `configure_mouse_wheel_scroll` binds mouse wheel and button events to scroll a
-        canvas vertically.
-        
-        :param canvas: The `canvas` parameter in the `configure_mouse_wheel_scroll` function is expected
-        to be a tkinter Canvas widget. This function sets up mouse wheel scrolling behavior for the
-        given canvas widget
-        """
-        canvas.bind("<MouseWheel>", lambda e: canvas.yview_scroll(-1 * (e.delta // 120), "units"))
-        canvas.bind("<Button-4>", lambda e: canvas.yview_scroll(-1, "units"))
-        canvas.bind("<Button-5>", lambda e: canvas.yview_scroll(1, "units"))
+        return estimate_height
 
     
     def toggle_selection(self, index, icon_label, selected_objects) -> None:
@@ -574,84 +842,49 @@ class App_GUI(tk.Tk):
             icon_label.config(text="✅")
 
 
-    def create_report_item(self, scrollable_frame, obj, i, selected_objects):
+    def create_report_item(self, parent, selected_objects):
         """
-        The function `create_report_item` generates a report item with user information and actions for
-        selecting the item.
+        The function `create_report_item` builds an empty report item, with the labels for the user
+        information and the actions for selecting the item. The item is filled by `bind_report_item`
+        and is reused for other differences while the list is scrolled.
         
-        :param scrollable_frame: The `scrollable_frame` parameter is the frame where the report item
-        will be displayed. It is a container that allows for scrolling if the content exceeds the
-        visible area. In your `create_report_item` method, you are creating various elements within this
-        `scrollable_frame` to display information about a
-        :param obj: The `create_report_item` method you provided seems to be creating a report item with
-        user information and buttons for selection. It also includes a commented-out section for
-        displaying groups information
-        :param i: The `i` parameter in the `create_report_item` method is used as the row position for
-        placing the item within the scrollable frame. It helps in positioning the item correctly within
-        the grid layout of the report
-        :param selected_objects: The `create_report_item` method seems to be creating a report item with
-        various labels and buttons for a given object. The `selected_objects` parameter is likely a list
-        or dictionary that stores information about the objects that have been selected in the report
-        """
-        item_frame = self.create_frame_with_grid(
-            parent=scrollable_frame, bd_units=1, pad_y=5,
-            row_position=i, column_position=0, columns=1, relief="solid"
-        )
+        :param parent: The `parent` parameter is the widget where the item is built, the canvas of the
+        virtualized list
+        :param selected_objects: The `selected_objects` parameter is the list of the indexes of the
+        selected differences, updated by `toggle_selection`
+        :return: The frame of the item, with its inner widgets as attributes.
+        """
+        item_frame = tk.Frame(parent, bd=1, relief="solid")
+        item_frame.rowconfigure(0, weight=1)
+        item_frame.columnconfigure(1, weight=1)
 
         actions_frame = self.create_frame_with_grid(
-            parent=item_frame, column_position=1, rows=1
+            parent=item_frame, column_position=1, rows=1, sticky="ne"
         )
 
         icon_label = tk.Label(actions_frame, text="🔲", font=("Arial", 16))
         icon_label.grid(row=0, column=0, padx=10)
 
-        button = tk.Button(actions_frame, text="Seleccionar", command=lambda i=i, lbl=icon_label: self.toggle_selection(i, lbl, selected_objects))
+        button = tk.Button(
+            actions_frame, text="Seleccionar",
+            command=lambda: self.toggle_selection(item_frame.index, icon_label, selected_objects)
+        )
         button.grid(row=1, column=0, padx=10)
 
         user_info_frame = self.create_frame_with_grid(
-            parent=item_frame, rows=4, column_position=0
+            parent=item_frame, rows=4, column_position=0, sticky="nw"
         )
 
-        user = f"Usuario: {obj['opics_user']}"
-        user_label = tk.Label(user_info_frame, text=user, anchor="w")
+        user_label = tk.Label(user_info_frame, anchor="w")
         user_label.grid(row=0, column=0, sticky="w")
 
-        profile = f"Perfil: {obj['rbac_profile']}"
-        profile_label = tk.Label(user_info_frame, text=profile, anchor="w")
+        profile_label = tk.Label(user_info_frame, anchor="w")
         profile_label.grid(row=1, column=0, sticky="w")
 
-        # rbac_groups = f"Grupos que están en RBAC pero no en OPICS: {obj['rbac_groups_not_in_opics_groups']}"
-        # rbac_groups_label = tk.Label(user_info_frame, text=rbac_groups, anchor="w")
-        # rbac_groups_label.grid(row=2, column=0, sticky="w")
-
-        # opics_groups = f"Grupos que están en OPICS pero no en RBAC: {obj["opics_groups_not_in_rbac_groups"]}"
-        # opics_groups_label = tk.Label(user_info_frame, text=opics_groups, anchor="w")
-        # opics_groups_label.grid(row=3, column=0, sticky="w")
-
         groups_frame = self.create_frame_with_grid(
             parent=user_info_frame, row_position=4, columns=1
         )
 
-        self.populate_groups(obj["opics_groups"], obj["rbac_groups"], groups_frame)
-
-
-    def populate_groups(self, opics_groups, rbac_groups, groups_frame):
-        """
-        The function `populate_groups` creates label frames for OPICS and RBAC groups and populates them
-        with group labels.
-        
-        :param opics_groups: It looks like you were about to provide some information about the
-        `opics_groups` parameter in the `populate_groups` method. Could you please provide more details
-        or complete the sentence so that I can assist you further?
-        :param rbac_groups: The `rbac_groups` parameter in your `populate_groups` method likely refers
-        to a list of RBAC (Role-Based Access Control) groups. RBAC is a method of restricting network
-        access based on roles assigned to users. In your code, you are creating label frames for both
-        OPICS groups
-        :param groups_frame: The `groups_frame` parameter is a tkinter Frame widget where you want to
-        populate groups of OPICS and RBAC. In the provided code snippet, two LabelFrames
-        (`opics_label_frame` and `rbac_label_frame`) are created within the `groups_frame` to display
-        the groups of OP
-        """
         opics_label_frame = tk.LabelFrame(
             groups_frame, text="Grupos de OPICS"
         )
@@ -661,57 +894,95 @@ class App_GUI(tk.Tk):
             groups_frame, text="Grupos de RBAC"
         )
         rbac_label_frame.grid(row=0, column=1, padx=10, sticky="n")
-    
+
+        item_frame.index = None
+        item_frame.icon_label = icon_label
+        item_frame.user_label = user_label
+        item_frame.profile_label = profile_label
+        item_frame.opics_label_frame = opics_label_frame
+        item_frame.rbac_label_frame = rbac_label_frame
+        item_frame.opics_labels = []
+        item_frame.rbac_labels = []
+
+        return item_frame
+
+
+    def bind_report_item(self, item_frame, obj, i, selected_objects):
+        """
+        The function `bind_report_item` shows a difference in a report item built by
+        `create_report_item`.
+
+        :param item_frame: The `item_frame` parameter is the report item
+        :param obj: The `obj` parameter is the difference to show, as returned by
+        `Compare_Data.compare_users_groups`
+        :param i: The `i` parameter is the index of the difference, used to keep its selection
+        :param selected_objects: The `selected_objects` parameter is the list of the indexes of the
+        selected differences
+        """
+        item_frame.index = i
+        item_frame.icon_label.config(text="✅" if i in selected_objects else "🔲")
+        item_frame.user_label.config(text=f"Usuario: {obj['opics_user']}")
+        item_frame.profile_label.config(text=f"Perfil: {obj['rbac_profile']}")
+
+        self.populate_groups(obj["opics_groups"], obj["rbac_groups"], item_frame)
+
+
+    def populate_groups(self, opics_groups, rbac_groups, item_frame):
+        """
+        The function `populate_groups` fills the label frames of OPICS and RBAC groups of a report
+        item, reusing the group labels it already has and hiding the ones it doesn't need.
+        
+        :param opics_groups: The `opics_groups` parameter is the list of groups of the user in OPICS
+        :param rbac_groups: The `rbac_groups` parameter is the list of groups of the profile of the user
+        in RBAC
+        :param item_frame: The `item_frame` parameter is the report item, with its label frames and
+        group labels
+        """
+        opics_group_set = set(opics_groups)
+        rbac_group_set = set(rbac_groups)
+
         max_rows = max(len(opics_groups), len(rbac_groups))
 
+        for labels, label_frame in (
+            (item_frame.opics_labels, item_frame.opics_label_frame),
+            (item_frame.rbac_labels, item_frame.rbac_label_frame)
+        ):
+            while len(labels) < max_rows:
+                labels.append(self.create_group_label(label_frame, len(labels)))
+
+            for label in labels[max_rows:]:
+                label.grid_remove()
+
         for index in range(max_rows):
-            self.create_group_label(opics_groups, rbac_groups, opics_label_frame, rbac_label_frame, index)
+            opics_text = opics_groups[index] if index < len(opics_groups) else ""
+            item_frame.opics_labels[index].config(
+                text=opics_text, bg="white" if opics_text in rbac_group_set else "lightblue"
+            )
+            item_frame.opics_labels[index].grid()
 
+            rbac_text = rbac_groups[index] if index < len(rbac_groups) else ""
+            item_frame.rbac_labels[index].config(
+                text=rbac_text, bg="white" if rbac_text in opics_group_set else "lightcoral"
+            )
+            item_frame.rbac_labels[index].grid()
 
-    def create_group_label(self, opics_groups, rbac_groups, opics_label_frame, rbac_label_frame, index):
+
+    def create_group_label(self, label_frame, index):
         """
-        This function creates labels for groups from two different lists and assigns background colors
-        based on their presence in each other's list.
+        This function creates an empty group label in the row `index` of a label frame of groups.
         
-        :param opics_groups: The `opics_groups` parameter seems to be a list containing group names
-        related to OPICS. The function `create_group_label` takes these group names along with RBAC
-        group names and creates labels for each group in two different frames (`opics_label_frame` and
-        `rbac_label_frame`)
-        :param rbac_groups: The `rbac_groups` parameter seems to be a list of RBAC (Role-Based Access
-        Control) groups. The function `create_group_label` takes these RBAC groups and creates labels
-        for them in a graphical user interface (GUI) using Tkinter. The labels are displayed in a
-        specific frame
-        :param opics_label_frame: The `opics_label_frame` parameter is a frame in a Tkinter GUI where
-        labels for OPICS groups will be displayed. The `create_group_label` function creates a label for
-        an OPICS group and places it within the `opics_label_frame`. The label's text is set based on
-        :param rbac_label_frame: The `rbac_label_frame` parameter is a frame in a Tkinter GUI
-        application where labels for RBAC (Role-Based Access Control) groups are displayed. The function
-        `create_group_label` creates a label for an RBAC group based on the provided RBAC groups list
-        and index. The label
-        :param index: The `index` parameter in the `create_group_label` function is used to determine
-        the position of the label within the grid layout. It is used to access the corresponding group
-        name from the `opics_groups` and `rbac_groups` lists based on the index value. If the index is
-        """
-        opics_text = opics_groups[index] if index < len(opics_groups) else ""
-        opics_label = tk.Label(
-            opics_label_frame, text=opics_text,
-            bg="white" if opics_text in rbac_groups else "lightblue",
-            anchor="w",
-            width=30
-        )
-        opics_label.grid(row=index, column=0, sticky="w", padx=5, pady=5)
-
-        rbac_text = rbac_groups[index] if index < len(rbac_groups) else ""
-        rbac_label = tk.Label(
-            rbac_label_frame, text=rbac_text,
-            bg="white" if rbac_text in opics_groups else "lightcoral",
-            anchor="w",
-            width=30
-        )
-        rbac_label.grid(row=index, column=0, sticky="w", padx=5, pady=5)
-
-
-    def create_diff_profiles_actions(self, n_diff):
+        :param label_frame: The `label_frame` parameter is the label frame of OPICS or RBAC groups where
+        the label is placed
+        :param index: The `index` parameter is the row of the label inside the label frame
+        :return: The new label.
+        """
+        label = tk.Label(label_frame, anchor="w", width=30)
+        label.grid(row=index, column=0, sticky="w", padx=5, pady=GROUP_LABEL_PAD_Y)
+
+        return label
+
+
+    def create_diff_profiles_actions(self, n_diff, export=None):
         """
         The function creates a frame with labels displaying information about the number of different
         profiles found and a recommendation for manual review.
@@ -719,6 +990,8 @@ class App_GUI(tk.Tk):
         :param n_diff: The `n_diff` parameter in the `create_diff_profiles_actions` method represents
         the number of profiles that have differences. This parameter is used to display a message
         informing the user about the number of profiles with differences found in the application
+        :param export: The `export` parameter adds an "Exportar" button when there are differences, see
+        `export_differences` (optional)
         """
         actions_frame = tk.Frame(self.content_frame, height=100)
         actions_frame.grid(row=2, column=0)
@@ -739,17 +1012,271 @@ class App_GUI(tk.Tk):
         )
         description.grid(row=1, column=0)
 
+        if n_diff and export is not None:
+            tk.Button(
+                actions_frame,
+                text="Exportar",
+                command=export,
+                font=("Arial", 12)
+            ).grid(row=2, column=0, pady=5)
+
 
     def reports_diff_frame_with_progress(self):
         """
         This function generates a difference report frame with progress indication.
         """
-        def reports_diff_frame():
-            self.create_reports_diff_frame(
-                reports_diff = self.compare_data.compare_users_groups()
-            )
+        def compute(task):
+            # Only the operators that changed since the previous report are compared again, the rest
+            # of the result is taken from the comparison of that report.
+            reports_diff = self.compare_data.compare_users_groups_incremental()["diff"]
+
+            return self.compare_data.get_search_index("users_groups", reports_diff)
+
+        def render(search_index):
+            self.create_reports_diff_frame(reports_diff = search_index.records, search_index = search_index)
         
-        self.show_loading_screen(reports_diff_frame)
+        self.show_loading_screen(compute, render)
+
+    
+    def create_role_mining_frame(self, mining_result: dict) -> None:
+        """
+        The function `create_role_mining_frame` shows the candidate profiles proposed by `Role_Mining`
+        in a table, together with the closest existing profile of each one.
+        
+        :param mining_result: The `mining_result` parameter is the dictionary returned by
+        `Role_Mining.suggest_profiles`
+        :type mining_result: dict
+        """
+        self.create_description_frame(
+            title="Perfiles sugeridos a partir de los grupos de OPICS",
+            description="A continuación se listan los conjuntos de grupos más frecuentes entre los usuarios del último reporte RUGAR, agrupando los usuarios con grupos idénticos o casi idénticos, y el perfil actual de RBAC más parecido a cada uno"
+        )
+
+        self.configure_content_frame_rows()
+
+        table_frame = self.create_diff_frame()
+
+        columns = {
+            "candidate": ("Perfil sugerido", 140),
+            "users": ("Usuarios", 80),
+            "exact_users": ("Idénticos", 80),
+            "near_users": ("Similares", 80),
+            "groups": ("Grupos", 320),
+            "matched_profile": ("Perfil RBAC más cercano", 180),
+            "profile_similarity": ("Similitud", 80),
+            "profile_coverage": ("Cobertura", 80),
+        }
+
+        table = ttk.Treeview(table_frame, columns=list(columns), show="headings")
+
+        for column, (heading, width) in columns.items():
+            table.heading(column, text=heading)
+            table.column(column, width=width, anchor="w")
+
+        scrollbar = tk.Scrollbar(table_frame, orient=tk.VERTICAL, command=table.yview)
+        table.configure(yscrollcommand=scrollbar.set)
+
+        table.grid(row=0, column=0, sticky="nsew")
+        scrollbar.grid(row=0, column=1, sticky="ns")
+
+        def insert_candidates(candidates):
+            for candidate in candidates:
+                table.insert("", tk.END, values=(
+                    candidate["candidate"],
+                    len(candidate["users"]),
+                    candidate["exact_users"],
+                    candidate["near_users"],
+                    ", ".join(candidate["groups"]),
+                    candidate["matched_profile"] or "",
+                    f"{candidate['profile_similarity']:.0%}",
+                    f"{candidate['profile_coverage']:.0%}",
+                ))
+
+        self.task_runner.render_in_batches(mining_result["candidates"], insert_candidates, batch_size=50)
+
+        summary = mining_result["summary"]
+
+        actions_frame = tk.Frame(self.content_frame, height=100)
+        actions_frame.grid(row=2, column=0)
+
+        tk.Label(
+            actions_frame,
+            text=f"Se sugieren '{summary['candidates']}' perfiles que cubren el {summary['user_coverage']:.0%} de los usuarios",
+            font=("Arial", 12, "bold"),
+            pady=10
+        ).grid(row=0, column=0)
+
+        tk.Label(
+            actions_frame,
+            text=f"{summary['users']} usuarios, {summary['groups']} grupos y {summary['group_sets']} combinaciones distintas de grupos",
+            font=("Arial", 10, "italic"),
+            wraplength=650
+        ).grid(row=1, column=0)
+
+
+    def role_mining_frame_with_progress(self):
+        """
+        This function generates the role mining frame with progress indication.
+        """
+        def compute(task):
+            if self.role_mining is None:
+                # numpy is only imported when the user opens the role mining.
+                from .role_mining import Role_Mining
+                self.role_mining = Role_Mining(self.compare_data)
+
+            return self.role_mining.suggest_profiles()
+
+        def render(mining_result):
+            self.create_role_mining_frame(mining_result = mining_result)
+
+        self.show_loading_screen(compute, render)
+
+
+
+    def create_timings_frame(self) -> None:
+        """
+        The function `create_timings_frame` shows the spans recorded by the tracer in a tree: each
+        analysis or comparison run with the duration, peak memory and counters of its stages, the most
+        recent one first and expanded. The spans can be exported to a file.
+        """
+        self.create_description_frame(
+            title="Tiempos de ejecución",
+            description="A continuación se listan las etapas de las últimas ejecuciones, con su duración, la memoria máxima utilizada y la cantidad de registros procesados"
+        )
+
+        self.configure_content_frame_rows()
+
+        table_frame = self.create_diff_frame()
+
+        columns = {
+            "duration": ("Duración", 100),
+            "peak_memory": ("Memoria pico", 110),
+            "details": ("Detalle", 420),
+        }
+
+        table = ttk.Treeview(table_frame, columns=list(columns))
+        table.heading("#0", text="Etapa")
+        table.column("#0", width=280, anchor="w")
+
+        for column, (heading, width) in columns.items():
+            table.heading(column, text=heading)
+            table.column(column, width=width, anchor="w")
+
+        scrollbar = tk.Scrollbar(table_frame, orient=tk.VERTICAL, command=table.yview)
+        table.configure(yscrollcommand=scrollbar.set)
+
+        table.grid(row=0, column=0, sticky="nsew")
+        scrollbar.grid(row=0, column=1, sticky="ns")
+
+        actions_frame = self.create_frame_with_grid(
+            parent=self.content_frame, bg="#F0F0F0", row_position=2, columnspan=2
+        )
+
+        trace_memory = tk.BooleanVar(value=tracer.trace_memory)
+
+        def refresh():
+            table.delete(*table.get_children())
+            self.insert_timings(table, tracer.last_runs())
+
+        def toggle_trace_memory():
+            tracer.enable(trace_memory=trace_memory.get())
+
+        tk.Checkbutton(
+            actions_frame,
+            text="Medir memoria (más lento)",
+            variable=trace_memory,
+            command=toggle_trace_memory,
+            bg="#F0F0F0"
+        ).grid(row=0, column=0, padx=5)
+
+        for column, (text, command) in enumerate((
+            ("Actualizar", refresh),
+            ("Exportar JSON lines", lambda: self.export_timings("jsonl")),
+            ("Exportar Chrome trace", lambda: self.export_timings("json")),
+        ), start=1):
+            tk.Button(actions_frame, text=text, command=command, font=("Arial", 10)).grid(row=0, column=column, padx=5)
+
+        refresh()
+
+
+    def insert_timings(self, table: ttk.Treeview, runs: list) -> None:
+        """
+        The function `insert_timings` adds the spans of each run to the tree, nesting each span under
+        its parent.
+
+        :param table: The `table` parameter is the tree of the timings frame
+        :type table: ttk.Treeview
+        :param runs: The `runs` parameter is the list returned by `Tracer.last_runs`
+        :type runs: list
+        """
+        if not runs:
+            table.insert("", tk.END, text="No hay ejecuciones registradas")
+            return
+
+        for position, (root, records) in enumerate(runs):
+            children: dict[int, list] = {}
+
+            for record in records:
+                children.setdefault(record.parent_id, []).append(record)
+
+            def insert(parent_item, record):
+                item = table.insert(parent_item, tk.END, text=record.name, open=position == 0, values=(
+                    f"{record.duration * 1000:.1f} ms",
+                    f"{record.peak_memory / 1024:.0f} KB" if record.peak_memory is not None else "",
+                    self.format_span_details(record.details),
+                ))
+
+                for child in sorted(children.get(record.span_id, []), key=lambda child: child.start):
+                    insert(item, child)
+
+            insert("", root)
+
+
+    def format_span_details(self, details: dict) -> str:
+        """
+        The function `format_span_details` describes the counters and attributes of a span.
+
+        :param details: The `details` parameter is the `details` of a `Span_Record`
+        :type details: dict
+        :return: A text like "hoja: perfil-usuario · registros: 1200".
+        """
+        details_names = {
+            "sheet": "hoja", "records": "registros", "rows": "filas", "columns": "columnas",
+            "users": "usuarios", "profiles": "perfiles", "groups": "grupos", "operators": "operadores",
+            "differences": "diferencias", "calls": "llamadas", "chunks": "bloques", "bytes": "bytes",
+            "opics_not_in_rbac": "solo en OPICS", "rbac_not_in_opics": "solo en RBAC",
+            "cached": "desde caché", "rugar_ready": "RUGAR precargado", "workers": "procesos",
+        }
+
+        def format_value(value):
+            if isinstance(value, bool):
+                return "sí" if value else "no"
+            return value
+
+        return " · ".join(f"{details_names.get(name, name)}: {format_value(value)}" for name, value in details.items())
+
+
+    def export_timings(self, extension: str) -> None:
+        """
+        The function `export_timings` asks for a file and writes the recorded spans to it.
+
+        :param extension: The `extension` parameter is "jsonl" for JSON lines or "json" for the Chrome
+        trace format
+        :type extension: str
+        """
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=f".{extension}",
+            filetypes=[("JSON lines", "*.jsonl")] if extension == "jsonl" else [("Chrome trace", "*.json")]
+        )
+
+        if not path:
+            return
+
+        if extension == "jsonl":
+            tracer.export_jsonl(path)
+        else:
+            tracer.export_chrome_trace(path)
 
     
     def show_content(self):
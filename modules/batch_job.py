@@ -0,0 +1,196 @@
+import argparse
+import os
+
+from utils import saves_json_file, tracer, RBAC_Keys, JSON_PATH
+from .analyzer_rbac import Analyze_RBAC
+from .analyzer_rugar import Analyze_RUGAR, REPORT_NAME_PATTERN
+from .compare_data import Compare_Data
+from .export_data import Export_Data, ROW_WRITERS
+
+
+# Exit codes of the batch run.
+EXIT_OK = 0
+EXIT_DISCREPANCIES = 1
+EXIT_ERROR = 2
+
+
+
+def run_batch(
+    report_date: str | None = None,
+    report_path: str | None = None,
+    workbook_path: str | None = None,
+    output_folder: str = JSON_PATH,
+    export_format: str | None = None,
+    incremental: bool = False,
+    workers: int = 1
+) -> dict[str, int]:
+    """
+    The function `run_batch` compares the RUGAR report and the RBAC workbook without the GUI and writes
+    the results to the output folder: `users_diff.json` (users only in one of the sources),
+    `groups_diff.json` (users whose groups differ) and `counts.json`.
+
+    :param report_date: The `report_date` parameter is the date of the RUGAR report as YYYYMMDD,
+    defaults to the date of `Analyze_RUGAR` (optional)
+    :type report_date: str | None
+    :param report_path: The `report_path` parameter is the RUGAR report to analyze, defaults to the
+    report of `report_date` in the reports folder (optional)
+    :type report_path: str | None
+    :param workbook_path: The `workbook_path` parameter is the RBAC workbook to analyze, defaults to the
+    path of `Analyze_RBAC` (optional)
+    :type workbook_path: str | None
+    :param output_folder: The `output_folder` parameter is the folder where the results are written,
+    defaults to `JSON_PATH` (optional)
+    :type output_folder: str
+    :param export_format: The `export_format` parameter is "csv", "jsonl" or "xlsx" to also export the
+    differences as `users_diff` and `groups_diff` files in that format, see `Export_Data` (optional)
+    :type export_format: str | None
+    :param incremental: The `incremental` parameter compares the groups with
+    `Compare_Data.compare_users_groups_incremental`, reusing the result of the previous report of the
+    folder, defaults to `False` (optional)
+    :type incremental: bool
+    :param workers: The `workers` parameter is the number of processes that parse the sheets of the
+    workbook, see `Analyze_RBAC.load_sheets_in_parallel`, defaults to 1 (optional)
+    :type workers: int
+    :return: The counts of the comparison, as written in `counts.json`.
+    """
+    rugar = Analyze_RUGAR(report_date=report_date)
+    rbac = Analyze_RBAC(workers=workers)
+
+    if report_path:
+        rugar.report_path = report_path
+
+        # The previous reports of the incremental comparison are searched next to the report, and its
+        # date is taken from its name.
+        rugar.reports_folder = os.path.join(os.path.dirname(os.path.abspath(report_path)), "")
+        match = REPORT_NAME_PATTERN.match(os.path.basename(report_path))
+
+        if match and not report_date:
+            rugar.report_date = match.group(1)
+    if workbook_path:
+        rbac.rbac_path = workbook_path
+
+    for path in (rugar.report_path, rbac.rbac_path):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"No se encontró el archivo {path}")
+
+    compare_data = Compare_Data(rugar, rbac)
+    compare_data.preload()
+
+    opics_not_in_rbac, rbac_not_in_opics = compare_data.compare_users_in_reports()
+
+    if incremental:
+        groups_result = compare_data.compare_users_groups_incremental()
+        groups_diff = groups_result["diff"]
+    else:
+        groups_diff = compare_data.compare_users_groups()
+
+    snapshot = compare_data.get_snapshot()
+
+    counts = {
+        "report_date": rugar.report_date,
+        "opics_users": len(snapshot.opics_users),
+        "rbac_users": len(snapshot.rbac_data[RBAC_Keys.PROFILES_USERS]),
+        "opics_not_in_rbac": len(opics_not_in_rbac),
+        "rbac_not_in_opics": len(rbac_not_in_opics),
+        "users_with_groups_diff": len(groups_diff),
+    }
+    if incremental:
+        counts["incremental"] = groups_result["incremental"]
+
+    counts["discrepancies"] = (
+        counts["opics_not_in_rbac"] + counts["rbac_not_in_opics"] + counts["users_with_groups_diff"]
+    )
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    saves_json_file(os.path.join(output_folder, "users_diff.json"), {
+        "opics_not_in_rbac": opics_not_in_rbac,
+        "rbac_not_in_opics": rbac_not_in_opics,
+    })
+    saves_json_file(os.path.join(output_folder, "groups_diff.json"), groups_diff)
+    saves_json_file(os.path.join(output_folder, "counts.json"), counts)
+
+    if export_format:
+        export_data = Export_Data(compare_data)
+        export_data.export_users_diff(
+            os.path.join(output_folder, f"users_diff.{export_format}"), (opics_not_in_rbac, rbac_not_in_opics)
+        )
+        export_data.export_users_groups_diff(os.path.join(output_folder, f"groups_diff.{export_format}"), groups_diff)
+
+    return counts
+
+
+def export_trace(path: str) -> None:
+    """
+    The function `export_trace` writes the spans recorded by the tracer, as JSON lines when the file
+    ends in ".jsonl" and in the Chrome trace format otherwise.
+
+    :param path: The `path` parameter is the file to write
+    :type path: str
+    """
+    if path.endswith(".jsonl"):
+        tracer.export_jsonl(path)
+    else:
+        tracer.export_chrome_trace(path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    The function `main` is the command line of the batch run, see `batch.py`.
+
+    :param argv: The `argv` parameter is the list of arguments, defaults to `sys.argv` (optional)
+    :type argv: list[str] | None
+    :return: `EXIT_OK` when both sources match, `EXIT_DISCREPANCIES` when differences were found and
+    `EXIT_ERROR` when the comparison could not run.
+    """
+    parser = argparse.ArgumentParser(description="Compara el reporte RUGAR con el libro RBAC sin interfaz gráfica.")
+    parser.add_argument("--report-date", help="Fecha del reporte RUGAR (YYYYMMDD)")
+    parser.add_argument("--report-path", help="Ruta del reporte RUGAR")
+    parser.add_argument("--workbook-path", help="Ruta del libro RBAC")
+    parser.add_argument("--output", default=JSON_PATH, help="Carpeta donde se guardan los resultados")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Compara solo los operadores que cambiaron desde el reporte anterior de la carpeta"
+    )
+    parser.add_argument(
+        "--export",
+        choices=[extension.lstrip(".") for extension in ROW_WRITERS],
+        help="Exporta también las diferencias en este formato"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Procesos que leen en paralelo las hojas del libro RBAC que no están en caché"
+    )
+    parser.add_argument(
+        "--trace",
+        help="Archivo donde se guardan los tiempos de cada etapa, en formato Chrome trace (.json) o JSON lines (.jsonl)"
+    )
+    parser.add_argument("--trace-memory", action="store_true", help="Mide también la memoria de cada etapa (más lento)")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        tracer.enable(trace_memory=args.trace_memory)
+
+    try:
+        counts = run_batch(
+            args.report_date, args.report_path, args.workbook_path, args.output, args.export, args.incremental,
+            args.workers
+        )
+    except FileNotFoundError as error:
+        print(error)
+        return EXIT_ERROR
+    except Exception as error:
+        print(f"No se pudo completar la comparación: {error}")
+        return EXIT_ERROR
+    finally:
+        if args.trace:
+            export_trace(args.trace)
+
+    print(f"Usuarios OPICS que no están en RBAC: {counts['opics_not_in_rbac']}")
+    print(f"Usuarios RBAC que no están en OPICS: {counts['rbac_not_in_opics']}")
+    print(f"Usuarios con diferencias de grupos: {counts['users_with_groups_diff']}")
+
+    return EXIT_DISCREPANCIES if counts["discrepancies"] else EXIT_OK
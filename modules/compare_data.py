@@ -1,31 +1,326 @@
-from measure_run_time import measure_run_time
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Iterable, Mapping, NamedTuple, Sequence
 
-from utils import array_diff, array_object_diff, RBAC_Keys, OPICS_Keys, RBAC_Profile_Group_Keys
-from .analyzer_rbac import Analyze_RBAC
+from utils import (
+    array_object_diff, RBAC_Keys, OPICS_Keys, RBAC_Profile_Keys, RBAC_Profile_Group_Keys,
+    Fingerprint_Cache, Group_Table, Progress_Callback, Progress_Reporter, Search_Index, span, traced
+)
+from .analyzer_rbac import Analyze_RBAC, load_workbook_sheets
 from .analyzer_rugar import Analyze_RUGAR
 
 
+# The class `Analysis_Snapshot` holds the result of analyzing both reports once. Every comparison
+# reads from it, so it is never modified after being built.
+class Analysis_Snapshot(NamedTuple):
+    opics_users: tuple[dict, ...]
+    opics_users_map: Mapping[str, dict]
+    rbac_data: Mapping[str, list[dict]]
+    profiles_groups: Mapping[str, list[str]]
+    users_groups: Mapping[str, list[str]]
+    group_table: Group_Table
+    opics_groups_bits: Mapping[str, int]
+    profiles_groups_bits: Mapping[str, int]
+    fingerprints: tuple
+
+
+# Sheets of the workbook held by the snapshot, the ones the comparisons read.
+SNAPSHOT_SHEETS = (RBAC_Keys.PROFILES_USERS, RBAC_Keys.PROFILES_GROUPS, RBAC_Keys.PROFILES)
+
+
 class Compare_Data():
-    def __init__(self, rugar: Analyze_RUGAR, rbac: Analyze_RBAC):
+    def __init__(self, rugar: Analyze_RUGAR, rbac: Analyze_RBAC, ignore_group_case_and_spaces: bool = False):
         self.rugar = rugar
         self.rbac = rbac
 
-    @measure_run_time
+        # Matching of group names in the comparisons, changing it requires a `refresh`.
+        self.ignore_group_case_and_spaces = ignore_group_case_and_spaces
+
+        self.snapshot: Analysis_Snapshot | None = None
+
+        # The GUI runs the comparisons in worker threads, a cancelled one may still be analyzing the
+        # reports when the next one starts.
+        self.snapshot_lock = threading.RLock()
+
+        # Per report cache of the groups differences, used by the incremental comparison.
+        self.diff_cache = Fingerprint_Cache(namespace="users_groups_diff")
+
+        self.progress_callback: Progress_Callback | None = None
+
+        # Search indexes of the lists of differences, by name, with the snapshot they were built for.
+        self.search_indexes: dict[str, tuple[Analysis_Snapshot, Search_Index]] = {}
+
+        # Analyses started by `preload`, joined by the next snapshot.
+        self.rbac_preload: Future | None = None
+        self.rugar_preload: Future | None = None
+
+
+    def set_progress_callback(self, callback: Progress_Callback | None) -> None:
+        """
+        The function `set_progress_callback` sets the callback that receives the progress of the
+        comparisons and of the analysis of both reports.
+
+        :param callback: The `callback` parameter receives each `Progress_Event`, or `None` to stop the
+        reports
+        :type callback: Progress_Callback | None
+        """
+        self.progress_callback = callback
+        self.rugar.progress_callback = callback
+        self.rbac.progress_callback = callback
+
+
+    def preload(self) -> None:
+        """
+        The function `preload` starts analyzing both sources in the background, so the first comparison
+        usually finds them ready. The RBAC workbook is parsed in a child process, since openpyxl is CPU
+        bound, with the `workers` of `Analyze_RBAC`, and the RUGAR report in a thread, since reading it
+        is mostly I/O. The next snapshot waits for both and uses their results.
+        """
+        with self.snapshot_lock:
+            if self.rbac_preload is not None or self.rugar_preload is not None:
+                return
+
+            if os.path.exists(self.rbac.rbac_path):
+                process_pool = ProcessPoolExecutor(max_workers=1)
+                self.rbac_preload = process_pool.submit(
+                    load_workbook_sheets, self.rbac.rbac_path, tuple(self.rbac.sheet_columns), self.rbac.use_cache,
+                    self.rbac.workers
+                )
+                process_pool.shutdown(wait=False)
+
+            if os.path.exists(self.rugar.report_path):
+                thread_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rugar-preload")
+                self.rugar_preload = thread_pool.submit(self.preload_rugar)
+                thread_pool.shutdown(wait=False)
+
+
+    def preload_rugar(self) -> tuple:
+        """
+        The function `preload_rugar` analyzes the RUGAR report, it runs in the thread started by
+        `preload`.
+        :return: The fingerprint of the report that was analyzed, as in `source_fingerprints`.
+        """
+        fingerprint = self.source_fingerprints()[0]
+        self.rugar.analyze_rugar_report()
+
+        return fingerprint
+
+
+    def join_preload(self, fingerprints: tuple) -> bool:
+        """
+        The function `join_preload` waits for the analyses started by `preload`. The sheets of the
+        workbook are handed over to `Analyze_RBAC`, which checks that the workbook has not changed. A
+        failed preload is ignored, the source is analyzed again as usual.
+
+        :param fingerprints: The `fingerprints` parameter is the version of the sources being analyzed
+        :type fingerprints: tuple
+        :return: `True` when the RUGAR report was already analyzed in its current version.
+        """
+        rugar_ready = False
+
+        if self.rbac_preload is not None:
+            try:
+                self.rbac.preload_workbook(*self.rbac_preload.result())
+            except Exception:
+                pass
+            self.rbac_preload = None
+
+        if self.rugar_preload is not None:
+            try:
+                rugar_ready = self.rugar_preload.result() == fingerprints[0]
+            except Exception:
+                pass
+            self.rugar_preload = None
+
+        return rugar_ready
+
+
+    def source_fingerprints(self) -> tuple:
+        """
+        The function `source_fingerprints` returns the size and modification time of the RUGAR report
+        and the RBAC workbook, used to know if the snapshot is still valid.
+        :return: A tuple with one `(path, size, mtime)` entry per source file, with `None` instead of
+        size and mtime when the file does not exist.
+        """
+        fingerprints = []
+
+        for path in (self.rugar.report_path, self.rbac.rbac_path):
+            try:
+                stat = os.stat(path)
+                fingerprints.append((path, stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                fingerprints.append((path, None, None))
+
+        return tuple(fingerprints)
+
+
+    def get_snapshot(self, refresh: bool = False) -> Analysis_Snapshot:
+        """
+        The function `get_snapshot` returns the memoized analysis of both reports, building it again
+        only when a source file changed or a refresh is requested.
+
+        :param refresh: The `refresh` parameter forces the reports to be analyzed again, defaults to
+        `False` (optional)
+        :type refresh: bool
+        :return: The current `Analysis_Snapshot`.
+        """
+        with self.snapshot_lock:
+            fingerprints = self.source_fingerprints()
+
+            if refresh or self.snapshot is None or self.snapshot.fingerprints != fingerprints:
+                self.snapshot = self.build_snapshot(fingerprints)
+
+            return self.snapshot
+
+
+    def refresh(self) -> None:
+        """
+        The function `refresh` discards the memoized snapshot, the next comparison analyzes the
+        reports again.
+        """
+        with self.snapshot_lock:
+            self.snapshot = None
+
+
+    @traced("Analizar reportes")
+    def build_snapshot(self, fingerprints: tuple) -> Analysis_Snapshot:
+        """
+        The function `build_snapshot` analyzes the RBAC and RUGAR reports and freezes the result,
+        including the profile to groups and user to groups maps. The groups of both reports are interned
+        in one `Group_Table`, so the groups of each OPICS user and each RBAC profile are also kept as
+        bitsets.
+
+        :param fingerprints: The `fingerprints` parameter identifies the version of the source files
+        that is analyzed
+        :type fingerprints: tuple
+        :return: A new `Analysis_Snapshot`.
+        """
+        with span("Esperar precarga") as preload_span:
+            rugar_ready = self.join_preload(fingerprints)
+            preload_span.set(rugar_ready=rugar_ready)
+
+        self.rbac.analyze_rbac_report()
+
+        if not rugar_ready:
+            self.rugar.analyze_rugar_report()
+
+        # The sheets are copied out of the lazy `rbac_data` of the analyzer, which would load any other
+        # sheet from whatever workbook the analyzer holds at that moment.
+        with self.rbac.workbook_session():
+            rbac_data = {key: self.rbac.rbac_data[key] for key in SNAPSHOT_SHEETS}
+
+        profiles_groups = self.rbac.get_profile_groups_index()
+
+        users_groups = {
+            user[RBAC_Keys.USER]: user.get(RBAC_Profile_Group_Keys.GROUPS, [])
+            for user in rbac_data[RBAC_Keys.PROFILES_USERS]
+        }
+
+        opics_users_map = self.rugar.get_users_info()
+
+        with span("Indexar grupos") as index_span:
+            group_table = Group_Table(self.ignore_group_case_and_spaces)
+
+            opics_groups_bits = {
+                user_id: group_table.to_bits(user[OPICS_Keys.GROUPS])
+                for user_id, user in opics_users_map.items()
+            }
+
+            profiles_groups_bits = {
+                profile: group_table.to_bits(groups)
+                for profile, groups in profiles_groups.items()
+            }
+
+            index_span.set(groups=len(group_table))
+
+        return Analysis_Snapshot(
+            opics_users=tuple(self.rugar.users_info),
+            opics_users_map=MappingProxyType(opics_users_map),
+            rbac_data=MappingProxyType(rbac_data),
+            profiles_groups=MappingProxyType(profiles_groups),
+            users_groups=MappingProxyType(users_groups),
+            group_table=group_table,
+            opics_groups_bits=MappingProxyType(opics_groups_bits),
+            profiles_groups_bits=MappingProxyType(profiles_groups_bits),
+            fingerprints=fingerprints
+        )
+
+
+    def get_search_index(self, name: str, records: Sequence[dict]) -> Search_Index:
+        """
+        The function `get_search_index` returns the search index of a list of differences, building it
+        once per list. The index is reused while the same list is searched again on the same snapshot,
+        any other list gets its own index.
+
+        :param name: The `name` parameter is the kind of list, one of the keys of `search_fields`
+        :type name: str
+        :param records: The `records` parameter is the list of differences to search
+        :type records: Sequence[dict]
+        :return: A `Search_Index` of the records.
+        """
+        snapshot = self.get_snapshot()
+        cached = self.search_indexes.get(name)
+
+        if cached is not None and cached[0] is snapshot and cached[1].records is records:
+            return cached[1]
+
+        with span("Indexar búsqueda", list=name, records=len(records)):
+            search_index = Search_Index(records, self.search_fields(name, snapshot))
+
+        self.search_indexes[name] = (snapshot, search_index)
+
+        return search_index
+
+
+    def search_fields(self, name: str, snapshot: Analysis_Snapshot) -> Callable[[dict], Iterable]:
+        """
+        The function `search_fields` returns the searchable values of the records of each list of
+        differences: the operator id, the name, the profile and the groups.
+
+        :param name: The `name` parameter is "opics_not_in_rbac", "rbac_not_in_opics" or
+        "users_groups", for the lists of `compare_users_in_reports` and `compare_users_groups`
+        :type name: str
+        :param snapshot: The `snapshot` parameter is the analysis the differences come from, used to
+        find the name of the operators
+        :type snapshot: Analysis_Snapshot
+        :return: A function that receives a record and returns its values.
+        """
+        def opics_user_fields(user: dict) -> Iterable:
+            return (user[OPICS_Keys.USER], user[OPICS_Keys.USERNAME], *user[OPICS_Keys.GROUPS])
+
+        def rbac_user_fields(user: dict) -> Iterable:
+            return (
+                user[RBAC_Keys.USER], user.get(OPICS_Keys.USERNAME), user.get(RBAC_Profile_Keys.PROFILE),
+                *user.get(RBAC_Profile_Group_Keys.GROUPS, [])
+            )
+
+        def users_groups_fields(user_diff: dict) -> Iterable:
+            opics_user = snapshot.opics_users_map.get(user_diff["opics_user"], {})
+
+            return (
+                user_diff["opics_user"], opics_user.get(OPICS_Keys.USERNAME), user_diff["rbac_profile"],
+                *user_diff["opics_groups"], *user_diff["rbac_groups"]
+            )
+
+        return {
+            "opics_not_in_rbac": opics_user_fields,
+            "rbac_not_in_opics": rbac_user_fields,
+            "users_groups": users_groups_fields,
+        }[name]
+
+
     def get_updated_data(self):
         """
         The function `get_updated_data` analyzes RBAC and Rugar reports and returns the users'
         information and RBAC data.
         :return: The `get_updated_data` method returns a list containing the `opics_data` and
-        `rbac_data`. The `opics_data` is obtained from the `users_info` attribute of the `rugar` object,
-        and the `rbac_data` is obtained from the `rbac_data` attribute of the `rbac` object.
+        `rbac_data` of the current analysis snapshot.
         """
-        self.rbac.analyze_rbac_report()
-        self.rugar.analyze_rugar_report()
+        snapshot = self.get_snapshot()
 
-        opics_data = self.rugar.users_info
-        rbac_data = self.rbac.rbac_data
-
-        return [opics_data, rbac_data]
+        return [list(snapshot.opics_users), snapshot.rbac_data]
 
 
     def compare_users_in_reports(self) -> tuple[list, list]:
@@ -37,10 +332,13 @@ class Compare_Data():
         `opics_data` and `rbac_data[RBAC_Keys.PROFILES_USERS]` based on the `OPICS_Keys.USER` key. The
         second list contains the differences between the
         """
-        [opics_data, rbac_data] = self.get_updated_data()
+        with span("Comparar usuarios") as compare_span:
+            [opics_data, rbac_data] = self.get_updated_data()
+
+            opics_not_in_rbac = array_object_diff(opics_data, rbac_data[RBAC_Keys.PROFILES_USERS], OPICS_Keys.USER) 
+            rbac_not_in_opics = array_object_diff(rbac_data[RBAC_Keys.PROFILES_USERS], opics_data, RBAC_Keys.USER)
 
-        opics_not_in_rbac = array_object_diff(opics_data, rbac_data[RBAC_Keys.PROFILES_USERS], OPICS_Keys.USER) 
-        rbac_not_in_opics = array_object_diff(rbac_data[RBAC_Keys.PROFILES_USERS], opics_data, RBAC_Keys.USER)
+            compare_span.set(opics_not_in_rbac=len(opics_not_in_rbac), rbac_not_in_opics=len(rbac_not_in_opics))
 
         return opics_not_in_rbac, rbac_not_in_opics
     
@@ -56,70 +354,191 @@ class Compare_Data():
         - "opics_user": the user ID from the Opics data
         - "rbac_profile": the profile
         """
-        [opics_data, rbac_data] = self.get_updated_data()
-
-        opics_users_map = {user[OPICS_Keys.USER]: user for user in opics_data}
-        diff = []
-        
-        for rbac_user in rbac_data[RBAC_Keys.PROFILES_USERS]:
-            rbac_user_id = rbac_user[RBAC_Keys.USER]
-            opics_user = opics_users_map.get(rbac_user_id)
-
-            if opics_user:
-                rbac_groups = sorted(rbac_user["grupos"])
-                opics_groups = sorted(opics_user["grupos"])
-
-                rbac_groups_diff = array_diff(rbac_groups, opics_groups)
-                opics_groups_diff = array_diff(opics_groups, rbac_groups)
-
-                if rbac_groups_diff or opics_groups_diff:
-                    diff.append({
-                        "rbac_user": rbac_user_id,
-                        "opics_user": opics_user[OPICS_Keys.USER],
-                        "rbac_profile": rbac_user["perfil"],
-                        "rbac_groups": rbac_groups,
-                        "rbac_groups_not_in_opics_groups": rbac_groups_diff,
-                        "opics_groups": opics_groups,
-                        "opics_groups_not_in_rbac_groups": opics_groups_diff,
-                    })
+        with span("Comparar grupos de usuarios") as compare_span:
+            snapshot = self.get_snapshot()
+            rbac_users = snapshot.rbac_data[RBAC_Keys.PROFILES_USERS]
+
+            progress = Progress_Reporter(self.progress_callback, "Comparando usuarios", len(rbac_users), "usuarios")
+
+            diff = []
+            
+            for position, rbac_user in enumerate(rbac_users):
+                user_diff = self.compare_user_groups(snapshot, rbac_user)
+
+                if user_diff:
+                    diff.append(user_diff)
+
+                if progress.due():
+                    progress.update(position + 1, differences=len(diff))
+
+            progress.finish(differences=len(diff))
+            compare_span.set(users=len(rbac_users), differences=len(diff))
 
         return diff
     
 
-    def compare_profiles_groups(self):
-        [opics_data, rbac_data] = self.get_updated_data()
+    @traced("Comparar grupos de usuarios (incremental)")
+    def compare_users_groups_incremental(self, previous_report_date: str | None = None) -> dict:
+        """
+        The function `compare_users_groups_incremental` computes the same differences as
+        `compare_users_groups` starting from the result stored for the report of a previous date. Only
+        the operators added, removed or with different groups since that report are compared again, the
+        rest of the result is reused. When there is no stored result for the previous report, or it was
+        computed against another version of the RBAC workbook, every user is compared. The result is
+        stored either way, for the comparison of the next report.
 
-        diff = []
-        profiles_groups = self.rbac.define_profile_groups()
+        :param previous_report_date: The `previous_report_date` parameter is the date of the previous
+        report as YYYYMMDD, defaults to the most recent report of the folder before the current one
+        (optional)
+        :type previous_report_date: str | None
+        :return: A dictionary with the `delta` of operators (`None` if the previous report is not
+        available), the `diff` list and whether the result was `incremental`.
+        """
+        snapshot = self.get_snapshot()
+        rbac_rows = snapshot.rbac_data[RBAC_Keys.PROFILES_USERS]
 
-        profiles_map = {
-            profile[RBAC_Profile_Group_Keys.PROFILE]: {
-                RBAC_Profile_Group_Keys.GROUPS: profile[RBAC_Profile_Group_Keys.GROUPS] 
-            }
-            for profile in profiles_groups
+        if previous_report_date is None:
+            previous_report_date = self.rugar.previous_report_date()
+
+        # The `(path, size, mtime)` of the workbook the snapshot was built from, see `source_fingerprints`.
+        rbac_fingerprint = snapshot.fingerprints[1]
+        previous_entry = self.load_users_groups_diff(previous_report_date) if previous_report_date else None
+
+        incremental = (
+            previous_entry is not None
+            and previous_entry["rbac"] == rbac_fingerprint
+            and previous_entry["ignore_group_case_and_spaces"] == self.ignore_group_case_and_spaces
+            and len(previous_entry["row_diffs"]) == len(rbac_rows)
+        )
+
+        if previous_entry is not None:
+            delta = self.rugar.operators_delta(previous_entry["operators"])
+        elif previous_report_date:
+            delta = self.previous_report_delta(previous_report_date)
+        else:
+            delta = None
+
+        if incremental:
+            affected = set(delta["added"]) | set(delta["removed"]) | set(delta["changed"])
+            row_diffs = list(previous_entry["row_diffs"])
+        else:
+            affected = None
+            row_diffs = [None] * len(rbac_rows)
+
+        progress = Progress_Reporter(self.progress_callback, "Comparando usuarios", len(rbac_rows), "usuarios")
+
+        for position, rbac_user in enumerate(rbac_rows):
+            if affected is None or rbac_user[RBAC_Keys.USER] in affected:
+                row_diffs[position] = self.compare_user_groups(snapshot, rbac_user)
+
+            if progress.due():
+                progress.update(position + 1)
+
+        diff = [row_diff for row_diff in row_diffs if row_diff]
+        progress.finish(differences=len(diff))
+
+        self.diff_cache.store(self.rugar.report_path, {
+            "rbac": rbac_fingerprint,
+            "ignore_group_case_and_spaces": self.ignore_group_case_and_spaces,
+            "operators": {
+                operator_id: list(operator[OPICS_Keys.GROUPS])
+                for operator_id, operator in self.rugar.operators.items()
+            },
+            "row_diffs": row_diffs,
+        })
+
+        return {
+            "delta": delta,
+            "diff": diff,
+            "incremental": incremental,
         }
-        
-        rbac_users_profiles = rbac_data[RBAC_Keys.PROFILES_USERS]
-        print(rbac_users_profiles)
 
-        rbac_profiles = []
-        
-        for i in rbac_data[RBAC_Keys.PROFILES]:
-            profile = i[RBAC_Profile_Group_Keys.PROFILE]
 
-            profile_groups = profiles_map.get(profile)
+    def load_users_groups_diff(self, report_date: str) -> dict | None:
+        """
+        The function `load_users_groups_diff` loads the stored result of the incremental comparison of
+        the report of a given date.
+
+        :param report_date: The `report_date` parameter is the date of the report as YYYYMMDD
+        :type report_date: str
+        :return: The stored entry, or `None` if there is none or the report changed since.
+        """
+        report_path = self.rugar.report_path_for(report_date)
+
+        if not os.path.exists(report_path):
+            return None
+
+        return self.diff_cache.load(report_path)
 
-            if not profile_groups:
-                print(f"El perfil '{profile}' no tiene grupos asignados")
-                continue
-            
-            users = []
 
-            # for j in 
+    def previous_report_delta(self, previous_report_date: str) -> dict[str, list[str]] | None:
+        """
+        The function `previous_report_delta` parses the report of a previous date, from its cache when
+        possible, and compares its operators with the current ones.
+
+        :param previous_report_date: The `previous_report_date` parameter is the date of the previous
+        report as YYYYMMDD
+        :type previous_report_date: str
+        :return: The delta of operators, or `None` if the previous report does not exist.
+        """
+        previous_rugar = Analyze_RUGAR(use_cache=self.rugar.use_cache, report_date=previous_report_date)
+        previous_rugar.reports_folder = self.rugar.reports_folder
+        previous_rugar.set_report_path()
+
+        if not os.path.exists(previous_rugar.report_path):
+            return None
+
+        previous_rugar.analyze_rugar_report()
 
-            rbac_profiles.append({
-                RBAC_Profile_Group_Keys.PROFILE: profile,
-                RBAC_Profile_Group_Keys.GROUPS: profile_groups
-            })
+        return self.rugar.operators_delta({
+            operator_id: operator[OPICS_Keys.GROUPS]
+            for operator_id, operator in previous_rugar.operators.items()
+        })
 
-        # for rbac_user in self.rbac_data[RBACKeys.PROFILES_GROUPS]:
\ No newline at end of file
+
+    def compare_user_groups(self, snapshot: Analysis_Snapshot, rbac_user: dict) -> dict | None:
+        """
+        The function `compare_user_groups` compares the groups of one RBAC user with the groups of the
+        same operator in OPICS. The groups are compared as bitsets, and the names of the missing groups
+        are picked from the groups of each report, as written there, only when the user has differences.
+
+        :param snapshot: The `snapshot` parameter is the analysis to compare against
+        :type snapshot: Analysis_Snapshot
+        :param rbac_user: The `rbac_user` parameter is a record of the "perfil-usuario" sheet
+        :type rbac_user: dict
+        :return: A dictionary with the differences, as described in `compare_users_groups`, or `None`
+        when the user is not in OPICS or has the same groups.
+        """
+        rbac_user_id = rbac_user[RBAC_Keys.USER]
+        opics_user = snapshot.opics_users_map.get(rbac_user_id)
+
+        if not opics_user:
+            return None
+
+        rbac_bits = snapshot.profiles_groups_bits.get(rbac_user[RBAC_Profile_Keys.PROFILE], 0)
+        opics_bits = snapshot.opics_groups_bits[rbac_user_id]
+
+        if rbac_bits == opics_bits:
+            return None
+
+        group_table = snapshot.group_table
+
+        rbac_missing_bits = rbac_bits & ~opics_bits
+        opics_missing_bits = opics_bits & ~rbac_bits
+
+        rbac_groups = sorted(rbac_user.get(RBAC_Profile_Group_Keys.GROUPS, []))
+        opics_groups = sorted(opics_user[OPICS_Keys.GROUPS])
+
+        return {
+            "rbac_user": rbac_user_id,
+            "opics_user": opics_user[OPICS_Keys.USER],
+            "rbac_profile": rbac_user["perfil"],
+            "rbac_groups": rbac_groups,
+            "rbac_groups_not_in_opics_groups": [
+                group for group in rbac_groups if group_table.bit(group) & rbac_missing_bits
+            ],
+            "opics_groups": opics_groups,
+            "opics_groups_not_in_rbac_groups": [
+                group for group in opics_groups if group_table.bit(group) & opics_missing_bits
+            ],
+        }
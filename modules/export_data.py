@@ -0,0 +1,284 @@
+import csv
+import json
+import os
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+
+from utils import (
+    OPICS_Keys, RBAC_Keys, RBAC_Profile_Keys, RBAC_Profile_Group_Keys, Progress_Callback, Progress_Reporter, span
+)
+from .compare_data import Compare_Data
+
+
+# Columns of the exported differences, see `users_diff_rows` and `users_groups_diff_rows`.
+USERS_DIFF_COLUMNS = ("diferencia", "usuario_opics", "nombre_del_usuario", "perfil", "grupos")
+USERS_GROUPS_DIFF_COLUMNS = (
+    "usuario_opics", "nombre_del_usuario", "perfil", "grupos_opics", "grupos_rbac",
+    "grupos_opics_no_en_rbac", "grupos_rbac_no_en_opics"
+)
+
+# Separator of the lists of groups in the cells of CSV and XLSX files, JSON lines keep them as lists.
+LIST_SEPARATOR = "; "
+
+XLSX_SHEET_NAME = "Diferencias"
+
+# Number of rows between two checks of `should_stop`.
+STOP_CHECK_INTERVAL = 1024
+
+
+
+def users_diff_rows(opics_not_in_rbac: Iterable[dict], rbac_not_in_opics: Iterable[dict]) -> Iterator[tuple]:
+    """
+    The function `users_diff_rows` turns the result of `Compare_Data.compare_users_in_reports` into
+    rows of `USERS_DIFF_COLUMNS`, first the users only in OPICS and then the users only in RBAC.
+
+    :param opics_not_in_rbac: The `opics_not_in_rbac` parameter is the OPICS users missing in RBAC
+    :type opics_not_in_rbac: Iterable[dict]
+    :param rbac_not_in_opics: The `rbac_not_in_opics` parameter is the RBAC users missing in OPICS
+    :type rbac_not_in_opics: Iterable[dict]
+    :return: An iterator of rows.
+    """
+    for user in opics_not_in_rbac:
+        yield (
+            "Solo en OPICS", user[OPICS_Keys.USER], user.get(OPICS_Keys.USERNAME), None,
+            user.get(OPICS_Keys.GROUPS, [])
+        )
+
+    for user in rbac_not_in_opics:
+        yield (
+            "Solo en RBAC", user[RBAC_Keys.USER], user.get(OPICS_Keys.USERNAME), user.get(RBAC_Profile_Keys.PROFILE),
+            user.get(RBAC_Profile_Group_Keys.GROUPS, [])
+        )
+
+
+def users_groups_diff_rows(users_groups_diff: Iterable[dict], opics_users_map: Mapping[str, dict]) -> Iterator[tuple]:
+    """
+    The function `users_groups_diff_rows` turns the result of `Compare_Data.compare_users_groups` into
+    rows of `USERS_GROUPS_DIFF_COLUMNS`.
+
+    :param users_groups_diff: The `users_groups_diff` parameter is the list of differences
+    :type users_groups_diff: Iterable[dict]
+    :param opics_users_map: The `opics_users_map` parameter is the OPICS users by id, used to find the
+    name of each user
+    :type opics_users_map: Mapping[str, dict]
+    :return: An iterator of rows.
+    """
+    for user_diff in users_groups_diff:
+        opics_user = opics_users_map.get(user_diff["opics_user"], {})
+
+        yield (
+            user_diff["opics_user"], opics_user.get(OPICS_Keys.USERNAME), user_diff["rbac_profile"],
+            user_diff["opics_groups"], user_diff["rbac_groups"],
+            user_diff["opics_groups_not_in_rbac_groups"], user_diff["rbac_groups_not_in_opics_groups"]
+        )
+
+
+def cell_values(row: Sequence) -> list:
+    """
+    The function `cell_values` joins the lists of a row with `LIST_SEPARATOR`, for the formats whose
+    cells only hold single values.
+    """
+    return [LIST_SEPARATOR.join(map(str, value)) if isinstance(value, list) else value for value in row]
+
+
+def write_csv_rows(path: str, columns: Sequence[str], rows: Iterable[Sequence]) -> None:
+    """
+    The function `write_csv_rows` writes the rows to a CSV file, one at a time. The file starts with a
+    byte order mark, so Excel opens it as UTF-8.
+    """
+    with open(path, mode="w", encoding="utf-8-sig", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        writer.writerows(cell_values(row) for row in rows)
+
+
+def write_jsonl_rows(path: str, columns: Sequence[str], rows: Iterable[Sequence]) -> None:
+    """
+    The function `write_jsonl_rows` writes the rows to a JSON lines file, one object per row.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+    with open(path, mode="w", encoding="utf-8") as file:
+        file.writelines(encoder.encode(dict(zip(columns, row))) + "\n" for row in rows)
+
+
+def write_xlsx_rows(path: str, columns: Sequence[str], rows: Iterable[Sequence]) -> None:
+    """
+    The function `write_xlsx_rows` writes the rows to a workbook in the write-only mode of openpyxl,
+    which streams the rows of the sheet to a temporary file instead of keeping its cells in memory.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(XLSX_SHEET_NAME)
+
+    sheet.append(columns)
+
+    for row in rows:
+        sheet.append(cell_values(row))
+
+    workbook.save(path)
+
+
+# Writer of each export format, by file extension.
+ROW_WRITERS: dict[str, Callable[[str, Sequence[str], Iterable[Sequence]], None]] = {
+    ".csv": write_csv_rows,
+    ".jsonl": write_jsonl_rows,
+    ".xlsx": write_xlsx_rows,
+}
+
+
+def export_rows(
+        path: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence],
+        total: int | None = None,
+        progress_callback: Progress_Callback | None = None,
+        should_stop: Callable[[], bool] | None = None
+    ) -> int | None:
+    """
+    The function `export_rows` writes rows to a file in the format of its extension, see
+    `ROW_WRITERS`. The rows are consumed one at a time, so a generator is never materialized. The file
+    is written next to the destination and moved there when complete, so a failed or stopped export
+    never leaves a partial file behind.
+
+    :param path: The `path` parameter is the file to write, ending in ".csv", ".jsonl" or ".xlsx"
+    :type path: str
+    :param columns: The `columns` parameter is the names of the columns
+    :type columns: Sequence[str]
+    :param rows: The `rows` parameter is the rows to write, with one value per column. Lists are
+    joined with `LIST_SEPARATOR` in CSV and XLSX files
+    :type rows: Iterable[Sequence]
+    :param total: The `total` parameter is the number of rows, for the progress, defaults to `None`
+    (optional)
+    :type total: int | None
+    :param progress_callback: The `progress_callback` parameter receives the progress of the export,
+    defaults to `None` (optional)
+    :type progress_callback: Progress_Callback | None
+    :param should_stop: The `should_stop` parameter is checked every `STOP_CHECK_INTERVAL` rows, the
+    export stops when it returns `True`, defaults to `None` (optional)
+    :type should_stop: Callable[[], bool] | None
+    :return: The number of rows written, or `None` when the export was stopped.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    writer = ROW_WRITERS.get(extension)
+
+    if writer is None:
+        raise ValueError(f"Formato de exportación no soportado: '{extension}', use {', '.join(ROW_WRITERS)}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+
+    progress = Progress_Reporter(progress_callback, f"Exportando {os.path.basename(path)}", total, "filas")
+    written = 0
+    stopped = False
+
+    def tracked_rows():
+        nonlocal written, stopped
+
+        for row in rows:
+            if should_stop is not None and written % STOP_CHECK_INTERVAL == 0 and should_stop():
+                stopped = True
+                return
+
+            yield row
+            written += 1
+
+            if progress.due():
+                progress.update(written)
+
+    try:
+        with span("Exportar filas", format=extension) as export_span:
+            writer(temporary_path, columns, tracked_rows())
+            export_span.set(rows=written)
+
+        if stopped:
+            os.remove(temporary_path)
+            return None
+
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+    progress.finish(rows=written)
+
+    return written
+
+
+
+class Export_Data():
+    def __init__(self, compare_data: Compare_Data):
+        """
+        The class `Export_Data` writes the differences found by `Compare_Data` to CSV, JSON lines or
+        XLSX files, for reviewing them outside the application. The rows are streamed to the file
+        as they are formatted.
+
+        :param compare_data: The `compare_data` parameter provides the comparisons, its progress
+        callback also receives the progress of the exports
+        :type compare_data: Compare_Data
+        """
+        self.compare_data = compare_data
+
+
+    def export_users_diff(
+            self,
+            path: str,
+            users_diff: tuple[list, list] | None = None,
+            should_stop: Callable[[], bool] | None = None
+        ) -> int | None:
+        """
+        The function `export_users_diff` exports the users that are only in OPICS or only in RBAC.
+
+        :param path: The `path` parameter is the file to write, see `export_rows`
+        :type path: str
+        :param users_diff: The `users_diff` parameter is the result of
+        `Compare_Data.compare_users_in_reports`, computed when it is not given (optional)
+        :type users_diff: tuple[list, list] | None
+        :param should_stop: The `should_stop` parameter stops the export, see `export_rows` (optional)
+        :type should_stop: Callable[[], bool] | None
+        :return: The number of rows written, or `None` when the export was stopped.
+        """
+        if users_diff is None:
+            users_diff = self.compare_data.compare_users_in_reports()
+
+        opics_not_in_rbac, rbac_not_in_opics = users_diff
+
+        return export_rows(
+            path, USERS_DIFF_COLUMNS, users_diff_rows(opics_not_in_rbac, rbac_not_in_opics),
+            total=len(opics_not_in_rbac) + len(rbac_not_in_opics),
+            progress_callback=self.compare_data.progress_callback,
+            should_stop=should_stop
+        )
+
+
+    def export_users_groups_diff(
+            self,
+            path: str,
+            users_groups_diff: list[dict] | None = None,
+            should_stop: Callable[[], bool] | None = None
+        ) -> int | None:
+        """
+        The function `export_users_groups_diff` exports the users whose groups in OPICS differ from
+        the groups of their profile in RBAC.
+
+        :param path: The `path` parameter is the file to write, see `export_rows`
+        :type path: str
+        :param users_groups_diff: The `users_groups_diff` parameter is the result of
+        `Compare_Data.compare_users_groups`, computed when it is not given (optional)
+        :type users_groups_diff: list[dict] | None
+        :param should_stop: The `should_stop` parameter stops the export, see `export_rows` (optional)
+        :type should_stop: Callable[[], bool] | None
+        :return: The number of rows written, or `None` when the export was stopped.
+        """
+        if users_groups_diff is None:
+            users_groups_diff = self.compare_data.compare_users_groups()
+
+        snapshot = self.compare_data.get_snapshot()
+
+        return export_rows(
+            path, USERS_GROUPS_DIFF_COLUMNS, users_groups_diff_rows(users_groups_diff, snapshot.opics_users_map),
+            total=len(users_groups_diff),
+            progress_callback=self.compare_data.progress_callback,
+            should_stop=should_stop
+        )
@@ -0,0 +1,548 @@
+import argparse
+import os
+import re
+import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils import file_hash, RBAC_Keys, OPICS_Keys, RBAC_Profile_Keys, RBAC_Profile_Group_Keys
+from .analyzer_rbac import Analyze_RBAC
+from .analyzer_rugar import Analyze_RUGAR, REPORT_NAME_PATTERN
+
+
+HISTORY_PATH = './files/history.sqlite3'
+
+WORKBOOK_DATE_PATTERN = re.compile(r'(\d{8})')
+
+# Memberships kept by the store. Each table holds the validity intervals of one relation, the
+# interval of a row is [valid_from, valid_to) and `valid_to` is NULL while it is still current.
+MEMBERSHIP_TABLES = {
+    "operator_groups": ("operator_id", "group_name"),
+    "profile_users": ("profile", "operator_id"),
+    "profile_groups": ("profile", "group_name"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    kind TEXT NOT NULL,
+    source_date TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    ingested_at TEXT NOT NULL,
+    PRIMARY KEY (kind, source_date)
+);
+
+CREATE TABLE IF NOT EXISTS operators (
+    operator_id TEXT PRIMARY KEY,
+    operator_name TEXT,
+    last_seen TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS operator_groups (
+    operator_id TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    valid_from TEXT NOT NULL,
+    valid_to TEXT
+);
+CREATE INDEX IF NOT EXISTS operator_groups_by_operator
+    ON operator_groups (operator_id, valid_from);
+CREATE INDEX IF NOT EXISTS operator_groups_by_group
+    ON operator_groups (group_name, valid_from);
+CREATE INDEX IF NOT EXISTS operator_groups_by_date
+    ON operator_groups (valid_from, valid_to);
+CREATE UNIQUE INDEX IF NOT EXISTS operator_groups_current
+    ON operator_groups (operator_id, group_name) WHERE valid_to IS NULL;
+
+CREATE TABLE IF NOT EXISTS profile_users (
+    profile TEXT NOT NULL,
+    operator_id TEXT NOT NULL,
+    valid_from TEXT NOT NULL,
+    valid_to TEXT
+);
+CREATE INDEX IF NOT EXISTS profile_users_by_operator
+    ON profile_users (operator_id, valid_from);
+CREATE INDEX IF NOT EXISTS profile_users_by_profile
+    ON profile_users (profile, valid_from);
+CREATE INDEX IF NOT EXISTS profile_users_by_date
+    ON profile_users (valid_from, valid_to);
+CREATE UNIQUE INDEX IF NOT EXISTS profile_users_current
+    ON profile_users (profile, operator_id) WHERE valid_to IS NULL;
+
+CREATE TABLE IF NOT EXISTS profile_groups (
+    profile TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    valid_from TEXT NOT NULL,
+    valid_to TEXT
+);
+CREATE INDEX IF NOT EXISTS profile_groups_by_profile
+    ON profile_groups (profile, valid_from);
+CREATE INDEX IF NOT EXISTS profile_groups_by_group
+    ON profile_groups (group_name, valid_from);
+CREATE INDEX IF NOT EXISTS profile_groups_by_date
+    ON profile_groups (valid_from, valid_to);
+CREATE UNIQUE INDEX IF NOT EXISTS profile_groups_current
+    ON profile_groups (profile, group_name) WHERE valid_to IS NULL;
+"""
+
+
+
+class History_Store():
+    def __init__(self, db_path: str = HISTORY_PATH, batch_size: int = 30):
+        """
+        The class `History_Store` keeps the history of the RUGAR reports and the RBAC workbook versions
+        in a SQLite database. Instead of a copy of every report, each membership (operator-group,
+        profile-user and profile-group) is stored once per interval of dates in which it held, so the
+        database grows with the changes and not with the number of days.
+
+        :param db_path: The `db_path` parameter is the location of the SQLite database, defaults to
+        `HISTORY_PATH` (optional)
+        :type db_path: str
+        :param batch_size: The `batch_size` parameter is the number of sources ingested per transaction
+        by `backfill`, defaults to 30 (optional)
+        :type batch_size: int
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+
+        folder = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(folder, exist_ok=True)
+
+        # Transactions are handled explicitly by `transaction`.
+        self.connection = sqlite3.connect(db_path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+        self.transaction_depth = 0
+
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+    def __enter__(self) -> "History_Store":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        The function `transaction` groups the statements executed inside it in one transaction. Nested
+        transactions join the outermost one, which commits at the end or rolls back on error.
+        """
+        if self.transaction_depth == 0:
+            self.connection.execute("BEGIN")
+
+        self.transaction_depth += 1
+
+        try:
+            yield self.connection
+        except BaseException:
+            self.transaction_depth -= 1
+
+            if self.transaction_depth == 0:
+                self.connection.execute("ROLLBACK")
+            raise
+
+        self.transaction_depth -= 1
+
+        if self.transaction_depth == 0:
+            self.connection.execute("COMMIT")
+
+
+    def last_date(self, kind: str) -> str | None:
+        """
+        The function `last_date` returns the date of the last source of a kind that was ingested.
+
+        :param kind: The `kind` parameter is "rugar" or "rbac"
+        :type kind: str
+        :return: The date as YYYYMMDD, or `None` if nothing was ingested yet.
+        """
+        row = self.connection.execute(
+            "SELECT MAX(source_date) FROM sources WHERE kind = ?", (kind,)
+        ).fetchone()
+
+        return row[0]
+
+
+    def check_source_date(self, kind: str, source_date: str) -> None:
+        """
+        The function `check_source_date` validates that a source can be appended to the history. Sources
+        are ingested in order of date, since every interval is closed by the next source.
+
+        :param kind: The `kind` parameter is "rugar" or "rbac"
+        :type kind: str
+        :param source_date: The `source_date` parameter is the date of the source as YYYYMMDD
+        :type source_date: str
+        """
+        datetime.strptime(source_date, "%Y%m%d")
+
+        last_date = self.last_date(kind)
+
+        if last_date is not None and source_date <= last_date:
+            raise ValueError(
+                f"La fecha {source_date} no es posterior a la última fecha ingresada ({last_date}) para {kind}"
+            )
+
+
+    def record_source(self, kind: str, source_date: str, path: str) -> None:
+        self.connection.execute(
+            "INSERT INTO sources (kind, source_date, path, sha256, ingested_at) VALUES (?, ?, ?, ?, ?)",
+            (kind, source_date, os.path.abspath(path), file_hash(path), datetime.now().isoformat(timespec="seconds"))
+        )
+
+
+    def apply_memberships(self, table: str, source_date: str, memberships: set[tuple[str, str]]) -> dict[str, int]:
+        """
+        The function `apply_memberships` moves the intervals of a table to a new date: the current
+        intervals that are not in `memberships` are closed and the new memberships open an interval.
+
+        :param table: The `table` parameter is one of `MEMBERSHIP_TABLES`
+        :type table: str
+        :param source_date: The `source_date` parameter is the date of the source as YYYYMMDD
+        :type source_date: str
+        :param memberships: The `memberships` parameter is the set of pairs that hold at that date
+        :type memberships: set[tuple[str, str]]
+        :return: A dictionary with the number of `opened` and `closed` intervals.
+        """
+        first_column, second_column = MEMBERSHIP_TABLES[table]
+
+        current = {
+            (first, second): rowid for rowid, first, second in self.connection.execute(
+                f"SELECT rowid, {first_column}, {second_column} FROM {table} WHERE valid_to IS NULL"
+            )
+        }
+
+        closed = [
+            (source_date, rowid) for membership, rowid in current.items() if membership not in memberships
+        ]
+        opened = [
+            (first, second, source_date) for first, second in memberships if (first, second) not in current
+        ]
+
+        self.connection.executemany(f"UPDATE {table} SET valid_to = ? WHERE rowid = ?", closed)
+        self.connection.executemany(
+            f"INSERT INTO {table} ({first_column}, {second_column}, valid_from) VALUES (?, ?, ?)", opened
+        )
+
+        return {"opened": len(opened), "closed": len(closed)}
+
+
+    def ingest_rugar(self, rugar: Analyze_RUGAR) -> dict[str, int]:
+        """
+        The function `ingest_rugar` adds an analyzed RUGAR report to the history, at its report date.
+
+        :param rugar: The `rugar` parameter is the analyzed report
+        :type rugar: Analyze_RUGAR
+        :return: A dictionary with the number of `opened` and `closed` operator-group intervals.
+        """
+        source_date = rugar.report_date
+        self.check_source_date("rugar", source_date)
+
+        memberships = {
+            (operator_id, group)
+            for operator_id, operator in rugar.operators.items()
+            for group in operator[OPICS_Keys.GROUPS]
+        }
+
+        with self.transaction() as connection:
+            self.record_source("rugar", source_date, rugar.report_path)
+
+            connection.executemany(
+                """
+                INSERT INTO operators (operator_id, operator_name, last_seen) VALUES (?, ?, ?)
+                ON CONFLICT (operator_id) DO UPDATE SET
+                    operator_name = excluded.operator_name, last_seen = excluded.last_seen
+                """,
+                (
+                    (operator_id, operator[OPICS_Keys.USERNAME], source_date)
+                    for operator_id, operator in rugar.operators.items()
+                )
+            )
+
+            return self.apply_memberships("operator_groups", source_date, memberships)
+
+
+    def ingest_rbac(self, rbac: Analyze_RBAC, source_date: str) -> dict[str, dict[str, int]]:
+        """
+        The function `ingest_rbac` adds a version of the RBAC workbook to the history. Only the
+        "perfil-usuario" and "perfil-grupo" sheets are read.
+
+        :param rbac: The `rbac` parameter is the analyzer pointing to the workbook version
+        :type rbac: Analyze_RBAC
+        :param source_date: The `source_date` parameter is the date since the version is in force, as
+        YYYYMMDD
+        :type source_date: str
+        :return: A dictionary with the `opened` and `closed` intervals of each table.
+        """
+        self.check_source_date("rbac", source_date)
+
+        with rbac.workbook_session():
+            profile_users = {
+                (record[RBAC_Profile_Keys.PROFILE], record[RBAC_Keys.USER])
+                for record in rbac.rbac_data[RBAC_Keys.PROFILES_USERS]
+                if record[RBAC_Profile_Keys.PROFILE] and record[RBAC_Keys.USER]
+            }
+            profile_groups = {
+                (profile, group)
+                for profile, groups in rbac.get_profile_groups_index().items()
+                if profile
+                for group in groups
+            }
+
+        with self.transaction():
+            self.record_source("rbac", source_date, rbac.rbac_path)
+
+            return {
+                "profile_users": self.apply_memberships("profile_users", source_date, profile_users),
+                "profile_groups": self.apply_memberships("profile_groups", source_date, profile_groups),
+            }
+
+
+    def backfill(self, reports_folder: str | None = None, workbooks_folder: str | None = None) -> dict[str, int]:
+        """
+        The function `backfill` ingests, in order of date, every RUGAR report (R01RUGAR_YYYYMMDD.rpt) and
+        every RBAC workbook (with a YYYYMMDD date in its name, or its modification date otherwise) of the
+        given folders that is newer than the history. Sources are committed in batches of `batch_size`.
+
+        :param reports_folder: The `reports_folder` parameter is the folder of the RUGAR reports
+        :type reports_folder: str | None
+        :param workbooks_folder: The `workbooks_folder` parameter is the folder of the RBAC workbooks
+        :type workbooks_folder: str | None
+        :return: A dictionary with the number of `rugar` and `rbac` sources ingested.
+        """
+        ingested = {"rugar": 0, "rbac": 0}
+
+        if reports_folder is not None:
+            pending = self.pending_sources("rugar", self.find_reports(reports_folder))
+
+            for batch in batched(pending, self.batch_size):
+                with self.transaction():
+                    for report_date, _ in batch:
+                        rugar = Analyze_RUGAR(use_cache=False, report_date=report_date)
+                        rugar.reports_folder = os.path.join(reports_folder, "")
+                        rugar.set_report_path()
+                        rugar.analyze_rugar_report()
+
+                        self.ingest_rugar(rugar)
+                        ingested["rugar"] += 1
+
+        if workbooks_folder is not None:
+            pending = self.pending_sources("rbac", self.find_workbooks(workbooks_folder))
+
+            for batch in batched(pending, self.batch_size):
+                with self.transaction():
+                    for workbook_date, workbook_path in batch:
+                        rbac = Analyze_RBAC(use_cache=False)
+                        rbac.rbac_path = workbook_path
+
+                        self.ingest_rbac(rbac, workbook_date)
+                        ingested["rbac"] += 1
+
+        return ingested
+
+
+    def pending_sources(self, kind: str, sources: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """
+        The function `pending_sources` keeps the sources newer than the last one ingested of their kind.
+
+        :param kind: The `kind` parameter is "rugar" or "rbac"
+        :type kind: str
+        :param sources: The `sources` parameter is a list of (date, path) sorted by date
+        :type sources: list[tuple[str, str]]
+        :return: The sources still to ingest.
+        """
+        last_date = self.last_date(kind) or ""
+
+        return [(source_date, path) for source_date, path in sources if source_date > last_date]
+
+
+    @staticmethod
+    def find_reports(folder: str) -> list[tuple[str, str]]:
+        """
+        The function `find_reports` lists the RUGAR reports of a folder.
+        :return: A list of (date, path) sorted by date.
+        """
+        reports = []
+
+        for name in os.listdir(folder):
+            match = REPORT_NAME_PATTERN.match(name)
+
+            if match:
+                reports.append((match.group(1), os.path.join(folder, name)))
+
+        return sorted(reports)
+
+
+    @staticmethod
+    def find_workbooks(folder: str) -> list[tuple[str, str]]:
+        """
+        The function `find_workbooks` lists the RBAC workbooks of a folder, dated by the YYYYMMDD in
+        their name or by their modification date. When two versions share a date the newest one is kept.
+        :return: A list of (date, path) sorted by date.
+        """
+        workbooks: dict[str, tuple[float, str]] = {}
+
+        for name in os.listdir(folder):
+            if not name.lower().endswith(".xlsx") or name.startswith("~$"):
+                continue
+
+            path = os.path.join(folder, name)
+            modified = os.path.getmtime(path)
+            match = WORKBOOK_DATE_PATTERN.search(name)
+            workbook_date = match.group(1) if match else datetime.fromtimestamp(modified).strftime("%Y%m%d")
+
+            if workbook_date not in workbooks or workbooks[workbook_date][0] < modified:
+                workbooks[workbook_date] = (modified, path)
+
+        return sorted((workbook_date, path) for workbook_date, (_, path) in workbooks.items())
+
+
+    def operator_history(self, operator_id: str, group: str | None = None) -> list[dict]:
+        """
+        The function `operator_history` answers when an operator gained or lost its groups.
+
+        :param operator_id: The `operator_id` parameter is the id of the operator
+        :type operator_id: str
+        :param group: The `group` parameter limits the history to one group, defaults to `None`
+        (optional)
+        :type group: str | None
+        :return: A list of dictionaries with the `group`, `valid_from` and `valid_to` (`None` while
+        current) of each interval, sorted by date.
+        """
+        query = "SELECT group_name, valid_from, valid_to FROM operator_groups WHERE operator_id = ?"
+        parameters: tuple = (operator_id,)
+
+        if group is not None:
+            query += " AND group_name = ?"
+            parameters += (group,)
+
+        rows = self.connection.execute(query + " ORDER BY valid_from, group_name", parameters)
+
+        return [{"group": group, "valid_from": valid_from, "valid_to": valid_to} for group, valid_from, valid_to in rows]
+
+
+    def group_history(self, group: str) -> list[dict]:
+        """
+        The function `group_history` lists the operators that had a group and when.
+
+        :param group: The `group` parameter is the group name
+        :type group: str
+        :return: A list of dictionaries with the `operator_id`, `valid_from` and `valid_to` of each
+        interval, sorted by date.
+        """
+        rows = self.connection.execute(
+            """
+            SELECT operator_id, valid_from, valid_to FROM operator_groups
+            WHERE group_name = ? ORDER BY valid_from, operator_id
+            """,
+            (group,)
+        )
+
+        return [
+            {"operator_id": operator_id, "valid_from": valid_from, "valid_to": valid_to}
+            for operator_id, valid_from, valid_to in rows
+        ]
+
+
+    def groups_as_of(self, as_of_date: str, operator_id: str | None = None) -> dict[str, list[str]]:
+        """
+        The function `groups_as_of` rebuilds the groups of the operators at a given date.
+
+        :param as_of_date: The `as_of_date` parameter is the date as YYYYMMDD
+        :type as_of_date: str
+        :param operator_id: The `operator_id` parameter limits the result to one operator, defaults to
+        `None` (optional)
+        :type operator_id: str | None
+        :return: A dictionary that maps each operator id to its sorted groups at that date.
+        """
+        query = """
+            SELECT operator_id, group_name FROM operator_groups
+            WHERE valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)
+        """
+        parameters: tuple = (as_of_date, as_of_date)
+
+        if operator_id is not None:
+            query += " AND operator_id = ?"
+            parameters += (operator_id,)
+
+        operators_groups: dict[str, list[str]] = {}
+
+        for operator, group in self.connection.execute(query + " ORDER BY operator_id, group_name", parameters):
+            operators_groups.setdefault(operator, []).append(group)
+
+        return operators_groups
+
+
+    def profiles_as_of(self, as_of_date: str) -> dict[str, dict[str, list[str]]]:
+        """
+        The function `profiles_as_of` rebuilds the RBAC assignments in force at a given date.
+
+        :param as_of_date: The `as_of_date` parameter is the date as YYYYMMDD
+        :type as_of_date: str
+        :return: A dictionary with the profiles of each user (`profile_users`) and the groups of each
+        profile (`profile_groups`).
+        """
+        profiles: dict[str, dict[str, list[str]]] = {"profile_users": {}, "profile_groups": {}}
+
+        for table, (first_column, second_column) in (
+            ("profile_users", ("operator_id", "profile")),
+            ("profile_groups", ("profile", "group_name")),
+        ):
+            rows = self.connection.execute(
+                f"""
+                SELECT {first_column}, {second_column} FROM {table}
+                WHERE valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)
+                ORDER BY {first_column}, {second_column}
+                """,
+                (as_of_date, as_of_date)
+            )
+
+            for first, second in rows:
+                profiles[table].setdefault(first, []).append(second)
+
+        return profiles
+
+
+
+def batched(items: list, size: int) -> Iterable[list]:
+    for start in range(0, len(items), max(size, 1)):
+        yield items[start:start + size]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Historial de accesos de OPICS y RBAC.")
+    parser.add_argument("--db", default=HISTORY_PATH, help="Base de datos del historial")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser("backfill", help="Ingresa los reportes y libros RBAC de una carpeta")
+    backfill.add_argument("--reports", help="Carpeta con los reportes R01RUGAR_YYYYMMDD.rpt")
+    backfill.add_argument("--workbooks", help="Carpeta con las versiones del libro RBAC")
+    backfill.add_argument("--batch-size", type=int, default=30)
+
+    history = commands.add_parser("history", help="Historial de grupos de un operador")
+    history.add_argument("operator_id")
+    history.add_argument("--group")
+
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        with History_Store(args.db, batch_size=args.batch_size) as store:
+            ingested = store.backfill(args.reports, args.workbooks)
+
+        print(f"Reportes RUGAR ingresados: {ingested['rugar']}")
+        print(f"Libros RBAC ingresados: {ingested['rbac']}")
+    else:
+        with History_Store(args.db) as store:
+            for interval in store.operator_history(args.operator_id, args.group):
+                print(f"{interval['group']:<40} {interval['valid_from']} - {interval['valid_to'] or 'vigente'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+from collections import Counter
+
+import numpy as np
+
+from utils import RBAC_Keys, OPICS_Keys, RBAC_Profile_Keys
+from .compare_data import Analysis_Snapshot, Compare_Data
+
+
+class Role_Mining():
+    def __init__(
+            self, compare_data: Compare_Data,
+            similarity_threshold: float = 0.8,
+            max_candidates: int = 100,
+            min_users: int = 2,
+            chunk_size: int = 4096
+        ):
+        """
+        The class `Role_Mining` proposes RBAC profiles from the groups the operators actually have in
+        OPICS. It works over a user x group incidence matrix kept in CSR form (`indptr`, `indices`) and
+        densified only in chunks of rows, so it scales to tens of thousands of users and groups.
+
+        :param compare_data: The `compare_data` parameter provides the analysis snapshot
+        :type compare_data: Compare_Data
+        :param similarity_threshold: The minimum Jaccard similarity for a group set to join a candidate
+        profile, defaults to 0.8 (optional)
+        :type similarity_threshold: float
+        :param max_candidates: The maximum number of candidate profiles, defaults to 100 (optional)
+        :type max_candidates: int
+        :param min_users: The minimum number of users with the same group set to propose it, defaults
+        to 2 (optional)
+        :type min_users: int
+        :param chunk_size: The number of matrix rows densified at once, defaults to 4096 (optional)
+        :type chunk_size: int
+        """
+        self.compare_data = compare_data
+
+        self.similarity_threshold = similarity_threshold
+        self.max_candidates = max_candidates
+        self.min_users = min_users
+        self.chunk_size = chunk_size
+
+
+    def build_incidence_matrix(self, snapshot: Analysis_Snapshot) -> tuple[list[str], np.ndarray, np.ndarray, int]:
+        """
+        The function `build_incidence_matrix` builds the sparse user x group matrix of the OPICS users,
+        using the group ids of the snapshot `Group_Table`.
+
+        :param snapshot: The `snapshot` parameter is the analysis to mine
+        :type snapshot: Analysis_Snapshot
+        :return: A tuple with the user ids (rows), the CSR `indptr` and `indices` arrays and the number
+        of groups (columns).
+        """
+        group_table = snapshot.group_table
+
+        users = []
+        indptr = [0]
+        indices = []
+
+        for user_id, user in snapshot.opics_users_map.items():
+            group_ids = group_table.lookup_all(user[OPICS_Keys.GROUPS])
+
+            users.append(user_id)
+            indices.extend(group_ids)
+            indptr.append(len(indices))
+
+        return users, np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64), len(group_table)
+
+
+    def dense_rows(self, indptr: np.ndarray, indices: np.ndarray, start: int, end: int, n_groups: int) -> np.ndarray:
+        """
+        The function `dense_rows` densifies the rows `start:end` of the CSR matrix.
+
+        :return: A `float32` array of shape `(end - start, n_groups)` with ones where a user has a group.
+        """
+        dense = np.zeros((end - start, n_groups), dtype=np.float32)
+
+        row_lengths = np.diff(indptr[start:end + 1])
+        rows = np.repeat(np.arange(end - start), row_lengths)
+        dense[rows, indices[indptr[start]:indptr[end]]] = 1
+
+        return dense
+
+
+    def group_cooccurrence(self, indptr: np.ndarray, indices: np.ndarray, n_groups: int) -> np.ndarray:
+        """
+        The function `group_cooccurrence` counts, for every pair of groups, how many users have both.
+        This is the product of the transposed incidence matrix by itself, computed from the sparse rows:
+        for each chunk of users all the pairs of groups of every user are generated and counted with a
+        single `bincount`.
+
+        :return: A symmetric `(n_groups, n_groups)` array, the diagonal holds the users of each group.
+        """
+        n_users = len(indptr) - 1
+        cooccurrence = np.zeros(n_groups * n_groups, dtype=np.int64)
+
+        for start in range(0, n_users, self.chunk_size):
+            end = min(start + self.chunk_size, n_users)
+
+            row_lengths = np.diff(indptr[start:end + 1])
+            entries = indices[indptr[start]:indptr[end]]
+            entry_rows = np.repeat(np.arange(end - start), row_lengths)
+
+            partners = row_lengths[entry_rows]
+            row_starts = (indptr[start:end] - indptr[start])[entry_rows]
+
+            left = np.repeat(entries, partners)
+            block_offsets = np.arange(len(left)) - np.repeat(np.cumsum(partners) - partners, partners)
+            right = entries[np.repeat(row_starts, partners) + block_offsets]
+
+            cooccurrence += np.bincount(left * n_groups + right, minlength=n_groups * n_groups)
+
+        return cooccurrence.reshape(n_groups, n_groups)
+
+
+    def top_cooccurring_groups(self, cooccurrence: np.ndarray, group_names: list[str], limit: int = 50) -> list[dict]:
+        """
+        The function `top_cooccurring_groups` lists the pairs of groups that appear together in more
+        users, with the confidence of each direction of the pair.
+
+        :return: A list of dictionaries sorted by number of users, descending.
+        """
+        upper = np.triu(cooccurrence, k=1)
+        flat = np.flatnonzero(upper)
+
+        if not len(flat):
+            return []
+
+        top = flat[np.argsort(upper.flat[flat], kind="stable")[::-1][:limit]]
+        first, second = np.unravel_index(top, upper.shape)
+        support = np.diag(cooccurrence)
+
+        return [
+            {
+                "groups": (group_names[a], group_names[b]),
+                "users": int(cooccurrence[a, b]),
+                "confidence": (
+                    round(float(cooccurrence[a, b] / support[a]), 3),
+                    round(float(cooccurrence[a, b] / support[b]), 3)
+                ),
+            }
+            for a, b in zip(first.tolist(), second.tolist())
+        ]
+
+
+    def unique_group_sets(self, indptr: np.ndarray, indices: np.ndarray, n_groups: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The function `unique_group_sets` clusters the users with identical group sets. The rows of the
+        incidence matrix are packed as bits, read as 64 bit words and sorted lexicographically, so equal
+        rows end up next to each other.
+
+        :return: A tuple with the packed unique group sets, the index of the set of each user and the
+        number of users of each set.
+        """
+        n_users = len(indptr) - 1
+        n_bytes = -(-n_groups // 64) * 8
+        packed = np.zeros((n_users, n_bytes), dtype=np.uint8)
+
+        for start in range(0, n_users, self.chunk_size):
+            end = min(start + self.chunk_size, n_users)
+            rows = np.packbits(self.dense_rows(indptr, indices, start, end, n_groups).astype(bool), axis=1)
+            packed[start:end, :rows.shape[1]] = rows
+
+        words = packed.view(np.uint64)
+        order = np.lexsort(words.T[::-1])
+        sorted_words = words[order]
+
+        new_set = np.ones(n_users, dtype=bool)
+        new_set[1:] = np.any(sorted_words[1:] != sorted_words[:-1], axis=1)
+
+        sorted_set_ids = np.cumsum(new_set) - 1
+        inverse = np.empty(n_users, dtype=np.int64)
+        inverse[order] = sorted_set_ids
+
+        unique_sets = packed[order[new_set]][:, :(n_groups + 7) // 8]
+        counts = np.bincount(sorted_set_ids)
+
+        return unique_sets, inverse, counts
+
+
+    def jaccard_to_candidates(self, unique_sets: np.ndarray, candidates: np.ndarray, n_groups: int) -> np.ndarray:
+        """
+        The function `jaccard_to_candidates` computes the Jaccard similarity of every unique group set
+        with every candidate, by chunks of sets.
+
+        :return: A `(len(unique_sets), len(candidates))` array of similarities.
+        """
+        candidate_rows = np.unpackbits(unique_sets[candidates], axis=1, count=n_groups).astype(np.float32)
+        candidate_sizes = candidate_rows.sum(axis=1)
+
+        similarity = np.zeros((len(unique_sets), len(candidates)), dtype=np.float32)
+
+        for start in range(0, len(unique_sets), self.chunk_size):
+            end = min(start + self.chunk_size, len(unique_sets))
+            rows = np.unpackbits(unique_sets[start:end], axis=1, count=n_groups).astype(np.float32)
+
+            intersection = rows @ candidate_rows.T
+            union = rows.sum(axis=1)[:, None] + candidate_sizes[None, :] - intersection
+            similarity[start:end] = np.divide(intersection, union, out=np.ones_like(intersection), where=union > 0)
+
+        return similarity
+
+
+    def suggest_profiles(self, snapshot: Analysis_Snapshot | None = None) -> dict:
+        """
+        The function `suggest_profiles` mines the OPICS assignments of the snapshot. Users with the same
+        group set are clustered, the most frequent sets become candidate profiles and every other set
+        joins its most similar candidate when the similarity reaches `similarity_threshold`. Each
+        candidate is compared with the existing "perfil" definitions of RBAC.
+
+        :param snapshot: The `snapshot` parameter is the analysis to mine, defaults to the current one of
+        `compare_data` (optional)
+        :type snapshot: Analysis_Snapshot | None
+        :return: A dictionary with the `candidates`, the `cooccurrence` top pairs and a `summary`.
+        """
+        snapshot = snapshot or self.compare_data.get_snapshot()
+
+        users, indptr, indices, n_groups = self.build_incidence_matrix(snapshot)
+        group_names = snapshot.group_table.names
+
+        if not users or not n_groups:
+            return {"candidates": [], "cooccurrence": [], "summary": self.summary(users, n_groups, [])}
+
+        cooccurrence = self.group_cooccurrence(indptr, indices, n_groups)
+        unique_sets, inverse, counts = self.unique_group_sets(indptr, indices, n_groups)
+
+        order = np.argsort(counts, kind="stable")[::-1]
+        candidates = order[counts[order] >= self.min_users][:self.max_candidates]
+
+        if not len(candidates):
+            candidates = order[:1]
+
+        similarity = self.jaccard_to_candidates(unique_sets, candidates, n_groups)
+        best_candidate = similarity.argmax(axis=1)
+        best_similarity = similarity[np.arange(len(unique_sets)), best_candidate]
+        assigned = best_similarity >= self.similarity_threshold
+
+        user_candidate = np.where(assigned[inverse], best_candidate[inverse], -1)
+        rbac_profiles = self.rbac_users_profiles(snapshot)
+
+        results = []
+
+        for position, unique_index in enumerate(candidates.tolist()):
+            members = np.flatnonzero(user_candidate == position)
+            group_ids = np.flatnonzero(np.unpackbits(unique_sets[unique_index], count=n_groups))
+            groups = [group_names[group_id] for group_id in group_ids.tolist()]
+            member_ids = [users[member] for member in members.tolist()]
+
+            results.append({
+                "candidate": f"Perfil sugerido {position + 1}",
+                "groups": groups,
+                "users": member_ids,
+                "exact_users": int(counts[unique_index]),
+                "near_users": len(member_ids) - int(counts[unique_index]),
+                "user_coverage": round(len(member_ids) / len(users), 4),
+                "current_profiles": Counter(
+                    rbac_profiles[user_id] for user_id in member_ids if user_id in rbac_profiles
+                ).most_common(5),
+                **self.closest_profile(snapshot, groups),
+            })
+
+        return {
+            "candidates": results,
+            "cooccurrence": self.top_cooccurring_groups(cooccurrence, group_names),
+            "summary": self.summary(users, n_groups, results, len(unique_sets)),
+        }
+
+
+    def rbac_users_profiles(self, snapshot: Analysis_Snapshot) -> dict[str, str]:
+        """
+        The function `rbac_users_profiles` maps each user of the "perfil-usuario" sheet to its profile.
+        """
+        return {
+            user[RBAC_Keys.USER]: user[RBAC_Profile_Keys.PROFILE]
+            for user in snapshot.rbac_data[RBAC_Keys.PROFILES_USERS]
+        }
+
+
+    def closest_profile(self, snapshot: Analysis_Snapshot, groups: list[str]) -> dict:
+        """
+        The function `closest_profile` finds the existing profile most similar to a candidate group set,
+        comparing the bitsets of the snapshot.
+
+        :return: A dictionary with the `matched_profile`, its Jaccard `profile_similarity` and the
+        `profile_coverage`, the share of the profile groups present in the candidate.
+        """
+        candidate_bits = snapshot.group_table.lookup_bits(groups)
+        best = {"matched_profile": None, "profile_similarity": 0.0, "profile_coverage": 0.0}
+
+        for profile, profile_bits in snapshot.profiles_groups_bits.items():
+            union = (candidate_bits | profile_bits).bit_count()
+            intersection = (candidate_bits & profile_bits).bit_count()
+            similarity = intersection / union if union else 1.0
+
+            if similarity > best["profile_similarity"]:
+                best = {
+                    "matched_profile": profile,
+                    "profile_similarity": round(similarity, 4),
+                    "profile_coverage": round(intersection / profile_bits.bit_count(), 4) if profile_bits else 0.0,
+                }
+
+        return best
+
+
+    def summary(self, users: list[str], n_groups: int, candidates: list[dict], n_group_sets: int = 0) -> dict:
+        """
+        The function `summary` returns the totals of a mining run.
+        """
+        covered = sum(len(candidate["users"]) for candidate in candidates)
+
+        return {
+            "users": len(users),
+            "groups": n_groups,
+            "group_sets": n_group_sets,
+            "candidates": len(candidates),
+            "covered_users": covered,
+            "user_coverage": round(covered / len(users), 4) if users else 0.0,
+        }
@@ -0,0 +1,251 @@
+import queue
+import threading
+from collections.abc import Callable, Sequence
+
+
+# The exception `Task_Cancelled` stops the computation of a cancelled task, see `Task.report_progress`.
+class Task_Cancelled(Exception):
+    pass
+
+
+
+class Task():
+    def __init__(self, task_id: int, messages: queue.Queue):
+        """
+        The class `Task` is a computation submitted to `Task_Runner`. The computation receives its task
+        and may check `cancelled` to stop early, since threads can't be stopped from outside, and send
+        its progress with `report_progress`, which stops it once the task is cancelled.
+
+        :param task_id: The `task_id` parameter is the number of the task in its runner
+        :type task_id: int
+        :param messages: The `messages` parameter is the queue read by the main loop
+        :type messages: queue.Queue
+        """
+        self.task_id = task_id
+        self.messages = messages
+        self.cancel_event = threading.Event()
+
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+
+    def report_progress(self, event: object) -> None:
+        """
+        The function `report_progress` sends a progress event to the main loop, it can be called from
+        any thread. When the task is cancelled it raises `Task_Cancelled` instead, so the computation
+        stops at its next report and releases what it holds, like the snapshot lock of `Compare_Data`.
+
+        :param event: The `event` parameter is the progress to show, usually a `Progress_Event`
+        :type event: object
+        """
+        if self.cancelled:
+            raise Task_Cancelled(f"La tarea {self.task_id} fue cancelada")
+
+        self.messages.put((self, "progress", event))
+
+
+
+class Task_Runner():
+    def __init__(self, root, poll_interval: int = 50):
+        """
+        The class `Task_Runner` runs computations in worker threads and delivers their results to the
+        Tk main loop. Workers never touch widgets: they put their result in a queue that the main loop
+        polls with `after`, and the callbacks run in the main thread. Only one task is current at a
+        time, submitting a new one cancels the previous one and its result is discarded. The task stays
+        current after it ends, until it is cancelled, so the batches it renders can be stopped.
+
+        :param root: The `root` parameter is the Tk application
+        :param poll_interval: The `poll_interval` parameter is the time in milliseconds between two
+        reads of the queue while tasks are running, defaults to 50 (optional)
+        :type poll_interval: int
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+
+        self.messages: queue.Queue = queue.Queue()
+        self.pending: dict[int, tuple[Callable, Callable | None, Callable | None, Callable | None]] = {}
+
+        self.current: Task | None = None
+        self.task_count = 0
+        self.poll_id: str | None = None
+
+
+    def submit(
+            self,
+            compute: Callable[[Task], object],
+            on_done: Callable[[object], None],
+            on_error: Callable[[Exception], None] | None = None,
+            on_finished: Callable[[], None] | None = None,
+            on_progress: Callable[[object], None] | None = None
+        ) -> Task:
+        """
+        The function `submit` cancels the current task and runs a new one.
+
+        :param compute: The `compute` parameter is the function run in the worker thread, it receives
+        the task and returns the result
+        :type compute: Callable[[Task], object]
+        :param on_done: The `on_done` parameter is called in the main thread with the result
+        :type on_done: Callable[[object], None]
+        :param on_error: The `on_error` parameter is called in the main thread with the exception raised
+        by `compute` or `on_done`, defaults to `None` (optional)
+        :type on_error: Callable[[Exception], None] | None
+        :param on_finished: The `on_finished` parameter is called in the main thread once the task ends,
+        fails or is cancelled, defaults to `None` (optional)
+        :type on_finished: Callable[[], None] | None
+        :param on_progress: The `on_progress` parameter is called in the main thread with the last event
+        sent by `Task.report_progress` since the previous poll, defaults to `None` (optional)
+        :type on_progress: Callable[[object], None] | None
+        :return: The new task.
+        """
+        self.cancel()
+
+        self.task_count += 1
+        task = Task(self.task_count, self.messages)
+
+        self.pending[task.task_id] = (on_done, on_error, on_finished, on_progress)
+        self.current = task
+
+        threading.Thread(
+            target=self.run, args=(task, compute), name=f"task-{task.task_id}", daemon=True
+        ).start()
+
+        self.schedule_poll()
+
+        return task
+
+
+    def run(self, task: Task, compute: Callable[[Task], object]) -> None:
+        """
+        The function `run` is the body of the worker thread, it only computes and queues the outcome.
+        The outcome of a cancelled task, `Task_Cancelled` included, is discarded by `poll`.
+        """
+        try:
+            self.messages.put((task, "done", compute(task)))
+        except Exception as error:
+            self.messages.put((task, "error", error))
+
+
+    def cancel(self) -> None:
+        """
+        The function `cancel` cancels the current task, if any. Its `on_finished` callback runs right
+        away and its result, when it arrives, is discarded.
+        """
+        task = self.current
+        self.current = None
+
+        if task is None or task.cancelled:
+            return
+
+        task.cancel()
+
+        # A task that already ended only stops rendering its batches.
+        _, _, on_finished, _ = self.pending.get(task.task_id, (None, None, None, None))
+
+        if on_finished is not None:
+            on_finished()
+
+
+    def schedule_poll(self) -> None:
+        if self.poll_id is None:
+            self.poll_id = self.root.after(self.poll_interval, self.poll)
+
+
+    def poll(self) -> None:
+        """
+        The function `poll` runs in the main loop, it delivers the outcome of the finished tasks and
+        schedules itself again while some task is still running.
+        """
+        self.poll_id = None
+        progress: dict[int, tuple[Task, object]] = {}
+
+        while True:
+            try:
+                task, kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+
+            if task.cancelled:
+                if kind != "progress":
+                    self.pending.pop(task.task_id, None)
+                continue
+
+            # Only the last progress event of each task is shown.
+            if kind == "progress":
+                progress[task.task_id] = (task, payload)
+                continue
+
+            progress.pop(task.task_id, None)
+            on_done, on_error, on_finished, _ = self.pending.pop(task.task_id)
+
+            error = payload if kind == "error" else None
+
+            try:
+                if error is None:
+                    on_done(payload)
+            except Exception as callback_error:
+                error = callback_error
+
+            if error is not None:
+                if on_error is None:
+                    raise error
+                on_error(error)
+
+            if on_finished is not None:
+                on_finished()
+
+        for task, event in progress.values():
+            on_progress = self.pending[task.task_id][3]
+
+            if on_progress is not None and not task.cancelled:
+                on_progress(event)
+
+        if self.pending:
+            self.schedule_poll()
+
+
+    def render_in_batches(
+            self,
+            items: Sequence,
+            render_batch: Callable[[Sequence], None],
+            batch_size: int = 200,
+            on_complete: Callable[[], None] | None = None
+        ) -> None:
+        """
+        The function `render_in_batches` renders a long list of items in slices, one per idle callback
+        of the main loop, so the window keeps responding while they are added. It stops when the task
+        current at the time of the call is cancelled.
+
+        :param items: The `items` parameter is the list of items to render
+        :type items: Sequence
+        :param render_batch: The `render_batch` parameter is called with each slice of items
+        :type render_batch: Callable[[Sequence], None]
+        :param batch_size: The `batch_size` parameter is the number of items per slice, defaults to 200
+        (optional)
+        :type batch_size: int
+        :param on_complete: The `on_complete` parameter is called after the last slice, defaults to
+        `None` (optional)
+        :type on_complete: Callable[[], None] | None
+        """
+        task = self.current
+
+        def render_from(start: int) -> None:
+            if task is not None and task.cancelled:
+                return
+
+            render_batch(items[start:start + batch_size])
+
+            if start + batch_size < len(items):
+                self.root.after_idle(render_from, start + batch_size)
+            elif on_complete is not None:
+                on_complete()
+
+        if items:
+            render_from(0)
+        elif on_complete is not None:
+            on_complete()
@@ -0,0 +1,187 @@
+import tkinter as tk
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Sequence
+from itertools import accumulate
+
+
+class Virtual_List(tk.Frame):
+    def __init__(
+            self, parent,
+            items: Sequence,
+            create_row: Callable[[tk.Widget], tk.Widget],
+            bind_row: Callable[[tk.Widget, object, int], None],
+            estimate_height: Callable[[object], int],
+            overscan: int = 2,
+            spacing: int = 0,
+            **kwargs
+        ):
+        """
+        The class `Virtual_List` is a scrollable list that only has widgets for the items inside the
+        viewport. Rows are placed in a canvas at the offset given by the estimated height of the items
+        before them, and the rows that leave the viewport are reused for the ones that enter it, so the
+        number of widgets depends on the size of the window and not on the number of items.
+
+        :param parent: The `parent` parameter is the widget that contains the list
+        :param items: The `items` parameter is the list of items to show
+        :type items: Sequence
+        :param create_row: The `create_row` parameter is a function that builds an empty row inside the
+        widget it receives
+        :type create_row: Callable[[tk.Widget], tk.Widget]
+        :param bind_row: The `bind_row` parameter is a function that shows an item, and its index, in
+        a row built by `create_row`
+        :type bind_row: Callable[[tk.Widget, object, int], None]
+        :param estimate_height: The `estimate_height` parameter is a function that returns the height
+        in pixels of the row of an item
+        :type estimate_height: Callable[[object], int]
+        :param overscan: The `overscan` parameter is the number of rows bound above and below the
+        viewport, defaults to 2 (optional)
+        :type overscan: int
+        :param spacing: The `spacing` parameter is the vertical space in pixels between rows, defaults
+        to 0 (optional)
+        :type spacing: int
+        """
+        super().__init__(parent, **kwargs)
+
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.estimate_height = estimate_height
+        self.overscan = overscan
+        self.spacing = spacing
+
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, yscrollincrement=20)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.bind("<Enter>", lambda e: self.bind_mouse_wheel())
+        self.bind("<Leave>", self.on_leave)
+
+        # Rows bound to an item, by index of the item, and rows waiting to be reused. Each row is
+        # kept as (widget, canvas window id).
+        self.bound_rows: dict[int, tuple[tk.Widget, int]] = {}
+        self.free_rows: list[tuple[tk.Widget, int]] = []
+
+        self.set_items(items)
+
+
+    def set_items(self, items: Sequence) -> None:
+        """
+        The function `set_items` replaces the items of the list and scrolls back to the top.
+
+        :param items: The `items` parameter is the new list of items
+        :type items: Sequence
+        """
+        self.items = items
+        self.heights = [self.estimate_height(item) + self.spacing for item in items]
+        self.offsets = [0, *accumulate(self.heights)]
+
+        for row in self.bound_rows.values():
+            self.release_row(row)
+        self.bound_rows = {}
+
+        self.canvas.configure(scrollregion=(0, 0, 0, self.offsets[-1]))
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+
+    def visible_range(self) -> range:
+        """
+        The function `visible_range` returns the indexes of the items inside the viewport, with the
+        overscan rows around them.
+        :return: A range of item indexes.
+        """
+        top = self.canvas.canvasy(0)
+        bottom = top + max(self.canvas.winfo_height(), 1)
+
+        first = max(bisect_right(self.offsets, top) - 1 - self.overscan, 0)
+        last = min(bisect_left(self.offsets, bottom) + self.overscan, len(self.items))
+
+        return range(first, last)
+
+
+    def refresh(self) -> None:
+        """
+        The function `refresh` binds the rows of the items that entered the viewport, reusing the rows
+        of the ones that left it.
+        """
+        visible = self.visible_range()
+
+        for index in [index for index in self.bound_rows if index not in visible]:
+            self.release_row(self.bound_rows.pop(index))
+
+        for index in visible:
+            if index in self.bound_rows:
+                continue
+
+            widget, window = self.free_rows.pop() if self.free_rows else self.new_row()
+
+            self.bind_row(widget, self.items[index], index)
+            self.canvas.coords(window, 0, self.offsets[index] + self.spacing // 2)
+            self.canvas.itemconfigure(window, height=self.heights[index] - self.spacing, state="normal")
+
+            self.bound_rows[index] = (widget, window)
+
+
+    def new_row(self) -> tuple[tk.Widget, int]:
+        widget = self.create_row(self.canvas)
+        window = self.canvas.create_window(
+            0, 0, window=widget, anchor="nw", width=max(self.canvas.winfo_width(), 1)
+        )
+
+        return widget, window
+
+
+    def release_row(self, row: tuple[tk.Widget, int]) -> None:
+        self.canvas.itemconfigure(row[1], state="hidden")
+        self.free_rows.append(row)
+
+
+    def rebind(self, index: int) -> None:
+        """
+        The function `rebind` shows again an item whose content changed, if its row is bound.
+
+        :param index: The `index` parameter is the index of the item
+        :type index: int
+        """
+        if index in self.bound_rows:
+            self.bind_row(self.bound_rows[index][0], self.items[index], index)
+
+
+    def on_scroll(self, first: str, last: str) -> None:
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+
+    def on_resize(self, event: tk.Event) -> None:
+        for _, window in [*self.bound_rows.values(), *self.free_rows]:
+            self.canvas.itemconfigure(window, width=event.width)
+
+        self.refresh()
+
+
+    def bind_mouse_wheel(self) -> None:
+        # The rows cover the canvas, so the wheel is bound to the whole application while the pointer
+        # is over the list.
+        self.bind_all("<MouseWheel>", lambda e: self.canvas.yview_scroll(-1 * (e.delta // 120), "units"))
+        self.bind_all("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.bind_all("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+
+    def on_leave(self, event: tk.Event) -> None:
+        # Moving the pointer over a row also leaves the frame, the wheel is kept while it is inside.
+        widget = self.winfo_containing(event.x_root, event.y_root)
+
+        if widget is None or not str(widget).startswith(str(self)):
+            self.unbind_mouse_wheel()
+
+
+    def unbind_mouse_wheel(self) -> None:
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.unbind_all(sequence)
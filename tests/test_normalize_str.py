@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from benchmarks.check_normalize_str import HEADERS, random_string, reference_normalize_str
+from utils import normalize_str, normalize_str_cache_clear
+
+
+@pytest.fixture(autouse=True)
+def empty_memo():
+    normalize_str_cache_clear()
+    yield
+    normalize_str_cache_clear()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_generated_strings_match_the_original_implementation(seed):
+    randomizer = random.Random(seed)
+
+    for _ in range(20_000):
+        value = random_string(randomizer)
+
+        assert normalize_str(value) == reference_normalize_str(value), repr(value)
+
+
+@pytest.mark.parametrize("header", HEADERS)
+def test_workbook_headers_match_the_original_implementation(header):
+    assert normalize_str(header) == reference_normalize_str(header)
+
+
+def test_memoized_results_do_not_change():
+    values = [random_string(random.Random(seed)) for seed in range(200)] + HEADERS
+
+    first = [normalize_str(value) for value in values]
+    second = [normalize_str(value) for value in values]
+
+    assert first == second == [reference_normalize_str(value) for value in values]
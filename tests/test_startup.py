@@ -0,0 +1,23 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.bench_startup import ENTRY_POINTS, measure_import
+
+
+# Best of a few runs, the first import of a run also pays for reading the files from disk.
+REPEAT = 3
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.mark.parametrize("name", ENTRY_POINTS)
+def test_entry_point_starts_within_its_budget(name, monkeypatch):
+    # `measure_import` runs the new interpreter in the current folder.
+    monkeypatch.chdir(ROOT)
+    statement, budget, forbidden = ENTRY_POINTS[name]
+
+    total, top_level, imported = min((measure_import(statement) for _ in range(REPEAT)), key=lambda run: run[0])
+
+    assert total <= budget, f"{name}: {total:.1f} ms (presupuesto {budget} ms), más lentos: {top_level[:5]}"
+    assert not imported & set(forbidden), f"{name} importa {sorted(imported & set(forbidden))}"
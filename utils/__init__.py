@@ -1,8 +1,17 @@
 from .utils import (
-    recreate_folders, normalize_str, array_diff, array_object_diff,
+    recreate_folders, normalize_str, normalize_str_cache_info, normalize_str_cache_clear,
+    array_diff, array_object_diff,
     open_csv_file, open_json_file, saves_json_file, 
     CSV_PATH, JSON_PATH 
 )
+from .cache import (
+    Fingerprint_Cache, file_fingerprint, file_hash, atomic_write_bytes,
+    CACHE_PATH
+)
+from .group_table import Group_Table
+from .search_index import Search_Index, search_tokens
+from .progress import Progress_Event, Progress_Reporter, Progress_Callback, progress_scope
+from .tracing import Tracer, Span, Span_Record, NULL_SPAN, tracer, span, traced
 from .enums import (
     RBAC_Keys, RBAC_Profile_Keys, RBAC_Profile_Group_Keys,
     OPICS_Keys, RUGAR_Keys, 
@@ -10,9 +19,15 @@ from .enums import (
 
 
 __all__ = [
-    recreate_folders, normalize_str, array_diff, array_object_diff,
+    recreate_folders, normalize_str, normalize_str_cache_info, normalize_str_cache_clear,
+    array_diff, array_object_diff,
     open_csv_file, open_json_file, saves_json_file, 
     RBAC_Keys, RBAC_Profile_Keys, RBAC_Profile_Group_Keys,
     OPICS_Keys, RUGAR_Keys,
-    CSV_PATH, JSON_PATH 
+    Fingerprint_Cache, file_fingerprint, file_hash, atomic_write_bytes,
+    Group_Table,
+    Search_Index, search_tokens,
+    Progress_Event, Progress_Reporter, Progress_Callback, progress_scope,
+    Tracer, Span, Span_Record, NULL_SPAN, tracer, span, traced,
+    CSV_PATH, JSON_PATH, CACHE_PATH
 ]
\ No newline at end of file
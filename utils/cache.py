@@ -0,0 +1,226 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+from pathlib import Path
+
+
+CACHE_PATH = './files/cache'
+CACHE_FORMAT_VERSION = 2
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+
+def file_fingerprint(path: str, with_hash: bool = True) -> dict:
+    """
+    The function `file_fingerprint` builds a fingerprint of a file made of its size, its modification
+    time and, optionally, the SHA-256 hash of its content.
+
+    :param path: The `path` parameter is the location of the file to fingerprint
+    :type path: str
+    :param with_hash: When `True` the content of the file is read in blocks to compute its hash
+    :type with_hash: bool
+    :return: A dictionary with the keys `size`, `mtime` and `sha256` (`None` when `with_hash` is `False`).
+    """
+    stat = os.stat(path)
+
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "sha256": file_hash(path) if with_hash else None
+    }
+
+
+def file_hash(path: str) -> str:
+    """
+    The function `file_hash` computes the SHA-256 hash of a file reading it in fixed size blocks, so
+    big files never need to be fully loaded in memory.
+
+    :param path: The `path` parameter is the location of the file to hash
+    :type path: str
+    :return: The hexadecimal digest of the content of the file.
+    """
+    digest = hashlib.sha256()
+
+    with open(path, mode="rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    The function `atomic_write_bytes` writes the data into a temporary file in the same folder and
+    then replaces the destination, so readers never see a half written file.
+
+    :param path: The `path` parameter is the destination file
+    :type path: str
+    :param data: The `data` parameter is the content to write
+    :type data: bytes
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+
+    file_descriptor, temp_path = tempfile.mkstemp(dir=folder, prefix=".tmp_", suffix=".part")
+
+    try:
+        with os.fdopen(file_descriptor, mode="wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class Fingerprint_Cache():
+    def __init__(self, namespace: str, cache_path: str = CACHE_PATH):
+        """
+        The class `Fingerprint_Cache` keeps on disk the result of parsing a source file, keyed by the
+        fingerprint (size, modification time and content hash) of that file.
+
+        :param namespace: The `namespace` parameter is a prefix for the cache files, so different
+        analyzers can share the same folder
+        :type namespace: str
+        :param cache_path: The `cache_path` parameter is the folder where the cache files are stored
+        :type cache_path: str
+        """
+        self.namespace = namespace
+        self.cache_path = cache_path
+
+
+    def entry_path(self, source_path: str) -> str:
+        """
+        The function `entry_path` returns the cache file used for a given source file.
+
+        :param source_path: The `source_path` parameter is the location of the parsed file
+        :type source_path: str
+        :return: The path of the cache file related to `source_path`.
+        """
+        source_key = hashlib.sha1(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_path, f"{self.namespace}_{source_key}.pkl")
+
+
+    def read_entry(self, source_path: str) -> dict | None:
+        """
+        The function `read_entry` reads the cache file of a source file, discarding it when it can't be
+        read or when it was written with another format version.
+
+        :param source_path: The `source_path` parameter is the location of the parsed file
+        :type source_path: str
+        :return: The cache entry as a dictionary, or `None` when there is no valid entry.
+        """
+        entry_path = self.entry_path(source_path)
+
+        if not os.path.exists(entry_path):
+            return None
+
+        try:
+            with open(entry_path, mode="rb") as file:
+                entry = pickle.load(file)
+        except Exception:
+            return None
+
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_FORMAT_VERSION:
+            return None
+
+        return entry
+
+
+    def load(self, source_path: str) -> object | None:
+        """
+        The function `load` returns the cached data of a source file if the file has not changed since
+        it was stored. When size and modification time match the stored fingerprint the content is not
+        read at all; otherwise the content hash decides.
+
+        :param source_path: The `source_path` parameter is the location of the parsed file
+        :type source_path: str
+        :return: The cached data, or `None` when there is no entry or the file changed.
+        """
+        entry = self.read_entry(source_path)
+
+        if entry is None or not Path(source_path).exists():
+            return None
+
+        stored = entry["fingerprint"]
+        current = file_fingerprint(source_path, with_hash=False)
+
+        if current["size"] != stored["size"]:
+            return None
+
+        if current["mtime"] != stored["mtime"]:
+            current["sha256"] = file_hash(source_path)
+
+            if current["sha256"] != stored["sha256"]:
+                return None
+
+            entry["fingerprint"] = current
+            self.write_entry(source_path, entry)
+
+        return entry["data"]
+
+
+    def store(self, source_path: str, data: object, fingerprint: dict | None = None) -> None:
+        """
+        The function `store` saves the parsed data of a source file together with its fingerprint.
+
+        :param source_path: The `source_path` parameter is the location of the parsed file
+        :type source_path: str
+        :param data: The `data` parameter is the parsed content to keep, it must be picklable
+        :type data: object
+        :param fingerprint: The `fingerprint` parameter is the fingerprint of the file taken before it
+        was parsed, as returned by `file_fingerprint`. It is computed now when it is not given, which
+        reads the whole file again (optional)
+        :type fingerprint: dict | None
+        """
+        self.write_entry(source_path, {
+            "version": CACHE_FORMAT_VERSION,
+            "source": os.path.abspath(source_path),
+            "fingerprint": fingerprint or file_fingerprint(source_path),
+            "data": data
+        })
+
+
+    def write_entry(self, source_path: str, entry: dict) -> None:
+        """
+        The function `write_entry` serializes a cache entry and writes it atomically.
+
+        :param source_path: The `source_path` parameter is the location of the parsed file
+        :type source_path: str
+        :param entry: The `entry` parameter is the cache entry to write
+        :type entry: dict
+        """
+        atomic_write_bytes(
+            self.entry_path(source_path),
+            pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+
+
+    def invalidate(self, source_path: str | None = None) -> None:
+        """
+        The function `invalidate` removes the cache entry of a source file, or every entry of the
+        namespace when no file is given.
+
+        :param source_path: The `source_path` parameter is the location of the parsed file, defaults to
+        `None` (optional)
+        :type source_path: str | None
+        """
+        if source_path is not None:
+            entry_paths = [self.entry_path(source_path)]
+        elif os.path.isdir(self.cache_path):
+            entry_paths = [
+                os.path.join(self.cache_path, name) for name in os.listdir(self.cache_path)
+                if name.startswith(f"{self.namespace}_") and name.endswith(".pkl")
+            ]
+        else:
+            entry_paths = []
+
+        for entry_path in entry_paths:
+            if os.path.exists(entry_path):
+                os.remove(entry_path)
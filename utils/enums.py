@@ -11,6 +11,8 @@ class RBAC_Keys(str, Enum):
     PROFILES_GROUPS = "perfil-grupo"
     PROFILES_USERS = "perfil-usuario"
     USER = "usuario_opics"
+    WINDOWS_USER = "usuario_windows"
+    POSITION = "cargo"
 
 
 class RUGAR_Keys(str, Enum):
@@ -0,0 +1,127 @@
+from collections.abc import Iterable
+
+
+class Group_Table():
+    def __init__(self, ignore_case_and_spaces: bool = False):
+        """
+        The class `Group_Table` interns group names, giving each distinct group a small integer id, so
+        the groups of a user can be held as an integer bitset and compared with bitwise operations.
+
+        :param ignore_case_and_spaces: When `True`, names that only differ in letter case or whitespace
+        are the same group, defaults to `False` (optional)
+        :type ignore_case_and_spaces: bool
+        """
+        self.ignore_case_and_spaces = ignore_case_and_spaces
+
+        self.ids: dict[str, int] = {}
+        self.names: list[str] = []
+
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+    def key(self, group: str) -> str:
+        """
+        The function `key` returns the text used to match a group name.
+
+        :param group: The `group` parameter is a group name
+        :type group: str
+        :return: The name itself, or the name without whitespace and case folded when the table ignores
+        them.
+        """
+        if self.ignore_case_and_spaces:
+            return ''.join(group.split()).casefold()
+
+        return group
+
+
+    def intern(self, group: str) -> int:
+        """
+        The function `intern` returns the id of a group, adding it to the table if it is new.
+
+        :param group: The `group` parameter is a group name
+        :type group: str
+        :return: The id of the group.
+        """
+        key = self.key(group)
+        group_id = self.ids.get(key)
+
+        if group_id is None:
+            group_id = len(self.names)
+            self.ids[key] = group_id
+            self.names.append(group)
+
+        return group_id
+
+
+    def intern_all(self, groups: Iterable[str]) -> list[int]:
+        """
+        The function `intern_all` interns a list of groups.
+
+        :param groups: The `groups` parameter is a list of group names
+        :type groups: Iterable[str]
+        :return: The sorted ids of the distinct groups of the list.
+        """
+        return sorted({self.intern(group) for group in groups})
+
+
+    def to_bits(self, groups: Iterable[str]) -> int:
+        """
+        The function `to_bits` interns a list of groups and returns it as a bitset.
+
+        :param groups: The `groups` parameter is a list of group names
+        :type groups: Iterable[str]
+        :return: An integer with the bit of each group set.
+        """
+        bits = 0
+
+        for group in groups:
+            bits |= 1 << self.intern(group)
+
+        return bits
+
+
+    def bit(self, group: str) -> int:
+        """
+        The function `bit` returns the bit of an already interned group.
+
+        :param group: The `group` parameter is a group name
+        :type group: str
+        :return: The bit of the group, or 0 when the group is not in the table.
+        """
+        group_id = self.ids.get(self.key(group))
+
+        return 0 if group_id is None else 1 << group_id
+
+
+    def lookup_all(self, groups: Iterable[str]) -> list[int]:
+        """
+        The function `lookup_all` returns the ids of the already interned groups of a list, without
+        adding the unknown ones, so the table can be shared between readers.
+
+        :param groups: The `groups` parameter is a list of group names
+        :type groups: Iterable[str]
+        :return: The sorted ids of the distinct known groups of the list.
+        """
+        group_ids = {self.ids.get(self.key(group)) for group in groups}
+        group_ids.discard(None)
+
+        return sorted(group_ids)
+
+
+    def lookup_bits(self, groups: Iterable[str]) -> int:
+        """
+        The function `lookup_bits` returns the already interned groups of a list as a bitset, without
+        adding the unknown ones.
+
+        :param groups: The `groups` parameter is a list of group names
+        :type groups: Iterable[str]
+        :return: An integer with the bit of each known group set.
+        """
+        bits = 0
+
+        for group in groups:
+            bits |= self.bit(group)
+
+        return bits
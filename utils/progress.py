@@ -0,0 +1,173 @@
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import NamedTuple
+
+
+# The class `Progress_Event` is what a `Progress_Reporter` sends to its callback.
+class Progress_Event(NamedTuple):
+    stage: str
+    done: int
+    total: int | None
+    unit: str
+    counts: dict[str, int]
+    elapsed: float
+    eta: float | None
+
+    @property
+    def fraction(self) -> float | None:
+        if not self.total:
+            return None
+
+        return min(self.done / self.total, 1.0)
+
+
+Progress_Callback = Callable[[Progress_Event], None]
+
+# Progress callback of each thread, see `progress_scope`.
+thread_progress = threading.local()
+
+
+
+@contextmanager
+def progress_scope(callback: Progress_Callback | None) -> Iterator[None]:
+    """
+    The function `progress_scope` sets the progress callback of the current thread while its block
+    runs. The reporters created in the block without a callback of their own report to it, so
+    computations running in different threads never mix their progress. The callback may raise to
+    stop the computation, the exception goes up from the `update` of the reporter.
+
+    :param callback: The `callback` parameter receives the `Progress_Event` of the reporters created
+    in the block
+    :type callback: Progress_Callback | None
+    """
+    previous = getattr(thread_progress, "callback", None)
+    thread_progress.callback = callback
+
+    try:
+        yield
+    finally:
+        thread_progress.callback = previous
+
+
+def current_progress_callback() -> Progress_Callback | None:
+    """
+    The function `current_progress_callback` returns the callback set by `progress_scope` in the
+    current thread, if any.
+    """
+    return getattr(thread_progress, "callback", None)
+
+
+
+class Progress_Reporter():
+    def __init__(
+            self,
+            callback: Progress_Callback | None,
+            stage: str,
+            total: int | None = None,
+            unit: str = "",
+            min_interval: float = 0.1,
+            check_every: int = 64
+        ):
+        """
+        The class `Progress_Reporter` reports the progress of one stage of an analysis to a callback,
+        at most once every `min_interval` seconds. Hot loops ask `due` before computing what they
+        report: it only looks at the clock once every `check_every` calls, and it is always `False`
+        when there is no callback.
+
+        :param callback: The `callback` parameter receives the `Progress_Event`. When it is `None` the
+        callback of the current thread is used, see `progress_scope`, and without one the reports are
+        disabled
+        :type callback: Progress_Callback | None
+        :param stage: The `stage` parameter is the name of the stage shown to the user
+        :type stage: str
+        :param total: The `total` parameter is the amount of work of the stage, or `None` when it is
+        unknown, defaults to `None` (optional)
+        :type total: int | None
+        :param unit: The `unit` parameter is the name of the unit of work, defaults to "" (optional)
+        :type unit: str
+        :param min_interval: The `min_interval` parameter is the minimum number of seconds between two
+        reports, defaults to 0.1 (optional)
+        :type min_interval: float
+        :param check_every: The `check_every` parameter is the number of calls to `due` between two
+        reads of the clock, defaults to 64 (optional)
+        :type check_every: int
+        """
+        self.callback = callback if callback is not None else current_progress_callback()
+        self.stage = stage
+        self.total = total
+        self.unit = unit
+        self.min_interval = min_interval
+        self.check_every = check_every
+
+        self.done = 0
+        self.counts: dict[str, int] = {}
+
+        self.countdown = check_every
+        self.started = time.monotonic()
+        self.last_report = float("-inf")
+
+        self.update(0, force=True)
+
+
+    def due(self) -> bool:
+        """
+        The function `due` tells if it is time to send a new report.
+        :return: `True` when the callback is set and `min_interval` seconds passed since the last report.
+        """
+        if self.callback is None:
+            return False
+
+        self.countdown -= 1
+
+        if self.countdown > 0:
+            return False
+
+        self.countdown = self.check_every
+
+        return time.monotonic() - self.last_report >= self.min_interval
+
+
+    def update(self, done: int, force: bool = False, **counts: int) -> None:
+        """
+        The function `update` records the progress of the stage and reports it, unless the last report
+        is more recent than `min_interval`.
+
+        :param done: The `done` parameter is the amount of work completed
+        :type done: int
+        :param force: The `force` parameter sends the report regardless of the time of the last one,
+        defaults to `False` (optional)
+        :type force: bool
+        :param counts: Other counters of the stage, like the number of records processed
+        :type counts: int
+        """
+        if self.callback is None:
+            return
+
+        self.done = done
+        self.counts.update(counts)
+
+        now = time.monotonic()
+
+        if not force and now - self.last_report < self.min_interval:
+            return
+
+        self.last_report = now
+        elapsed = now - self.started
+
+        eta = None
+        if self.total and done:
+            eta = elapsed * (self.total - done) / done
+
+        self.callback(Progress_Event(self.stage, done, self.total, self.unit, dict(self.counts), elapsed, eta))
+
+
+    def finish(self, **counts: int) -> None:
+        """
+        The function `finish` reports the end of the stage.
+
+        :param counts: The final counters of the stage
+        :type counts: int
+        """
+        self.update(self.total if self.total is not None else self.done, force=True, **counts)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Sequence
+from functools import lru_cache
+from itertools import chain
+from typing import TYPE_CHECKING
+
+from unidecode import unidecode
+
+# numpy is imported when the first index is built, see `Search_Index`.
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Characters that separate the words of a field. Underscores, dashes and dots are kept, they are part
+# of group names like "CONSULTA_12".
+TOKEN_SEPARATORS = re.compile(r"[\s,;:/()\[\]]+")
+
+# Terms shorter than the n-grams are matched as prefixes of the words.
+NGRAM_SIZE = 3
+
+# Masks of the terms searched most recently, typing a new word reuses the ones of the previous words.
+TERM_CACHE_SIZE = 64
+
+
+
+def search_tokens(text: str) -> list[str]:
+    """
+    The function `search_tokens` splits a text in the words used by `Search_Index`, without accents
+    and case folded.
+
+    :param text: The `text` parameter is the text of a field or a query
+    :type text: str
+    :return: The list of words of the text.
+    """
+    tokens = []
+
+    for token in TOKEN_SEPARATORS.split(text.casefold()):
+        if token.isascii():
+            if token:
+                tokens.append(token)
+        else:
+            tokens.extend(fold_token(token))
+
+    return tokens
+
+
+@lru_cache(maxsize=65536)
+def fold_token(token: str) -> tuple[str, ...]:
+    """
+    The function `fold_token` removes the accents of a word with unidecode. Names repeat a lot, so
+    the words are memoized. The transliteration may add separators or capital letters, so its result
+    is split and folded again.
+    """
+    return tuple(token for token in TOKEN_SEPARATORS.split(unidecode(token).casefold()) if token)
+
+
+
+class Search_Index():
+    def __init__(self, records: Sequence, fields: Callable[[object], Iterable[object]]):
+        """
+        The class `Search_Index` finds the records whose fields contain the words of a query, fast
+        enough to filter a list while the user types. Every distinct word of the fields is stored once,
+        sorted, with the positions of the records that contain it; the positions of all the words are
+        kept in a single array. A query word shorter than `NGRAM_SIZE` matches the words that start
+        with it, found by bisection, and a longer one matches the words that contain it, found through
+        an index of the n-grams of the words. A record matches when it matches every word of the query.
+
+        :param records: The `records` parameter is the list of records to search
+        :type records: Sequence
+        :param fields: The `fields` parameter is a function that returns the searchable values of a
+        record, `None` values are skipped
+        :type fields: Callable[[object], Iterable[object]]
+        """
+        import numpy as np
+
+        self.records = records
+
+        # Fields repeat a lot (groups, profiles), each distinct value is split only once.
+        value_tokens: dict[object, list[str]] = {}
+        token_positions: dict[str, list[int]] = {}
+
+        for position, record in enumerate(records):
+            for value in fields(record):
+                if value is None:
+                    continue
+
+                tokens = value_tokens.get(value)
+
+                if tokens is None:
+                    tokens = value_tokens[value] = search_tokens(str(value))
+
+                for token in tokens:
+                    positions = token_positions.get(token)
+
+                    if positions is None:
+                        token_positions[token] = [position]
+                    elif positions[-1] != position:
+                        positions.append(position)
+
+        self.tokens = sorted(token_positions)
+
+        lengths = np.fromiter((len(token_positions[token]) for token in self.tokens), dtype=np.int64, count=len(self.tokens))
+        self.offsets = np.zeros(len(self.tokens) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+
+        self.positions = np.fromiter(
+            chain.from_iterable(token_positions[token] for token in self.tokens),
+            dtype=np.int64, count=int(self.offsets[-1])
+        )
+
+        self.ngrams: dict[str, list[int]] = {}
+
+        for token_id, token in enumerate(self.tokens):
+            for ngram in {token[start:start + NGRAM_SIZE] for start in range(len(token) - NGRAM_SIZE + 1)}:
+                self.ngrams.setdefault(ngram, []).append(token_id)
+
+        self.term_masks: dict[str, np.ndarray] = {}
+
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+    def search(self, query: str) -> list[int]:
+        """
+        The function `search` finds the records that match a query.
+
+        :param query: The `query` parameter is the text typed by the user
+        :type query: str
+        :return: The positions of the matching records, in order. An empty query matches every record.
+        """
+        terms = search_tokens(query)
+
+        if not terms:
+            return list(range(len(self.records)))
+
+        mask = None
+
+        for term in dict.fromkeys(terms):
+            term_mask = self.term_mask(term)
+            mask = term_mask if mask is None else mask & term_mask
+
+        return mask.nonzero()[0].tolist()
+
+
+    def filter(self, query: str) -> list:
+        """
+        The function `filter` returns the records that match a query, see `search`.
+        """
+        return [self.records[position] for position in self.search(query)]
+
+
+    def term_mask(self, term: str) -> np.ndarray:
+        """
+        The function `term_mask` marks the records that contain a word matching a term of the query.
+
+        :param term: The `term` parameter is a normalized word of the query
+        :type term: str
+        :return: A boolean array with one value per record.
+        """
+        import numpy as np
+
+        mask = self.term_masks.get(term)
+
+        if mask is not None:
+            return mask
+
+        if len(term) < NGRAM_SIZE:
+            first = bisect_left(self.tokens, term)
+            last = bisect_left(self.tokens, term + "\U0010ffff", first)
+            token_ids = np.arange(first, last)
+        else:
+            token_ids = np.array(self.matching_tokens(term), dtype=np.int64)
+
+        mask = np.zeros(len(self.records), dtype=bool)
+        mask[self.positions[self.token_ranges(token_ids)]] = True
+
+        if len(self.term_masks) >= TERM_CACHE_SIZE:
+            self.term_masks.clear()
+        self.term_masks[term] = mask
+
+        return mask
+
+
+    def matching_tokens(self, term: str) -> list[int]:
+        """
+        The function `matching_tokens` finds the words that contain a term, intersecting the words of
+        its n-grams, shortest list first, and checking the few candidates left.
+
+        :param term: The `term` parameter is a normalized word of at least `NGRAM_SIZE` characters
+        :type term: str
+        :return: The ids of the matching words.
+        """
+        ngrams = {term[start:start + NGRAM_SIZE] for start in range(len(term) - NGRAM_SIZE + 1)}
+        token_lists = sorted((self.ngrams.get(ngram, []) for ngram in ngrams), key=len)
+
+        if not token_lists[0]:
+            return []
+
+        candidates = set(token_lists[0])
+
+        for token_list in token_lists[1:]:
+            candidates.intersection_update(token_list)
+
+            if not candidates:
+                return []
+
+        return [token_id for token_id in candidates if term in self.tokens[token_id]]
+
+
+    def token_ranges(self, token_ids: np.ndarray) -> np.ndarray:
+        """
+        The function `token_ranges` returns the indexes, in `positions`, of the records of some words,
+        concatenating their ranges without a Python loop.
+
+        :param token_ids: The `token_ids` parameter is the ids of the words
+        :type token_ids: np.ndarray
+        :return: An array of indexes of `positions`.
+        """
+        import numpy as np
+
+        starts = self.offsets[token_ids]
+        lengths = self.offsets[token_ids + 1] - starts
+
+        if not len(lengths):
+            return np.zeros(0, dtype=np.int64)
+
+        # Each index is its offset inside the concatenation plus the start of the range it belongs to.
+        range_starts = np.cumsum(lengths) - lengths
+
+        return np.arange(int(lengths.sum())) + np.repeat(starts - range_starts, lengths)
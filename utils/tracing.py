@@ -0,0 +1,480 @@
+import itertools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from functools import wraps
+from typing import NamedTuple
+
+
+# The class `Span_Record` is a finished span, as stored by `Tracer`. `start` is measured in seconds
+# since the tracer was created and `peak_memory` is the peak traced by tracemalloc during the span,
+# in bytes above the memory in use when it started, or `None` when memory was not traced.
+class Span_Record(NamedTuple):
+    span_id: int
+    parent_id: int | None
+    name: str
+    thread: str
+    start: float
+    duration: float
+    peak_memory: int | None
+    details: dict[str, object]
+
+
+
+class Stage():
+    def __init__(self, span: "Span", name: str):
+        """
+        The class `Stage` accumulates the time spent in a step repeated inside a span, like cleaning
+        each line of a report, where a span per call would cost more than the step itself. Its time is
+        exclusive: the time of the stages entered inside it is not counted. The stages are recorded as
+        children of their span when it ends.
+
+        :param span: The `span` parameter is the span that contains the stage
+        :type span: Span
+        :param name: The `name` parameter is the name of the stage
+        :type name: str
+        """
+        self.span = span
+        self.name = name
+
+        self.total = 0.0
+        self.calls = 0
+        self.started = 0.0
+        self.inner = 0.0
+
+
+    def __enter__(self) -> "Stage":
+        self.span.active_stages.append(self)
+        self.inner = 0.0
+        self.started = time.perf_counter()
+
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.started
+
+        active_stages = self.span.active_stages
+        active_stages.pop()
+
+        self.total += elapsed - self.inner
+        self.calls += 1
+
+        if active_stages:
+            active_stages[-1].inner += elapsed
+
+
+
+class Span():
+    def __init__(self, tracer: "Tracer", name: str, details: dict[str, object]):
+        """
+        The class `Span` measures one stage of an analysis: its duration, the peak memory allocated
+        while it runs and the counters set with `set`. Spans are context managers and nest, the span
+        open in the same thread when one is entered becomes its parent. They are created by
+        `Tracer.span`, which returns `NULL_SPAN` instead while tracing is disabled.
+
+        :param tracer: The `tracer` parameter is the tracer that stores the span
+        :type tracer: Tracer
+        :param name: The `name` parameter is the name of the stage shown to the user
+        :type name: str
+        :param details: The `details` parameter is the initial counters and attributes of the span
+        :type details: dict[str, object]
+        """
+        self.tracer = tracer
+        self.name = name
+        self.details = details
+
+        self.span_id = next(tracer.span_ids)
+        self.parent: Span | None = None
+
+        self.stages: dict[str, Stage] = {}
+        self.active_stages: list[Stage] = []
+
+        self.started = 0.0
+        self.memory_start: int | None = None
+        self.peak_seen = 0
+
+
+    def set(self, **details: object) -> None:
+        """
+        The function `set` adds counters or attributes to the span, like the number of records read.
+        """
+        self.details.update(details)
+
+
+    def stage(self, name: str) -> Stage:
+        """
+        The function `stage` returns the accumulated stage of the span with the given name, creating it
+        on first use.
+
+        :param name: The `name` parameter is the name of the stage
+        :type name: str
+        :return: A `Stage`, to be entered once per repetition of the step.
+        """
+        stage = self.stages.get(name)
+
+        if stage is None:
+            stage = self.stages[name] = Stage(self, name)
+
+        return stage
+
+
+    def timed(self, iterable: Iterable, name: str) -> Iterator:
+        """
+        The function `timed` wraps an iterable so the time spent producing each item is accumulated in
+        the stage `name`. Wrapped iterables can be chained, each stage only counts its own time.
+
+        :param iterable: The `iterable` parameter is the iterable to measure, usually a generator
+        :type iterable: Iterable
+        :param name: The `name` parameter is the name of the stage
+        :type name: str
+        :return: An iterator over the same items.
+        """
+        stage = self.stage(name)
+        iterator = iter(iterable)
+
+        while True:
+            with stage:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+
+            yield item
+
+
+    def __enter__(self) -> "Span":
+        stack = self.tracer.stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+
+        if self.tracer.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+
+            # The peak is reset for this span, the parent keeps the one it reached so far.
+            if self.parent is not None:
+                self.parent.peak_seen = max(self.parent.peak_seen, peak)
+
+            tracemalloc.reset_peak()
+            self.memory_start = current
+            self.peak_seen = current
+
+        self.started = time.perf_counter()
+
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        ended = time.perf_counter()
+
+        peak_memory = None
+
+        if self.memory_start is not None and tracemalloc.is_tracing():
+            peak = max(self.peak_seen, tracemalloc.get_traced_memory()[1])
+            peak_memory = peak - self.memory_start
+
+            if self.parent is not None:
+                self.parent.peak_seen = max(self.parent.peak_seen, peak)
+
+        if exc_type is not None:
+            self.details["error"] = exc_type.__name__
+
+        stack = self.tracer.stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+
+        start = self.started - self.tracer.epoch
+        thread = threading.current_thread().name
+
+        # Stages are laid one after another from the start of the span, so they nest inside it in a
+        # trace viewer even though their time was spread along the span.
+        offset = start
+
+        for stage in self.stages.values():
+            self.tracer.add(Span_Record(
+                next(self.tracer.span_ids), self.span_id, stage.name, thread, offset, stage.total, None,
+                {"calls": stage.calls}
+            ))
+            offset += stage.total
+
+        self.tracer.add(Span_Record(
+            self.span_id, self.parent.span_id if self.parent is not None else None, self.name, thread,
+            start, ended - self.started, peak_memory, self.details
+        ))
+
+
+
+class Null_Span():
+    """
+    The class `Null_Span` has the interface of `Span` and `Stage` and does nothing, it is what
+    `Tracer.span` returns while tracing is disabled.
+    """
+    def __enter__(self) -> "Null_Span":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+    def set(self, **details: object) -> None:
+        pass
+
+
+    def stage(self, name: str) -> "Null_Span":
+        return self
+
+
+    def timed(self, iterable: Iterable, name: str) -> Iterable:
+        return iterable
+
+
+NULL_SPAN = Null_Span()
+
+
+
+class Tracer():
+    def __init__(self, enabled: bool = False, trace_memory: bool = False, max_records: int = 10000):
+        """
+        The class `Tracer` collects the spans of the analyses. While it is disabled `span` returns
+        `NULL_SPAN`, so the instrumented code only pays a function call. The last `max_records` spans
+        are kept and can be exported as JSON lines or in the Chrome trace format, which can be opened
+        in chrome://tracing or Perfetto.
+
+        Memory is traced with tracemalloc, which slows down the analyses noticeably, so it has to be
+        enabled on its own. tracemalloc counts the allocations of the whole process, the peak of spans
+        running at the same time in different threads includes the memory of each other.
+
+        :param enabled: The `enabled` parameter records the spans from the start, defaults to `False`
+        (optional)
+        :type enabled: bool
+        :param trace_memory: The `trace_memory` parameter measures the peak memory of each span,
+        defaults to `False` (optional)
+        :type trace_memory: bool
+        :param max_records: The `max_records` parameter is the number of spans kept, defaults to 10000
+        (optional)
+        :type max_records: int
+        """
+        self.enabled = False
+        self.trace_memory = False
+        self.started_tracemalloc = False
+
+        self.records: deque[Span_Record] = deque(maxlen=max_records)
+        self.records_lock = threading.Lock()
+
+        self.local = threading.local()
+        self.span_ids = itertools.count(1)
+        self.epoch = time.perf_counter()
+
+        if enabled:
+            self.enable(trace_memory)
+
+
+    def enable(self, trace_memory: bool = False) -> None:
+        """
+        The function `enable` starts recording spans.
+
+        :param trace_memory: The `trace_memory` parameter measures the peak memory of each span,
+        starting tracemalloc if needed, defaults to `False` (optional)
+        :type trace_memory: bool
+        """
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        elif not trace_memory and self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+        self.trace_memory = trace_memory
+        self.enabled = True
+
+
+    def disable(self) -> None:
+        """
+        The function `disable` stops recording spans, and tracemalloc if it was started by `enable`.
+        The recorded spans are kept.
+        """
+        self.enabled = False
+        self.trace_memory = False
+
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+
+    def span(self, name: str, **details: object) -> Span | Null_Span:
+        """
+        The function `span` creates a span to measure a stage, to be used in a `with` statement.
+
+        :param name: The `name` parameter is the name of the stage shown to the user
+        :type name: str
+        :param details: Initial counters and attributes of the span, like the sheet being read
+        :type details: object
+        :return: A new `Span`, or `NULL_SPAN` while tracing is disabled.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+
+        return Span(self, name, details)
+
+
+    def traced(self, name: str) -> Callable[[Callable], Callable]:
+        """
+        The function `traced` is a decorator that runs each call of a function in a span.
+
+        :param name: The `name` parameter is the name of the span
+        :type name: str
+        """
+        def decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+
+                with Span(self, name, {}):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+    def stack(self) -> list[Span]:
+        """
+        The function `stack` returns the spans open in the current thread, innermost last.
+        """
+        stack = getattr(self.local, "stack", None)
+
+        if stack is None:
+            stack = self.local.stack = []
+
+        return stack
+
+
+    def add(self, record: Span_Record) -> None:
+        with self.records_lock:
+            self.records.append(record)
+
+
+    def get_records(self) -> list[Span_Record]:
+        with self.records_lock:
+            return list(self.records)
+
+
+    def clear(self) -> None:
+        with self.records_lock:
+            self.records.clear()
+
+
+    def last_runs(self, limit: int = 10) -> list[tuple[Span_Record, list[Span_Record]]]:
+        """
+        The function `last_runs` groups the recorded spans by their outermost span, each one is a run
+        of an analysis or a comparison.
+
+        :param limit: The `limit` parameter is the number of runs returned, defaults to 10 (optional)
+        :type limit: int
+        :return: A list of `(root, spans)` tuples, the most recent run first, where `spans` holds the
+        root and all the spans nested in it.
+        """
+        records = self.get_records()
+        parents = {record.span_id: record.parent_id for record in records}
+
+        def root_of(record: Span_Record) -> int:
+            span_id = record.span_id
+
+            while parents.get(span_id) is not None:
+                span_id = parents[span_id]
+
+            return span_id
+
+        runs: dict[int, list[Span_Record]] = {}
+
+        for record in records:
+            runs.setdefault(root_of(record), []).append(record)
+
+        roots = [record for record in records if record.span_id in runs and record.parent_id is None]
+
+        return [(root, runs[root.span_id]) for root in reversed(roots[-limit:])]
+
+
+    def export_jsonl(self, path: str, records: Iterable[Span_Record] | None = None) -> None:
+        """
+        The function `export_jsonl` writes the spans as JSON lines, one object per span.
+
+        :param path: The `path` parameter is the file to write
+        :type path: str
+        :param records: The `records` parameter is the spans to export, defaults to every recorded
+        span (optional)
+        :type records: Iterable[Span_Record] | None
+        """
+        records = self.get_records() if records is None else records
+
+        with open(path, mode="w", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record._asdict(), ensure_ascii=False, default=str) + "\n")
+
+
+    def export_chrome_trace(self, path: str, records: Iterable[Span_Record] | None = None) -> None:
+        """
+        The function `export_chrome_trace` writes the spans in the Chrome trace event format, as
+        complete events with one track per thread.
+
+        :param path: The `path` parameter is the file to write
+        :type path: str
+        :param records: The `records` parameter is the spans to export, defaults to every recorded
+        span (optional)
+        :type records: Iterable[Span_Record] | None
+        """
+        records = self.get_records() if records is None else records
+        process_id = os.getpid()
+        thread_ids: dict[str, int] = {}
+        events = []
+
+        for record in records:
+            thread_id = thread_ids.setdefault(record.thread, len(thread_ids) + 1)
+
+            args = dict(record.details)
+            if record.peak_memory is not None:
+                args["peak_memory"] = record.peak_memory
+
+            events.append({
+                "name": record.name,
+                "ph": "X",
+                "ts": record.start * 1e6,
+                "dur": record.duration * 1e6,
+                "pid": process_id,
+                "tid": thread_id,
+                "args": args,
+            })
+
+        events += [
+            {"name": "thread_name", "ph": "M", "pid": process_id, "tid": thread_id, "args": {"name": thread}}
+            for thread, thread_id in thread_ids.items()
+        ]
+
+        with open(path, mode="w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, ensure_ascii=False, default=str)
+
+
+
+# Tracer of the application, disabled until `enable` is called.
+tracer = Tracer()
+
+
+def span(name: str, **details: object) -> Span | Null_Span:
+    """
+    The function `span` creates a span in the tracer of the application, see `Tracer.span`.
+    """
+    return tracer.span(name, **details)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """
+    The function `traced` decorates a function to run it in a span of the tracer of the application,
+    see `Tracer.traced`.
+    """
+    return tracer.traced(name)
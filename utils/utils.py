@@ -3,6 +3,7 @@ import json
 import os
 import re
 
+from functools import lru_cache
 from unidecode import unidecode
 from shutil import rmtree
 
@@ -12,10 +13,18 @@ JSON_PATH = './files/json'
 
 
 
+# Patterns of `normalize_str`, compiled once instead of on every call.
+NORMALIZE_SEPARATORS_PATTERN = re.compile(r' - |, |\s|\.')
+NORMALIZE_REMOVED_PATTERN = re.compile(r'\n|\ufeff|\(|\)')
+
+NORMALIZE_CACHE_SIZE = 8192
+
+
 def normalize_str(original_str: str):
     """
     The function `normalize_str` takes an input string, converts it to lowercase, replaces spaces,
-    commas, periods, and hyphens with underscores, and removes certain special characters.
+    commas, periods, and hyphens with underscores, and removes certain special characters. Recent
+    inputs are memoized in a bounded LRU cache, see `normalize_str_cache_info`.
     
     :param original_str: The `normalize_str` function takes a string `original_str` as input and
     normalizes it by replacing spaces, hyphens, commas, and periods with underscores. It also removes
@@ -25,17 +34,47 @@ def normalize_str(original_str: str):
     replacing spaces, commas, periods, and hyphens with underscores, and removes any unwanted characters
     like special symbols or parentheses. The normalized string is then returned.
     """
-    pattern_1 = re.compile(r' - |, |\s|\.')
-    pattern_2 = re.compile(r'\n|\ufeff|\(|\)')
+    return cached_normalize_str(original_str)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def cached_normalize_str(original_str: str) -> str:
+    """
+    The function `cached_normalize_str` does the normalization of `normalize_str`. Strings that are
+    pure ASCII after the replacements skip the transliteration, `unidecode` leaves them unchanged.
 
-    return unidecode(
-        pattern_1.sub(
-            '_', pattern_2.sub(
-                '', original_str.strip().lower()
-            )
+    :param original_str: The string to normalize
+    :type original_str: str
+    :return: The normalized string.
+    """
+    normalized_str = NORMALIZE_SEPARATORS_PATTERN.sub(
+        '_', NORMALIZE_REMOVED_PATTERN.sub(
+            '', original_str.strip().lower()
         )
     )
 
+    if normalized_str.isascii():
+        return normalized_str
+
+    return unidecode(normalized_str)
+
+
+def normalize_str_cache_info() -> dict:
+    """
+    The function `normalize_str_cache_info` reports the effectiveness of the memo of `normalize_str`.
+    :return: A dictionary with the `hits`, `misses`, current `size` and `max_size` of the cache.
+    """
+    info = cached_normalize_str.cache_info()
+
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+
+def normalize_str_cache_clear() -> None:
+    """
+    The function `normalize_str_cache_clear` empties the memo of `normalize_str` and resets its counters.
+    """
+    cached_normalize_str.cache_clear()
+
 
 def recreate_folders():
     """